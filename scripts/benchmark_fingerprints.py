@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+benchmark_fingerprints.py — Time translate_book.extract_fingerprints on the
+translated book.
+
+extract_fingerprints runs on every source and every translation during
+cache loading, recovery, validation and --sync alignment. It used to make
+a separate regex pass per kind of fingerprint (labels, refs, cites, hrefs,
+images, Greek, Hebrew, three kinds of number, eight command counts);
+reference_fingerprints below is that version, kept to check the one-pass
+extractor against and to time it by.
+
+Every .tex file in the directory is fingerprinted whole, as fragments
+(split_into_fragments at the default size, as translation does) and as
+paragraphs (as --sync does), by both extractors. Any difference in the
+results is printed and fails the run.
+
+Usage:
+    poetry run python scripts/benchmark_fingerprints.py
+    poetry run python scripts/benchmark_fingerprints.py --dir translations/german --repeat 10
+"""
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+from translate_book import (
+    DEFAULT_FRAGMENT_SIZE,
+    extract_fingerprints,
+    split_into_fragments,
+    split_paragraphs,
+)
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_DIR = PROJECT_ROOT / "translations" / "polish"
+
+
+def reference_fingerprints(text: str) -> dict:
+    """extract_fingerprints as it was: one regex pass per kind of
+    fingerprint, returning a dict of sets and a dict of counts."""
+    fingerprints = {
+        'labels': set(),
+        'refs': set(),
+        'cites': set(),
+        'urls': set(),
+        'images': set(),
+        'greek_strings': set(),
+        'hebrew_strings': set(),
+        'numbers': set(),
+        'command_counts': {},
+    }
+    for match in re.finditer(r'\\label\{([^}]+)\}', text):
+        fingerprints['labels'].add(match.group(1))
+    for match in re.finditer(r'\\ref\{([^}]+)\}', text):
+        fingerprints['refs'].add(match.group(1))
+    for match in re.finditer(r'\\cite\{([^}]+)\}', text):
+        for key in match.group(1).split(','):
+            fingerprints['cites'].add(key.strip())
+    for match in re.finditer(r'\\href\{([^}]+)\}\{', text):
+        fingerprints['urls'].add(match.group(1))
+    for match in re.finditer(r'\\includegraphics(?:\[[^\]]*\])?\{([^}]+)\}', text):
+        fingerprints['images'].add(match.group(1))
+    for match in re.finditer(r'[\u0370-\u03FF\u1F00-\u1FFF]{2,}', text):
+        fingerprints['greek_strings'].add(match.group(0))
+    for match in re.finditer(r'[\u0590-\u05FF]{2,}', text):
+        fingerprints['hebrew_strings'].add(match.group(0))
+    for match in re.finditer(r'\b(\d{4})\b', text):
+        year = int(match.group(1))
+        if 1 <= year <= 2100:
+            fingerprints['numbers'].add(match.group(1))
+    for match in re.finditer(r'\b(\d{1,3}:\d{1,3}(?:-\d{1,3})?)\b', text):
+        fingerprints['numbers'].add(match.group(1))
+    for match in re.finditer(r'\b(\d{1,4})\s*(?:BCE|CE|BC|AD)\b', text, re.IGNORECASE):
+        fingerprints['numbers'].add(match.group(1))
+    commands_to_count = ['section', 'subsection', 'subsubsection',
+                         'footnote', 'emph', 'textit', 'textbf', 'textgreek']
+    for cmd in commands_to_count:
+        count = len(re.findall(rf'\\{cmd}\{{', text))
+        if count > 0:
+            fingerprints['command_counts'][cmd] = count
+    return fingerprints
+
+
+def differences(text: str) -> list:
+    """Return the fingerprint kinds on which the two extractors disagree
+    for text."""
+    expected = reference_fingerprints(text)
+    actual = extract_fingerprints(text)
+    return [key for key, value in expected.items() if actual[key] != value]
+
+
+def workloads(directory: Path) -> dict:
+    """Return {name: texts} for every .tex file in directory: whole files,
+    their fragments and their paragraphs."""
+    files = [path.read_text(encoding="utf-8") for path in sorted(directory.glob("*.tex"))]
+    return {
+        "files": files,
+        "fragments": [f for text in files for f in split_into_fragments(text, DEFAULT_FRAGMENT_SIZE)],
+        "paragraphs": [p for text in files for p in split_paragraphs(text)[0] if p.strip()],
+    }
+
+
+def best_time(extract, texts, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            extract(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark extract_fingerprints against the per-kind regex version."
+    )
+    parser.add_argument("--dir", type=Path, default=DEFAULT_DIR,
+                        help=f"Directory of .tex files (default: {DEFAULT_DIR.relative_to(PROJECT_ROOT)})")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="Times each workload is run; the best is reported (default: 5)")
+    args = parser.parse_args()
+
+    loads = workloads(args.dir)
+    if not loads["files"]:
+        print(f"No .tex files in {args.dir}", file=sys.stderr)
+        return 1
+
+    mismatches = 0
+    for name, texts in loads.items():
+        for i, text in enumerate(texts):
+            kinds = differences(text)
+            if kinds:
+                mismatches += 1
+                print(f"MISMATCH in {name} #{i}: {', '.join(kinds)}")
+
+    chars = sum(len(text) for text in loads["files"])
+    print(f"{args.dir}: {len(loads['files'])} files, {chars:,} chars")
+    for name, texts in loads.items():
+        before = best_time(reference_fingerprints, texts, args.repeat)
+        after = best_time(extract_fingerprints, texts, args.repeat)
+        print(f"  {name:12s} x{len(texts):<5d} {before * 1000:9.2f} -> {after * 1000:9.2f} ms  "
+              f"x{before / after:.2f}")
+
+    if mismatches:
+        print(f"\n{mismatches} texts fingerprinted differently")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+benchmark_verification.py — Offline performance benchmark for verify_citations.py.
+
+The downloaded sources are not checked in, so timing the verifier on them
+says little about how it scales and nothing reproducible. This generates
+a synthetic corpus shaped like the real one (Perseus books chunked by
+"[N]" markers, New Advent pages numbered by chapter and paragraph,
+Gutenberg texts with Vision/Similitude/CHAPTER headings) and a synthetic
+chapter citing it thousands of times. It then times citation extraction,
+reference parsing, each search strategy on its own, source indexing, and
+full verification, and writes a JSON report.
+
+The corpus is fixed by --seed and --scale and the report's keys are
+sorted, so reports from two commits diff line by line. --compare reads an
+earlier report and exits non-zero when a timing regressed.
+
+Usage:
+    poetry run python scripts/benchmark_verification.py                         # Default scale
+    poetry run python scripts/benchmark_verification.py --scale 4               # 4x corpus and citations
+    poetry run python scripts/benchmark_verification.py --output before.json
+    poetry run python scripts/benchmark_verification.py --compare before.json   # Flag regressions
+"""
+
+import argparse
+import contextlib
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import verify_citations
+from source_corpus import MappedSource, line_table_path, marker_index_path
+from source_registry import ANCIENT, PATRISTIC, SOURCES
+from verify_citations import (
+    SOURCE_CACHE,
+    _ordinal,
+    _roman,
+    extract_citations,
+    index_source_file,
+    normalize_ref,
+    search_passage_in_text,
+    verify_citation,
+)
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+REPORT_PATH = PROJECT_ROOT / "sources" / "verification_benchmark.json"
+
+PERSEUS_KEY = "bench:perseus"
+NEWADVENT_KEY = "bench:newadvent"
+GUTENBERG_KEY = "bench:gutenberg"
+
+# Corpus size at --scale 1: Perseus books of ~650 sections like War book 4
+# (chunked every 4-12 sections, 77 markers in the real book), New Advent
+# books of 40 chapters, and citations per synthetic chapter.
+PERSEUS_BOOKS = 7
+PERSEUS_SECTIONS = 650
+NEWADVENT_BOOKS = 5
+NEWADVENT_CHAPTERS = 40
+GUTENBERG_CHAPTERS = 120
+CITATIONS = 3000
+HINTED_SECTIONS = 20
+
+# Timings slower than the baseline by more than this fraction are reported
+# as regressions by --compare.
+DEFAULT_TOLERANCE = 0.25
+
+_WORDS = (
+    "the Romans Jews city Cesarea governor multitude temple army Vespasian "
+    "and of to were slain wall night people Galilee priests seditious gates "
+    "fled tower Jerusalem Titus legions siege famine"
+).split()
+
+# Distinct phrases the Gutenberg text carries once each, registered as
+# passage hints so Strategy 1 has something to find.
+_HINT_WORDS = (
+    "amber basalt cedar dolomite ebony flint garnet hyssop iron jasper "
+    "kermes lapis marble nard onyx porphyry quartz resin sard topaz"
+).split()
+
+
+def _filler(rng, lines):
+    """Return narrative lines free of digits, so the only numbers in a
+    synthetic book are the ones placed on purpose."""
+    return [" ".join(rng.choice(_WORDS) for _ in range(12)) + "." for _ in range(lines)]
+
+
+def _hint_phrase(n):
+    word = _HINT_WORDS[n % len(_HINT_WORDS)]
+    return f"stone of {word} number {_roman(n + 1).lower()}"
+
+
+def generate_corpus(corpus_dir, seed=0, scale=1.0):
+    """Write the synthetic sources and chapter under corpus_dir.
+
+    Returns the registry entries to install and the workloads: for each
+    search strategy, the (path, passage, key) triples built so that this
+    strategy is the one that answers them.
+    """
+    rng = random.Random(seed)
+    workloads = {name: [] for name in ("hints", "section_markers", "number", "chunk_anchor", "not_found")}
+
+    # Perseus: "[\nN\n]" at the start of each chunk, the way the cleaned
+    # HTML lays markers out. A section inside a chunk is found by its number
+    # in the margin (Strategy 3, sections past 100) or anchored at its
+    # chunk's marker (Strategy 4).
+    perseus_dir = corpus_dir / ANCIENT / PERSEUS_KEY.replace(":", "_")
+    perseus_dir.mkdir(parents=True, exist_ok=True)
+    for book in range(1, max(1, round(PERSEUS_BOOKS * scale)) + 1):
+        lines = [f"Book {_roman(book)}"]
+        section = 1
+        while section <= PERSEUS_SECTIONS:
+            chunk_end = min(PERSEUS_SECTIONS, section + rng.randint(3, 11))
+            lines += ["[", str(section), "]"]
+            workloads["section_markers"].append((book, f"{book}.{section}"))
+            for inner in range(section, chunk_end + 1):
+                lines += _filler(rng, rng.randint(2, 4))
+                if inner == section:
+                    continue
+                if inner > 100 and rng.random() < 0.1:
+                    lines.append(f"This is the passage numbered {inner} in the margin.")
+                    workloads["number"].append((book, f"{book}.{inner}"))
+                else:
+                    workloads["chunk_anchor"].append((book, f"{book}.{inner}"))
+            section = chunk_end + 1
+        workloads["not_found"].append((book, f"{book}.{PERSEUS_SECTIONS + 100}"))
+        (perseus_dir / f"book{book}.txt").write_text("\n".join(lines), encoding="utf-8")
+    for name in ("section_markers", "number", "chunk_anchor", "not_found"):
+        workloads[name] = [
+            (perseus_dir / f"book{book}.txt", passage, PERSEUS_KEY)
+            for book, passage in workloads[name]
+        ]
+
+    # New Advent: "Chapter N." headings over paragraphs "1. ", "2. ", ...
+    # that restart in every chapter.
+    newadvent_dir = corpus_dir / PATRISTIC / NEWADVENT_KEY.replace(":", "_")
+    newadvent_dir.mkdir(parents=True, exist_ok=True)
+    for book in range(1, max(1, round(NEWADVENT_BOOKS * scale)) + 1):
+        lines = ["Home > Fathers of the Church", f"Book {_roman(book)}", ""]
+        for chapter in range(1, NEWADVENT_CHAPTERS + 1):
+            lines += [f"Chapter {chapter}.", ""]
+            for paragraph in range(1, rng.randint(3, 9) + 1):
+                lines += [f"{paragraph}. " + " ".join(_filler(rng, 3)), ""]
+            workloads["section_markers"].append(
+                (newadvent_dir / f"book{book}.txt", f"{book}.{chapter}.{paragraph}", NEWADVENT_KEY)
+            )
+        (newadvent_dir / f"book{book}.txt").write_text("\n".join(lines), encoding="utf-8")
+
+    # Gutenberg: license header with its own numbers, then Visions and
+    # Similitudes with roman numerals and CHAPTER headings, and the hinted
+    # phrases scattered through.
+    gutenberg_dir = corpus_dir / PATRISTIC / GUTENBERG_KEY.replace(":", "_")
+    gutenberg_dir.mkdir(parents=True, exist_ok=True)
+    lines = [
+        "The Project Gutenberg EBook of The Shepherd, by Hermas",
+        "Release Date: March 4, 2009 [EBook #8200]",
+        "*** START OF THIS PROJECT GUTENBERG EBOOK ***",
+        "",
+    ]
+    hinted = max(1, round(HINTED_SECTIONS * scale))
+    hints = {}
+    chapters = max(1, round(GUTENBERG_CHAPTERS * scale))
+    for chapter in range(1, chapters + 1):
+        if chapter % 12 == 1:
+            part = chapter // 12 + 1
+            heading = f"VISION {_roman(part)}" if part <= 5 else f"SIMILITUDE {_roman(part - 5)}"
+            lines += ["", heading, ""]
+            keyword = "Vision" if part <= 5 else "Similitude"
+            number = part if part <= 5 else part - 5
+            workloads["section_markers"].append((gutenberg_dir / "full.txt", f"{keyword} {number}", GUTENBERG_KEY))
+        lines += [f"CHAPTER {_roman(chapter)}", ""] + _filler(rng, rng.randint(6, 14))
+        if chapter <= hinted:
+            hints[chapter] = [_hint_phrase(chapter)]
+            lines.append(f"And he showed me the {_hint_phrase(chapter)}.")
+            workloads["hints"].append((gutenberg_dir / "full.txt", f"§{chapter}", GUTENBERG_KEY))
+        if _ordinal(chapter) and rng.random() < 0.3:
+            workloads["section_markers"].append((gutenberg_dir / "full.txt", f"Chapter {chapter}", GUTENBERG_KEY))
+    lines += ["", "*** END OF THIS PROJECT GUTENBERG EBOOK ***"]
+    (gutenberg_dir / "full.txt").write_text("\n".join(lines), encoding="utf-8")
+
+    registry = {
+        PERSEUS_KEY: {"title": "Synthetic Perseus work", "category": ANCIENT},
+        NEWADVENT_KEY: {"title": "Synthetic New Advent work", "category": PATRISTIC},
+        GUTENBERG_KEY: {"title": "Synthetic Gutenberg work", "category": PATRISTIC, "passage_hints": hints},
+    }
+    _write_chapter(corpus_dir / "chapter_bench.tex", rng, workloads, max(1, round(CITATIONS * scale)))
+    return registry, workloads
+
+
+def _write_chapter(path, rng, workloads, citations):
+    """Write a chapter citing the workloads' passages, with the ranges,
+    bare keys, multi-key cites, quote blocks, and commented-out cites the
+    real chapters have."""
+    passages = [(passage, key) for items in workloads.values() for _, passage, key in items]
+    lines = ["\\chapter{Synthetic Benchmark Chapter}", ""]
+    for i in range(citations):
+        passage, key = rng.choice(passages)
+        kind = rng.random()
+        if kind < 0.1 and "." in passage and passage[0].isdigit():
+            start = int(passage.rsplit(".", 1)[1])
+            passage = f"{passage}--{start + rng.randint(1, 15)}"
+        prose = " ".join(rng.choice(_WORDS) for _ in range(14))
+        if kind < 0.05:
+            cite = f"\\cite{{{key}}}"
+        elif kind < 0.1:
+            cite = f"\\cite[{passage}]{{{key},{PERSEUS_KEY}}}"
+        else:
+            cite = f"\\cite[{passage}]{{{key}}}"
+        lines.append(f"\\emph{{{prose}}} {cite}.")
+        if i % 25 == 0:
+            lines += ["\\begin{quote}", " ".join(rng.choice(_WORDS) for _ in range(30)), "\\end{quote}"]
+        if i % 40 == 0:
+            lines.append(f"% {cite} left out of this draft")
+        if i % 8 == 7:
+            lines.append("")
+    path.write_text("\n".join(lines), encoding="utf-8")
+
+
+@contextlib.contextmanager
+def synthetic_sources(corpus_dir, registry):
+    """Point the verifier at the synthetic corpus and registry entries for
+    the duration of the block."""
+    saved_dir = verify_citations.SOURCES_DIR
+    verify_citations.SOURCES_DIR = corpus_dir
+    SOURCES.update(registry)
+    SOURCE_CACHE.clear()
+    try:
+        yield
+    finally:
+        for key in registry:
+            SOURCES.pop(key, None)
+        verify_citations.SOURCES_DIR = saved_dir
+        SOURCE_CACHE.clear()
+
+
+def _measure(run, repeat, setup=None):
+    """Time run() repeat times, calling setup() untimed before each, and
+    return the best and median totals and run()'s last result."""
+    totals = []
+    result = None
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        result = run()
+        totals.append(time.perf_counter() - start)
+    return {"best_s": round(min(totals), 6), "median_s": round(statistics.median(totals), 6)}, result
+
+
+def run_benchmark(corpus_dir, seed=0, scale=1.0, repeat=3):
+    """Generate the corpus in corpus_dir, time every stage, and return the
+    report as a dict."""
+    registry, workloads = generate_corpus(corpus_dir, seed=seed, scale=scale)
+    chapter = corpus_dir / "chapter_bench.tex"
+    source_files = sorted(corpus_dir.glob("*/*/*.txt"))
+    timings = {}
+
+    def record(name, calls, run, setup=None, outcome=None):
+        entry, result = _measure(run, repeat, setup)
+        entry["calls"] = calls
+        entry["per_call_us"] = round(entry["best_s"] / max(calls, 1) * 1e6, 3)
+        if outcome is not None:
+            entry["outcome"] = outcome(result)
+        timings[name] = entry
+        return result
+
+    with synthetic_sources(corpus_dir, registry):
+        citations = record(
+            "extract_citations", 1,
+            lambda: extract_citations(chapter),
+            setup=verify_citations._load_manuscript.cache_clear,
+        )
+        passages = [c.passage for c in citations if c.passage]
+        record("normalize_ref", len(passages), lambda: [normalize_ref(p) for p in passages])
+
+        def drop_sidecars():
+            for path in source_files:
+                line_table_path(path).unlink(missing_ok=True)
+                marker_index_path(path).unlink(missing_ok=True)
+
+        record("index_source_file.scan", len(source_files),
+               lambda: [index_source_file(p) for p in source_files], setup=drop_sidecars)
+        record("index_source_file.sidecars", len(source_files),
+               lambda: [index_source_file(p) for p in source_files])
+
+        # Each strategy on its own workload, against sources already indexed
+        # and cached, so only the search itself is timed.
+        for name, items in workloads.items():
+            jobs = [(SOURCE_CACHE.load(path), passage, key) for path, passage, key in items]
+            record(
+                f"search.{name}", len(jobs),
+                lambda jobs=jobs: [search_passage_in_text(s, p, k) for s, p, k in jobs],
+                outcome=lambda snippets: sum(1 for s in snippets if s),
+            )
+
+        def verify_all():
+            fresh = extract_citations(chapter)
+            for citation in fresh:
+                verify_citation(citation)
+            return fresh
+
+        def statuses(verified):
+            counts = {}
+            for citation in verified:
+                counts[citation.status] = counts.get(citation.status, 0) + 1
+            return counts
+
+        record("verify_citation.cold", len(citations), verify_all,
+               setup=SOURCE_CACHE.clear, outcome=statuses)
+        record("verify_citation.warm", len(citations), verify_all, outcome=statuses)
+
+    return {
+        "benchmark": {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "repeat": repeat,
+            "scale": scale,
+            "seed": seed,
+        },
+        "corpus": {
+            "bytes": sum(p.stat().st_size for p in source_files),
+            "chunk_markers": sum(len(MappedSource.open(p).chunk_markers) for p in source_files),
+            "citations": len(citations),
+            "files": len(source_files),
+        },
+        "timings": timings,
+    }
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=PROJECT_ROOT, capture_output=True, text=True, check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip()
+
+
+def compare_reports(baseline, current, tolerance=DEFAULT_TOLERANCE):
+    """Return (name, baseline_s, current_s, ratio) for every timing in both
+    reports, and the names of those slower than baseline by more than
+    tolerance. Best-of-repeat times are compared: they are the least
+    disturbed by whatever else the machine was doing."""
+    rows = []
+    regressions = []
+    for name in sorted(set(baseline["timings"]) & set(current["timings"])):
+        before = baseline["timings"][name]["best_s"]
+        after = current["timings"][name]["best_s"]
+        ratio = after / before if before else float("inf")
+        rows.append((name, before, after, ratio))
+        if ratio > 1 + tolerance:
+            regressions.append(name)
+    return rows, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark citation verification on a synthetic source corpus."
+    )
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="Multiply corpus size and citation count (default: 1)")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="Seed for the synthetic corpus (default: 0)")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Times each stage is run; the best and median are reported (default: 3)")
+    parser.add_argument("--output", type=Path, default=REPORT_PATH,
+                        help=f"Where to write the JSON report (default: {REPORT_PATH.relative_to(PROJECT_ROOT)})")
+    parser.add_argument("--corpus-dir", type=Path,
+                        help="Generate the corpus here and keep it (default: a temporary directory)")
+    parser.add_argument("--compare", type=Path,
+                        help="Earlier report to compare against; exit 1 on a regression")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help=f"Slowdown fraction --compare tolerates (default: {DEFAULT_TOLERANCE})")
+    args = parser.parse_args()
+
+    if args.corpus_dir:
+        args.corpus_dir.mkdir(parents=True, exist_ok=True)
+        report = run_benchmark(args.corpus_dir.resolve(), args.seed, args.scale, args.repeat)
+    else:
+        with tempfile.TemporaryDirectory(prefix="verify-bench-") as tmp:
+            report = run_benchmark(Path(tmp), args.seed, args.scale, args.repeat)
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+    corpus = report["corpus"]
+    print(f"Corpus: {corpus['files']} files, {corpus['bytes']:,} bytes, "
+          f"{corpus['chunk_markers']:,} chunk markers, {corpus['citations']:,} citations")
+    for name, entry in report["timings"].items():
+        print(f"  {name:30s} {entry['best_s'] * 1000:10.2f} ms  "
+              f"{entry['per_call_us']:10.1f} us/call  x{entry['calls']}")
+    print(f"\nReport written to: {args.output}")
+
+    if args.compare:
+        rows, regressions = compare_reports(
+            json.loads(args.compare.read_text(encoding="utf-8")), report, args.tolerance
+        )
+        print(f"\nCompared with {args.compare}:")
+        for name, before, after, ratio in rows:
+            flag = "  REGRESSION" if name in regressions else ""
+            print(f"  {name:30s} {before * 1000:10.2f} -> {after * 1000:10.2f} ms  x{ratio:.2f}{flag}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,6 +4,10 @@ download_ia_authenticated.py — Download printdisabled texts from Archive.org.
 
 Handles books in the "printdisabled" collection that require authentication.
 Uses Archive.org's lending system: borrow -> extract OCR text -> return.
+Pages are fetched a few at a time and journaled next to the book as they
+arrive (full.txt.pages.jsonl), so an interrupted run resumes where it
+stopped and a page that failed is fetched again on the next run. The
+OCR's word coordinates are kept beside the saved book (full.txt.boxes).
 
 Usage:
     poetry run python scripts/download_ia_authenticated.py              # Download all
@@ -21,6 +25,8 @@ import os
 import re
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
 from pathlib import Path
 
 # Force unbuffered output
@@ -32,7 +38,14 @@ except ImportError:
     print("Missing requests. Run: poetry add requests")
     sys.exit(1)
 
+try:
+    import orjson  # faster decoding of OCR pages (optional)
+except ImportError:
+    orjson = None
+
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from http_session import HostRateLimiter, make_session, pooled_transport
+from source_corpus import write_paged_text
 from source_registry import SOURCES, MODERN
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
@@ -48,9 +61,28 @@ if _env_path.exists():
 
 SOURCES_DIR = PROJECT_ROOT / "sources"
 PAGE_DELAY = 0.5       # Seconds between page requests
+PAGE_JOBS = 4          # Page requests in flight at once
 REQUEST_TIMEOUT = 30    # Per-request timeout
 BOOK_DELAY = 5          # Seconds between books
 
+# Pages that failed get this many more rounds after the rest of the book,
+# PAGE_RETRY_DELAY seconds apart (a page often fails while the loan is
+# still activating).
+PAGE_RETRY_ROUNDS = 2
+PAGE_RETRY_DELAY = 10
+
+# A loan lasts an hour. Pages are requested only this long after
+# borrowing; the rest are left for the next run, which borrows again.
+LOAN_WINDOW = 50 * 60
+
+# Page requests go out PAGE_DELAY apart however many workers fetch them.
+PAGE_LIMITER = HostRateLimiter(PAGE_DELAY)
+
+PAGE_TEXT_URL = (
+    "https://{server}/BookReader/BookReaderGetTextWrapper.php"
+    "?path={dir}/{identifier}_djvu.xml&page={page}"
+)
+
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
                   "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
@@ -75,8 +107,7 @@ IA_PRINTDISABLED = {
 
 def ia_login(email, password):
     """Log into Archive.org using the token-based API and return session."""
-    session = requests.Session()
-    session.headers.update(HEADERS)
+    session = make_session(HEADERS, pooled_transport(connections_per_host=PAGE_JOBS, limiter=PAGE_LIMITER))
 
     print("Logging into Archive.org...")
 
@@ -207,71 +238,306 @@ def return_book(session, identifier):
         print(f"  WARNING: Could not return book: {e}")
 
 
-def fetch_page_text(session, server, dir_path, identifier, page_num):
-    """Fetch OCR text for a single page via BookReaderGetTextWrapper."""
-    url = (
-        f"https://{server}/BookReader/BookReaderGetTextWrapper.php"
-        f"?path={dir_path}/{identifier}_djvu.xml&page={page_num}"
-    )
-    try:
-        resp = session.get(url, timeout=REQUEST_TIMEOUT)
-        if resp.status_code != 200:
-            return None
+# BookReaderGetTextWrapper.php answers with JSONP:
+#   br.ttsStartCB([["paragraph text", [left, bottom, right, top, ...], ...], ...])
+JSONP_PREFIX = "br.ttsStartCB("
+_HTML_TAG = re.compile(r"<[^>]+>")
+_WHITESPACE_RUN = re.compile(r"\s+")
 
-        text = resp.text.strip()
 
-        # Check for HTML error pages
-        if text.startswith("<!DOCTYPE") or text.startswith("<html"):
-            return None
+@dataclass
+class OcrParagraph:
+    """One paragraph of a page's OCR, with the coordinate lists that
+    followed its text in the BookReader item (empty when the response had
+    none)."""
+    text: str
+    boxes: list = field(default_factory=list)
+
+
+@dataclass
+class OcrPage:
+    paragraphs: list
+
+    @property
+    def text(self):
+        return "\n".join(paragraph.text for paragraph in self.paragraphs)
 
-        # Response format: br.ttsStartCB([["text", [coords], ...], ...])
-        # Extract the JSON array from the JSONP wrapper
-        if text.startswith("br.ttsStartCB("):
-            json_str = text[len("br.ttsStartCB("):]
-            if json_str.endswith(")"):
-                json_str = json_str[:-1]
-            try:
-                data = json.loads(json_str)
-                if isinstance(data, list):
-                    paragraphs = []
-                    for item in data:
-                        if isinstance(item, list) and len(item) > 0 and isinstance(item[0], str):
-                            paragraphs.append(item[0])
-                    return "\n".join(paragraphs)
-            except json.JSONDecodeError:
-                pass
-
-        # Fallback: try plain JSON
+
+def decode_page(content):
+    """Decode a BookReaderGetTextWrapper response body into an OcrPage, or
+    None for an error page or an empty body.
+
+    The JSONP payload is the span between the callback prefix and the
+    closing parenthesis, parsed once (with orjson when installed). Bodies
+    in another shape fall back to a plain JSON list, then to the text with
+    any HTML tags stripped.
+    """
+    text = content.decode("utf-8", errors="replace").strip()
+
+    # HTML error pages
+    if text.startswith("<!DOCTYPE") or text.startswith("<html"):
+        return None
+
+    if text.startswith(JSONP_PREFIX):
+        end = len(text) - 1 if text.endswith(")") else len(text)
+        data = _loads_or_none(text[len(JSONP_PREFIX):end])
+        if isinstance(data, list):
+            return OcrPage([
+                OcrParagraph(item[0], item[1:])
+                for item in data
+                if isinstance(item, list) and item and isinstance(item[0], str)
+            ])
+
+    data = _loads_or_none(text)
+    if isinstance(data, list):
+        paragraphs = []
+        for item in data:
+            if isinstance(item, list) and item and isinstance(item[0], str):
+                paragraphs.append(OcrParagraph(item[0], item[1:]))
+            elif isinstance(item, str):
+                paragraphs.append(OcrParagraph(item))
+        return OcrPage(paragraphs)
+
+    if "<" in text:
+        clean = _WHITESPACE_RUN.sub(" ", _HTML_TAG.sub(" ", text)).strip()
+        if clean:
+            return OcrPage([OcrParagraph(clean)])
+
+    return OcrPage([OcrParagraph(text)]) if text else None
+
+
+def _loads_or_none(payload):
+    """Parse payload as JSON, or return None when it is not JSON."""
+    if orjson is not None:
         try:
-            data = json.loads(text)
-            if isinstance(data, list):
-                paragraphs = []
-                for item in data:
-                    if isinstance(item, list) and len(item) > 0 and isinstance(item[0], str):
-                        paragraphs.append(item[0])
-                    elif isinstance(item, str):
-                        paragraphs.append(item)
-                return "\n".join(paragraphs)
-        except json.JSONDecodeError:
-            pass
+            return orjson.loads(payload)
+        except orjson.JSONDecodeError:
+            pass  # e.g. a lone surrogate escape, which json accepts
+    try:
+        return json.loads(payload)
+    except json.JSONDecodeError:
+        return None
 
-        # Fallback: strip HTML tags if present
-        if "<" in text:
-            clean = re.sub(r"<[^>]+>", " ", text)
-            clean = re.sub(r"\s+", " ", clean).strip()
-            if clean:
-                return clean
 
-        return text if text else None
+def fetch_page(session, server, dir_path, identifier, page_num):
+    """Fetch the OCR of a single page via BookReaderGetTextWrapper.
 
+    Returns an OcrPage, or None when the page could not be fetched.
+    """
+    url = PAGE_TEXT_URL.format(server=server, dir=dir_path, identifier=identifier, page=page_num)
+    PAGE_LIMITER.wait(url)
+    try:
+        resp = session.get(url, timeout=REQUEST_TIMEOUT)
     except requests.RequestException:
         return None
+    if resp.status_code != 200:
+        return None
+    # The body is decoded as UTF-8 directly: resp.text on a response
+    # without a charset would guess the encoding from the bytes first.
+    return decode_page(resp.content)
+
+
+def fetch_page_text(session, server, dir_path, identifier, page_num):
+    """Fetch OCR text for a single page, or None when it could not be fetched."""
+    page = fetch_page(session, server, dir_path, identifier, page_num)
+    return None if page is None else page.text
+
+
+def page_journal_path(dest_path):
+    """Return where the pages of the book saved at dest_path are journaled."""
+    return dest_path.with_name(dest_path.name + ".pages.jsonl")
+
+
+def page_boxes_path(dest_path):
+    """Return where the word coordinates of the book saved at dest_path are
+    kept: {"size": size of the book, "pages": {leaf: boxes}}, where boxes
+    holds each paragraph's coordinate lists (OcrParagraph.boxes)."""
+    return dest_path.with_name(dest_path.name + ".boxes")
+
+
+def read_page_journal(journal_path, identifier, page_count):
+    """Return {page number: text} journaled for this book, or None when
+    there is no journal or it belongs to another item or page count.
+
+    A line cut short by a crash is skipped; its page is fetched again.
+    """
+    try:
+        lines = journal_path.read_text(encoding="utf-8").splitlines()
+    except OSError:
+        return None
+    try:
+        header = json.loads(lines[0])
+    except (IndexError, json.JSONDecodeError):
+        return None
+    if header != {"identifier": identifier, "pages": page_count}:
+        return None
+
+    pages = {}
+    for line in lines[1:]:
+        try:
+            entry = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        pages[entry["page"]] = entry["text"]
+    return pages
+
+
+def read_journaled_boxes(journal_path):
+    """Return {page number: boxes} for the journaled pages that had word
+    coordinates."""
+    boxes = {}
+    for line in journal_path.read_text(encoding="utf-8").splitlines()[1:]:
+        try:
+            entry = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if "boxes" in entry:
+            boxes[entry["page"]] = entry["boxes"]
+    return boxes
+
+
+def _open_page_journal(journal_path, identifier, page_count, resuming):
+    """Open the journal for appending, starting a new one unless resuming."""
+    journal_path.parent.mkdir(parents=True, exist_ok=True)
+    if not resuming:
+        journal = open(journal_path, "w", encoding="utf-8")
+        _journal_write(journal, {"identifier": identifier, "pages": page_count})
+        return journal
+    with open(journal_path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        complete = f.read(1) == b"\n"
+    journal = open(journal_path, "a", encoding="utf-8")
+    if not complete:
+        journal.write("\n")  # end the line a crash cut short
+    return journal
+
+
+def _journal_write(journal, entry):
+    journal.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    journal.flush()
+
+
+def fetch_pages(session, meta, pages, journal, deadline):
+    """Fetch every page not in pages, PAGE_JOBS at a time, adding each to
+    pages and the journal (with its word coordinates, if any) as it
+    arrives.
+
+    Pages that failed are tried again after the rest, for up to
+    PAGE_RETRY_ROUNDS more rounds. No page is requested after deadline
+    (time.monotonic()), when the loan may have run out. Returns the page
+    numbers still missing.
+    """
+    missing = [n for n in range(meta["pages"]) if n not in pages]
+
+    def fetch(page_num):
+        if time.monotonic() > deadline:
+            return None
+        return fetch_page(session, meta["server"], meta["dir"], meta["identifier"], page_num)
+
+    with ThreadPoolExecutor(max_workers=PAGE_JOBS) as pool:
+        for round_num in range(PAGE_RETRY_ROUNDS + 1):
+            if not missing or time.monotonic() > deadline:
+                break
+            if round_num:
+                print(f"  Retrying {len(missing)} failed page(s)...")
+                time.sleep(PAGE_RETRY_DELAY)
+            failed = []
+            futures = {pool.submit(fetch, page_num): page_num for page_num in missing}
+            for future in as_completed(futures):
+                page_num = futures[future]
+                page = future.result()
+                if page is None:
+                    failed.append(page_num)
+                    continue
+                pages[page_num] = page.text
+                entry = {"page": page_num, "text": page.text}
+                if any(paragraph.boxes for paragraph in page.paragraphs):
+                    entry["boxes"] = [paragraph.boxes for paragraph in page.paragraphs]
+                _journal_write(journal, entry)
+                if len(pages) % 50 == 0:
+                    print(f"  Progress: {len(pages)}/{meta['pages']} pages")
+            missing = sorted(failed)
+    return missing
+
+
+# A printed page number in the OCR of a page's first or last line: the
+# number alone ("123"), or at either end of an all-capitals running head
+# ("124 THE ZEALOTS", "JESUS AND THE ZEALOTS 125").
+_PAGE_NUMBER_LINES = (
+    re.compile(r"^\s*(\d{1,4})\s*$"),
+    re.compile(r"^\s*(\d{1,4})\s+[^a-z\d]*[A-Z][^a-z\d]*$"),
+    re.compile(r"^[^a-z\d]*[A-Z][^a-z\d]*?\s(\d{1,4})\s*$"),
+)
+
+# A page number read from a page counts only if another page within this
+# many leaves reads as the same run of numbering.
+PAGE_NUMBER_CONFIRM = 5
+
+
+def printed_page_labels(pages):
+    """Return {leaf: printed page number or None} for pages, a {leaf:
+    text} of the scanned pages.
+
+    A page number is read from the first or last line of a page's text,
+    and kept only if a nearby page's number is as far from its leaf: a
+    chapter number, a year or a footnote numeral in that position does not
+    line up with its neighbours. Pages with no number of their own (chapter
+    openings, blank versos) are numbered from the nearest kept number before
+    them, so a plate inserted without numbering shifts only the pages after
+    it; the plate itself, whose number a printed page carries, gets None,
+    as do leaves numbered below 1 (front matter).
+    """
+    offsets = {}
+    for leaf, text in pages.items():
+        lines = [line for line in text.split("\n") if line.strip()]
+        for line in lines[:1] + lines[-1:]:
+            number = _page_number(line)
+            if number is not None:
+                offsets[leaf] = number - leaf
+                break
+
+    confirmed = sorted(
+        (leaf, offset) for leaf, offset in offsets.items()
+        if any(
+            offsets.get(other) == offset
+            for other in range(leaf - PAGE_NUMBER_CONFIRM, leaf + PAGE_NUMBER_CONFIRM + 1)
+            if other != leaf
+        )
+    )
+    if not confirmed:
+        return {leaf: None for leaf in pages}
+    printed = {leaf: leaf + offset for leaf, offset in confirmed}
+    printed_numbers = set(printed.values())
+    labels = {}
+    position = 0
+    for leaf in sorted(pages):
+        while position + 1 < len(confirmed) and confirmed[position + 1][0] <= leaf:
+            position += 1
+        number = leaf + confirmed[position][1]
+        if leaf not in printed and number in printed_numbers:
+            number = 0  # the plate before a shift: its number is taken
+        labels[leaf] = str(number) if number >= 1 else None
+    return labels
+
+
+def _page_number(line):
+    for pattern in _PAGE_NUMBER_LINES:
+        match = pattern.match(line)
+        if match:
+            return int(match.group(1))
+    return None
 
 
 def download_book_text(session, identifier, dest_path, dry_run=False):
-    """Download full book text via BookReader page-by-page OCR extraction."""
+    """Download full book text via BookReader page-by-page OCR extraction.
 
-    if dest_path.exists() and dest_path.stat().st_size > 1000:
+    Each page is journaled next to dest_path as it arrives, so a run that
+    dies or runs out of loan time resumes from the pages still missing.
+    The journal is removed once every page is in the saved text.
+    """
+    journal_path = page_journal_path(dest_path)
+
+    if dest_path.exists() and dest_path.stat().st_size > 1000 and not journal_path.exists():
         print(f"  SKIP (exists): {dest_path.name} ({dest_path.stat().st_size:,} bytes)")
         return True
 
@@ -290,8 +556,15 @@ def download_book_text(session, identifier, dest_path, dry_run=False):
         print("  ERROR: No pages found.")
         return False
 
+    pages = read_page_journal(journal_path, identifier, meta["pages"])
+    resuming = pages is not None
+    if resuming:
+        print(f"  Resuming: {len(pages)}/{meta['pages']} pages already fetched")
+    else:
+        pages = {}
+
     if dry_run:
-        print(f"  WOULD DOWNLOAD: {meta['pages']} pages from {meta['server']}")
+        print(f"  WOULD DOWNLOAD: {meta['pages'] - len(pages)} pages from {meta['server']}")
         print(f"    -> {dest_path}")
         return True
 
@@ -302,56 +575,43 @@ def download_book_text(session, identifier, dest_path, dry_run=False):
 
     # Give the loan a moment to activate
     time.sleep(2)
+    deadline = time.monotonic() + LOAN_WINDOW
 
-    # Fetch text page by page
-    all_pages = []
-    errors = 0
-    empty = 0
-
-    for page_num in range(meta["pages"]):
-        text = fetch_page_text(
-            session, meta["server"], meta["dir"], identifier, page_num
-        )
-
-        if text is None:
-            errors += 1
-            if errors <= 3:
-                print(f"  Page {page_num}: ERROR (will retry)")
-            elif errors == 4:
-                print(f"  (suppressing further error messages...)")
-        elif len(text.strip()) < 5:
-            empty += 1
-        else:
-            all_pages.append(text)
-
-        # Progress every 50 pages
-        if (page_num + 1) % 50 == 0:
-            print(
-                f"  Progress: {page_num + 1}/{meta['pages']} pages "
-                f"({len(all_pages)} with text, {errors} errors, {empty} empty)"
-            )
-
-        time.sleep(PAGE_DELAY)
-
-    # Return the book
-    return_book(session, identifier)
-
-    # Check results
-    total_text = "\n\n".join(all_pages)
+    # The loan is returned however fetching ends, so a crash does not
+    # leave the book checked out.
+    try:
+        with _open_page_journal(journal_path, identifier, meta["pages"], resuming) as journal:
+            missing = fetch_pages(session, meta, pages, journal, deadline)
+    finally:
+        return_book(session, identifier)
+
+    kept = [n for n in sorted(pages) if len(pages[n].strip()) >= 5]
+    empty = len(pages) - len(kept)
+    total_text = "\n\n".join(pages[n] for n in kept)
     print(
-        f"  Result: {len(all_pages)} pages with text, "
-        f"{errors} errors, {empty} empty pages"
+        f"  Result: {len(kept)} pages with text, "
+        f"{len(missing)} missing, {empty} empty pages"
     )
     print(f"  Total text: {len(total_text):,} chars")
+    if missing:
+        shown = ", ".join(str(n) for n in missing[:10])
+        more = f" and {len(missing) - 10} more" if len(missing) > 10 else ""
+        print(f"  WARNING: pages {shown}{more} still missing; run again to fetch them")
 
     if len(total_text) < 1000:
         print("  ERROR: Too little text extracted. The borrowing may have failed.")
         return False
 
-    # Save
-    dest_path.parent.mkdir(parents=True, exist_ok=True)
-    dest_path.write_text(total_text, encoding="utf-8")
+    # Save, with the page table a citation by page number is looked up in
+    labels = printed_page_labels(pages)
+    write_paged_text(dest_path, [(labels[n], n, pages[n]) for n in kept])
+    boxes = read_journaled_boxes(journal_path)
+    if boxes:
+        table = {"size": dest_path.stat().st_size, "pages": {n: boxes[n] for n in kept if n in boxes}}
+        page_boxes_path(dest_path).write_text(json.dumps(table), encoding="utf-8")
     print(f"  SAVED: {dest_path.name} ({len(total_text):,} chars)")
+    if not missing:
+        journal_path.unlink()
     return True
 
 
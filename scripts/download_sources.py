@@ -10,19 +10,24 @@ Usage:
     poetry run python scripts/download_sources.py --category ancient  # Ancient only
     poetry run python scripts/download_sources.py --key josephus:war  # Single source
     poetry run python scripts/download_sources.py --dry-run           # Show what would download
+    poetry run python scripts/download_sources.py --jobs 1            # One host at a time
+    poetry run python scripts/download_sources.py --refresh           # Re-fetch pages that changed
+    poetry run python scripts/download_sources.py --reclean           # Rebuild .txt from cached pages, offline
 """
 
 import argparse
 import os
 import re
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from urllib.parse import urlparse
 
 try:
     import requests
-    from bs4 import BeautifulSoup
+    import bs4  # noqa: F401 -- html_extract reads entities with it
 except ImportError:
     print("Missing dependencies. Run: poetry add requests beautifulsoup4")
     sys.exit(1)
@@ -43,11 +48,16 @@ from source_registry import (
     get_sources_by_category,
     get_downloadable_sources,
 )
+from html_extract import extract_text
+from http_cache import HttpCache
+from http_session import CONNECTIONS_PER_HOST, HostRateLimiter, make_session, pooled_transport
+from source_corpus import MappedSource, chunk_marker_numbers
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 SOURCES_DIR = PROJECT_ROOT / "sources"
-REQUEST_DELAY = 3  # Seconds between requests (polite crawling)
-MAX_RETRIES = 3    # Number of retry attempts per URL
+REQUEST_DELAY = 3  # Seconds between requests to one host (polite crawling)
+DOWNLOAD_JOBS = 8  # Hosts downloaded from at once
+MAX_RETRIES = 3    # Attempts per URL
 REQUEST_TIMEOUT = 60  # Seconds
 
 # Common headers to avoid being blocked
@@ -58,6 +68,19 @@ HEADERS = {
     "Accept-Language": "en-US,en;q=0.5",
 }
 
+RATE_LIMITER = HostRateLimiter(REQUEST_DELAY)
+
+# One pooled session for every download thread; it retries transient
+# failures (Perseus answers 503 intermittently) with REQUEST_DELAY backoff,
+# each retry also waiting for its host's turn with RATE_LIMITER.
+HTTP = make_session(HEADERS, pooled_transport(
+    retries=MAX_RETRIES - 1, backoff=REQUEST_DELAY, limiter=RATE_LIMITER,
+))
+
+# Raw responses of every page and Perseus chunk fetched, so --reclean can
+# rebuild the .txt files after a cleaner change without downloading again.
+RAW_CACHE = HttpCache(SOURCES_DIR / ".http_cache")
+
 # Minimum acceptable file size (chars) — below this, treat as stub/redirect
 MIN_TEXT_SIZE = {
     "newadvent.org": 500,       # New Advent pages should be substantial
@@ -68,136 +91,27 @@ MIN_TEXT_SIZE = {
 }
 
 
-def clean_html_to_text(html_content, url=""):
-    """Extract readable text from HTML, removing navigation, scripts, etc."""
-    soup = BeautifulSoup(html_content, "html.parser")
+# Progress lines of the source a download thread is working on, held so
+# download_all can print each source's lines together (None: print now).
+_output = threading.local()
 
-    # Remove script, style, nav elements
-    for tag in soup(["script", "style", "nav", "header", "footer", "aside"]):
-        tag.decompose()
 
-    # For Perseus, find the main text div
-    if "perseus.tufts.edu" in url:
-        text_div = soup.find("div", class_="text_container")
-        if not text_div:
-            text_div = soup.find("div", id="text_container")
-        if text_div:
-            soup = text_div
-
-    # For New Advent, find the main content
-    elif "newadvent.org" in url:
-        # New Advent uses various structures. Try multiple selectors:
-        content = None
-        # Try <div class="entry-content"> (newer pages)
-        content = soup.find("div", class_="entry-content")
-        if not content:
-            # Try the body element directly — strip nav/sidebar
-            body = soup.find("body")
-            if body:
-                # Remove navigation, sidebar, footer elements
-                for tag in body(["nav", "header", "footer", "aside",
-                                 "script", "style"]):
-                    tag.decompose()
-                # Remove common nav/menu divs
-                for div in body.find_all("div", class_=re.compile(
-                        r"nav|menu|sidebar|footer|header", re.I)):
-                    div.decompose()
-                content = body
-        if content:
-            soup = content
-
-    # For LacusCurtius, find the text body
-    elif "penelope.uchicago.edu" in url:
-        content = soup.find("div", class_="text")
-        if not content:
-            content = soup.find("td", class_="text")
-        if content:
-            soup = content
-
-    # For Early Jewish Writings — full text is in the body, not a specific div
-    elif "earlyjewishwritings.com" in url:
-        body = soup.find("body")
-        if body:
-            for tag in body(["nav", "header", "footer", "script", "style"]):
-                tag.decompose()
-            soup = body
-
-    # For Early Christian Writings — text is in div#infolayer or body
-    elif "earlychristianwritings.com" in url:
-        content = soup.find("div", id="infolayer")
-        if not content:
-            body = soup.find("body")
-            if body:
-                for tag in body(["nav", "header", "footer", "script", "style"]):
-                    tag.decompose()
-                content = body
-        if content:
-            soup = content
-
-    # For tertullian.org — text is in body, strip navigation
-    elif "tertullian.org" in url:
-        # tertullian.org sometimes has malformed tags (e.g. </style without >)
-        # which causes html.parser to fail. Re-parse if body not found.
-        body = soup.find("body")
-        if not body:
-            import re as _re
-            fixed_html = _re.sub(r'</style(?!\s*>)', '</style>', html_content, flags=_re.I)
-            soup = BeautifulSoup(fixed_html, "html.parser")
-            body = soup.find("body")
-        if body:
-            for tag in body(["nav", "header", "footer", "script", "style"]):
-                tag.decompose()
-            soup = body
-
-    # For Project Gutenberg — text is in body, strip nav
-    elif "gutenberg.org" in url:
-        body = soup.find("body")
-        if body:
-            for tag in body(["nav", "header", "footer", "script", "style"]):
-                tag.decompose()
-            soup = body
-
-    # For Attalus.org — text is in body
-    elif "attalus.org" in url:
-        body = soup.find("body")
-        if body:
-            for tag in body(["nav", "header", "footer", "script", "style"]):
-                tag.decompose()
-            soup = body
-
-    # For Wikisource — main content in div.mw-parser-output
-    elif "wikisource.org" in url:
-        content = soup.find("div", class_="mw-parser-output")
-        if not content:
-            body = soup.find("body")
-            if body:
-                for tag in body(["nav", "header", "footer", "script", "style"]):
-                    tag.decompose()
-                content = body
-        if content:
-            # Remove edit links, navigation boxes, etc.
-            for tag in content.find_all("span", class_="mw-editsection"):
-                tag.decompose()
-            for tag in content.find_all("div", class_=re.compile(r"nav|catlinks|mw-jump")):
-                tag.decompose()
-            soup = content
-
-    # Get text and clean up
-    text = soup.get_text(separator="\n")
-
-    # Clean up whitespace
-    lines = []
-    for line in text.split("\n"):
-        line = line.strip()
-        if line:
-            lines.append(line)
-
-    text = "\n".join(lines)
-
-    # Remove excessive blank lines
-    text = re.sub(r"\n{3,}", "\n\n", text)
-
-    return text.strip()
+def _log(message):
+    """Print a progress line, or hold it for the source this thread is
+    downloading (see download_all)."""
+    lines = getattr(_output, "lines", None)
+    if lines is None:
+        print(message)
+    else:
+        lines.append(message)
+
+
+def clean_html_to_text(html_content, url=""):
+    """Extract readable text from HTML, removing navigation, scripts, etc.
+
+    What to keep on each site is its profile in html_extract.SITE_PROFILES.
+    """
+    return extract_text(html_content, url)
 
 
 def _get_min_size(url):
@@ -209,23 +123,38 @@ def _get_min_size(url):
 
 
 # Section markers as they appear in extracted Perseus text: "[261]" bracket
-# style or a bare number on its own line. Numbers above this bound are years,
-# Stephanus pages, or other numerals, not section markers.
+# style or a bare number on its own line, read by the same scanner the
+# verifier anchors citations with (source_corpus.chunk_marker_numbers).
+# Numbers above this bound are years, Stephanus pages, or other numerals,
+# not section markers.
 MAX_SECTION_MARKER = 2000
 
+# Chunks of one Perseus book fetched in order before the rest is planned,
+# to learn how many sections a chunk spans; then chunks fetched at once.
+# Perseus still gets one request per REQUEST_DELAY (RATE_LIMITER): fetching
+# in parallel overlaps each response's transfer with the wait for the next
+# slot, instead of adding the two. HTTP keeps this many connections open
+# to a host.
+PERSEUS_SAMPLE_CHUNKS = 2
+PERSEUS_CHUNK_JOBS = CONNECTIONS_PER_HOST
+
+# Chunk links planned per round. Each round is planned from every chunk
+# fetched so far; a plan for the whole book from the first two chunks
+# fetched up to twice the chunks there are when chunk sizes vary (4-12
+# sections in War book 4), while rounds this size stay within a few
+# percent of one fetch per chunk. The limiter spaces the fetches anyway,
+# so more rounds cost little time.
+PERSEUS_ROUND_FETCHES = 4 * PERSEUS_CHUNK_JOBS
+
 
 def _present_sections(text):
     """Return the set of section numbers whose markers appear in text."""
-    sections = set()
-    for match in re.finditer(r"\[\s*(\d+)\s*\]", text):
-        number = int(match.group(1))
-        if number <= MAX_SECTION_MARKER:
-            sections.add(number)
-    for match in re.finditer(r"^\s*(\d+)\s*$", text, re.MULTILINE):
-        number = int(match.group(1))
-        if number <= MAX_SECTION_MARKER:
-            sections.add(number)
-    return sections
+    return {
+        number
+        for line in text.split("\n")
+        for number in chunk_marker_numbers(line)
+        if number <= MAX_SECTION_MARKER
+    }
 
 
 def perseus_section_links(html, doc):
@@ -234,7 +163,7 @@ def perseus_section_links(html, doc):
     return sorted({int(s) for s in re.findall(pattern, html)})
 
 
-def complete_perseus_book(url, html, text):
+def complete_perseus_book(url, html, text, offline=False):
     """Build a chunked Perseus book from its section chunks.
 
     Perseus renders only the first chunk of a large book at its book URL
@@ -242,11 +171,20 @@ def complete_perseus_book(url, html, text):
     full carries a section marker only where a chunk happens to start, so
     most cited sections have no marker to locate. The page's navigation
     lists a link per section of the requested book; each section link
-    renders the whole chunk containing it, with the chunk's markers. Walk
-    those links in order, skipping sections whose markers fetched chunks
-    already carry, and build the book from the chunks alone. Raises
-    requests.RequestException on a failed chunk fetch so the caller's
-    retry loop sees the failure instead of caching a partial book.
+    renders the whole chunk containing it, with the chunk's markers.
+
+    Fetching those links one by one, skipping sections already covered,
+    costs one round trip per chunk in turn. Instead the first few chunks
+    are fetched in order to learn how many sections a chunk spans; then,
+    round by round, the next PERSEUS_ROUND_FETCHES links are planned with
+    the longest chunk seen so far as the stride (plan_section_fetches)
+    and fetched PERSEUS_CHUNK_JOBS at a time. A chunk shorter than the
+    stride leaves a gap, planned again in a later round. The book is
+    built from the chunks alone, in marker order.
+
+    Raises requests.RequestException on a chunk fetch that failed through
+    HTTP's retries, so the caller reports the failure instead of caching a
+    partial book. Offline, chunks come from the raw cache only.
     """
     doc_match = re.search(r"doc=([^&]+)", url)
     if not doc_match:
@@ -256,125 +194,230 @@ def complete_perseus_book(url, html, text):
     if not sections:
         return text
 
-    covered = set()
-    pieces = []
-    fetches = 0
+    chunks = []       # (requested section, markers, chunk text)
+    covered = set()   # sections whose markers a fetched chunk carries
+    requested = set()
+
+    def take(section, chunk_text):
+        markers = _present_sections(chunk_text)
+        chunks.append((section, markers, chunk_text))
+        covered.update(markers)
+        requested.add(section)
+
     for section in sections:
-        if section in covered:
-            continue
-        chunk_url = (
-            f"https://www.perseus.tufts.edu/hopper/text?doc={doc}"
-            f"%3Asection%3D{section}"
-        )
-        # Perseus returns intermittent 503s; retry the chunk itself so one
-        # transient failure does not restart the whole book.
-        for attempt in range(1, MAX_RETRIES + 1):
-            time.sleep(REQUEST_DELAY * attempt)
-            try:
-                resp = requests.get(
-                    chunk_url, headers=HEADERS, timeout=REQUEST_TIMEOUT
-                )
-                resp.raise_for_status()
+        if len(chunks) == PERSEUS_SAMPLE_CHUNKS:
+            break
+        if section not in covered:
+            take(section, _perseus_chunk(doc, section, offline))
+
+    rounds = 1
+    with ThreadPoolExecutor(max_workers=PERSEUS_CHUNK_JOBS) as pool:
+        while True:
+            stride = _chunk_stride(sections, [markers for _, markers, _ in chunks])
+            plan = plan_section_fetches(sections, covered | requested, stride)[:PERSEUS_ROUND_FETCHES]
+            if not plan:
                 break
-            except requests.RequestException:
-                if attempt == MAX_RETRIES:
-                    raise
-        chunk_text = clean_html_to_text(resp.text, chunk_url)
-        fetches += 1
-        new_sections = _present_sections(chunk_text) - covered
-        if not new_sections and pieces:
+            rounds += 1
+            fetched = pool.map(lambda section: _perseus_chunk(doc, section, offline), plan)
+            for section, chunk_text in zip(plan, fetched):
+                take(section, chunk_text)
+
+    _log(f"  Perseus: fetched {len(chunks)} more chunk(s) in {rounds} round(s) "
+         f"to complete the book")
+    return "\n".join(_chunks_in_marker_order(chunks))
+
+
+def plan_section_fetches(sections, covered, stride):
+    """Return the section links to fetch next: in each run of sections not
+    yet covered, the run's first section and every stride-th after it.
+
+    The first uncovered section after a fetched chunk starts the next
+    chunk, so with chunks of stride sections each planned link lands on a
+    chunk start and the plan covers the run with one fetch per chunk.
+    """
+    plan = []
+    since_planned = None  # sections passed since the last planned one
+    for section in sections:
+        if section in covered:
+            since_planned = None
+        elif since_planned is None or since_planned == stride:
+            plan.append(section)
+            since_planned = 1
+        else:
+            since_planned += 1
+    return plan
+
+
+def _chunk_stride(sections, chunk_markers):
+    """Return how many of the book's sections the longest chunk fetched
+    spans (at least 1). The longest, so two planned links rarely fall in
+    one chunk: a link stepping over a shorter chunk only leaves a gap
+    for a later round, while two links into one chunk waste a request."""
+    listed = set(sections)
+    spans = [len(markers & listed) for markers in chunk_markers]
+    return max(spans, default=1) or 1
+
+
+def _perseus_chunk(doc, section, offline=False):
+    """Fetch the chunk containing section and return its text."""
+    chunk_url = (
+        f"https://www.perseus.tufts.edu/hopper/text?doc={doc}"
+        f"%3Asection%3D{section}"
+    )
+    # HTTP retries a chunk that fails transiently, so one Perseus 503
+    # does not restart the whole book.
+    resp = fetch(chunk_url, offline=offline)
+    resp.raise_for_status()
+    return clean_html_to_text(resp.text, chunk_url)
+
+
+def _chunks_in_marker_order(chunks):
+    """Return the texts of chunks ordered by their first marker, dropping
+    chunks whose markers earlier chunks already carry (two links into the
+    same chunk). A chunk without markers sorts at the section it was
+    requested for and is kept only when it is the only chunk."""
+    pieces = []
+    seen = set()
+    for section, markers, chunk_text in sorted(
+        chunks, key=lambda chunk: min(chunk[1], default=chunk[0])
+    ):
+        if markers <= seen and pieces:
             continue
-        covered |= new_sections
+        seen |= markers
         pieces.append(chunk_text)
-    if fetches:
-        print(f"  Perseus: fetched {fetches} more chunk(s) to complete the book")
-    return "\n".join(pieces)
+    return pieces
+
 
+def fetch(url, offline=False, revalidate=True):
+    """GET url through the raw cache, within the host's rate limit.
 
-def download_url(url, dest_path, dry_run=False):
-    """Download a single URL and save as plain text. Returns True on success."""
+    A page fetched before is revalidated with a conditional GET unless
+    revalidate is False. Offline, the cached response is returned without
+    a request, or requests.RequestException raised when there is none.
+    """
+    if offline:
+        resp = RAW_CACHE.load(url)
+        if resp is None:
+            raise requests.RequestException(f"not in the raw cache: {url}")
+        return resp
+    RATE_LIMITER.wait(url)
+    return RAW_CACHE.get(HTTP, url, revalidate=revalidate, timeout=REQUEST_TIMEOUT)
+
+
+def page_text(url, resp, offline=False):
+    """Return the plain text of the page fetched from url."""
+    # A dead page that redirects to the site root returns 200 with
+    # the homepage, which then poisons the cache (classics.mit.edu
+    # did this for every http:// URL). Treat the dropped path as a
+    # failed download, not a page.
+    if urlparse(url).path not in ("", "/") and urlparse(resp.url).path in ("", "/"):
+        raise requests.RequestException(
+            f"redirected to site root ({resp.url}); the requested page is gone"
+        )
+
+    if url.lower().endswith(".pdf"):
+        doc = pymupdf.open(stream=resp.content, filetype="pdf")
+        pages = [page.get_text() for page in doc]
+        doc.close()
+        return "\n\n".join(pages).strip()
+    # Plain text URLs (e.g., archive.org DjVu text) — save directly
+    if url.endswith(".txt"):
+        return resp.text.strip()
+    text = clean_html_to_text(resp.text, url)
+    if "perseus.tufts.edu" in url:
+        text = complete_perseus_book(url, resp.text, text, offline=offline)
+    return text
+
+
+def download_url(url, dest_path, dry_run=False, refresh=False, reclean=False):
+    """Download a single URL and save as plain text. Returns True on success.
+
+    refresh re-fetches a page whose text already exists (a conditional
+    GET, so an unchanged page costs no body). reclean rebuilds the text
+    from the raw cache with no network traffic.
+    """
     min_size = _get_min_size(url)
 
-    if dest_path.exists() and dest_path.stat().st_size > min_size:
-        print(f"  SKIP (exists): {dest_path.name}")
+    if not (refresh or reclean) and dest_path.exists() and dest_path.stat().st_size > min_size:
+        _log(f"  SKIP (exists): {dest_path.name}")
         return True
 
     if dry_run:
-        print(f"  WOULD DOWNLOAD: {url}")
-        print(f"    -> {dest_path}")
+        _log(f"  WOULD {'RE-CLEAN' if reclean else 'DOWNLOAD'}: {url}")
+        _log(f"    -> {dest_path}")
         return True
 
-    # Plain text URLs (e.g., archive.org DjVu text) — save directly
-    is_plain_text = url.endswith(".txt")
-    is_pdf = url.lower().endswith(".pdf")
-
-    if is_pdf and not HAS_PYMUPDF:
-        print("  SKIP (PDF): pymupdf not installed. Run: poetry add pymupdf")
+    if url.lower().endswith(".pdf") and not HAS_PYMUPDF:
+        _log("  SKIP (PDF): pymupdf not installed. Run: poetry add pymupdf")
         return False
 
+    if reclean:
+        try:
+            text = page_text(url, fetch(url, offline=True), offline=True)
+        except requests.RequestException as e:
+            _log(f"  SKIP (not re-cleaned): {e}")
+            return False
+        if len(text) < min_size:
+            _log(f"  WARNING: Very short text ({len(text)} chars) — "
+                 f"below {min_size} char minimum for this source")
+            return False
+        _save_text(dest_path, text)
+        return True
+
     for attempt in range(1, MAX_RETRIES + 1):
         try:
             if attempt > 1:
                 wait = REQUEST_DELAY * attempt
-                print(f"  Retry {attempt}/{MAX_RETRIES} (waiting {wait}s)...")
+                _log(f"  Retry {attempt}/{MAX_RETRIES} (waiting {wait}s)...")
                 time.sleep(wait)
 
-            print(f"  Downloading: {url}")
-            resp = requests.get(url, headers=HEADERS, timeout=REQUEST_TIMEOUT)
+            _log(f"  Downloading: {url}")
+            # A retry after a short text fetches the full body again: the
+            # cached copy may be the partial response.
+            resp = fetch(url, revalidate=attempt == 1)
             resp.raise_for_status()
-
-            # A dead page that redirects to the site root returns 200 with
-            # the homepage, which then poisons the cache (classics.mit.edu
-            # did this for every http:// URL). Treat the dropped path as a
-            # failed download, not a page.
-            if urlparse(url).path not in ("", "/") and urlparse(resp.url).path in ("", "/"):
-                raise requests.RequestException(
-                    f"redirected to site root ({resp.url}); the requested page is gone"
-                )
-
-            if is_pdf:
-                doc = pymupdf.open(stream=resp.content, filetype="pdf")
-                pages = [page.get_text() for page in doc]
-                doc.close()
-                text = "\n\n".join(pages).strip()
-            elif is_plain_text:
-                text = resp.text.strip()
-            else:
-                text = clean_html_to_text(resp.text, url)
-                if "perseus.tufts.edu" in url:
-                    text = complete_perseus_book(url, resp.text, text)
+            text = page_text(url, resp)
 
             if len(text) < min_size:
-                print(f"  WARNING: Very short text ({len(text)} chars) — "
-                      f"below {min_size} char minimum for this source")
+                _log(f"  WARNING: Very short text ({len(text)} chars) — "
+                     f"below {min_size} char minimum for this source")
                 if attempt < MAX_RETRIES:
                     continue  # Retry — might be a partial response
                 return False
 
-            dest_path.parent.mkdir(parents=True, exist_ok=True)
-            dest_path.write_text(text, encoding="utf-8")
-            print(f"  SAVED: {dest_path.name} ({len(text):,} chars)")
+            _save_text(dest_path, text)
             return True
 
         except requests.RequestException as e:
-            print(f"  ERROR: {e}")
-            if attempt < MAX_RETRIES:
-                continue
+            # HTTP has already retried transient failures; what is left is
+            # a dead page, a redirect to the site root, or a host that
+            # stayed down through the retries.
+            _log(f"  ERROR: {e}")
             return False
 
     return False
 
 
-def download_source(key, source_info, dry_run=False):
+def _save_text(dest_path, text):
+    dest_path.parent.mkdir(parents=True, exist_ok=True)
+    dest_path.write_text(text, encoding="utf-8")
+    # Cache the book's line table and chunk markers now, so the
+    # verifier reads them instead of rescanning the book.
+    markers = MappedSource.open(dest_path).chunk_markers
+    _log(f"  SAVED: {dest_path.name} ({len(text):,} chars, "
+         f"{len(markers)} section markers)")
+
+
+def download_source(key, source_info, dry_run=False, refresh=False, reclean=False):
     """Download all URLs for a single bibliography entry."""
     category = source_info["category"]
     urls = source_info.get("urls", {})
 
     if not urls:
         if source_info.get("note"):
-            print(f"  NOTE: {source_info['note']}")
+            _log(f"  NOTE: {source_info['note']}")
         else:
-            print(f"  No URLs available")
+            _log(f"  No URLs available")
         return 0, 0
 
     dest_dir = SOURCES_DIR / category / key.replace(":", "_")
@@ -387,15 +430,51 @@ def download_source(key, source_info, dry_run=False):
         safe_name = re.sub(r"[^\w\-]", "_", section_name)
         dest_path = dest_dir / f"{safe_name}.txt"
 
-        if download_url(url, dest_path, dry_run):
+        if download_url(url, dest_path, dry_run, refresh, reclean):
             success += 1
 
-        if not dry_run and total < len(urls):
-            time.sleep(REQUEST_DELAY)
-
     return success, total
 
 
+def download_all(sources, dry_run=False, jobs=DOWNLOAD_JOBS, refresh=False, reclean=False):
+    """Download every source in sources ({key: info}). Returns (success, total).
+
+    Sources are queued by the host of their first URL and each host's
+    queue runs on its own thread, up to jobs hosts at once, so a slow host
+    holds up only its own sources. RATE_LIMITER keeps every host to one
+    request per REQUEST_DELAY, including the Perseus chunk fetches and any
+    URL of a source on another host's queue. Each source's progress lines
+    are printed together once it finishes.
+    """
+    queues = {}
+    for key, info in sources.items():
+        urls = list(info.get("urls", {}).values())
+        host = urlparse(urls[0]).hostname if urls else None
+        queues.setdefault(host, []).append((key, info))
+
+    print_lock = threading.Lock()
+
+    def run_queue(queue):
+        success = total = 0
+        for key, info in queue:
+            _output.lines = []
+            try:
+                s, t = download_source(key, info, dry_run, refresh, reclean)
+                success += s
+                total += t
+            finally:
+                lines, _output.lines = _output.lines, None
+                with print_lock:
+                    print(f"\n[{key}] {info['title']}")
+                    for line in lines:
+                        print(line)
+        return success, total
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        results = list(pool.map(run_queue, queues.values()))
+    return sum(s for s, _ in results), sum(t for _, t in results)
+
+
 def print_modern_instructions():
     """Print instructions for obtaining modern copyrighted works."""
     modern = get_sources_by_category(MODERN)
@@ -429,6 +508,22 @@ def main():
         action="store_true",
         help="Show what would be downloaded without downloading",
     )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=DOWNLOAD_JOBS,
+        help=f"Download from up to N hosts at once (default: {DOWNLOAD_JOBS})",
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Re-fetch pages whose text exists, reusing cached pages the server reports unchanged",
+    )
+    parser.add_argument(
+        "--reclean",
+        action="store_true",
+        help="Rebuild every .txt from the cached raw pages without any network traffic",
+    )
     args = parser.parse_args()
 
     print("=" * 70)
@@ -449,35 +544,25 @@ def main():
             return
 
         print(f"\nDownloading: {args.key} — {info['title']}")
-        success, total = download_source(args.key, info, args.dry_run)
+        success, total = download_source(args.key, info, args.dry_run, args.refresh, args.reclean)
         print(f"\nResult: {success}/{total} files downloaded")
         return
 
     # Category-based download
-    total_success = 0
-    total_count = 0
-
+    selected = {}
     if args.category in ("ancient", "all"):
         ancient = get_sources_by_category(ANCIENT)
-        print(f"\n--- ANCIENT SOURCES ({len(ancient)} entries) ---\n")
-        for key, info in ancient.items():
-            print(f"\n[{key}] {info['title']}")
-            s, t = download_source(key, info, args.dry_run)
-            total_success += s
-            total_count += t
-            if not args.dry_run and t > 0:
-                time.sleep(REQUEST_DELAY)
+        print(f"\n--- ANCIENT SOURCES ({len(ancient)} entries) ---")
+        selected.update(ancient)
 
     if args.category in ("patristic", "all"):
         patristic = get_sources_by_category(PATRISTIC)
-        print(f"\n--- PATRISTIC SOURCES ({len(patristic)} entries) ---\n")
-        for key, info in patristic.items():
-            print(f"\n[{key}] {info['title']}")
-            s, t = download_source(key, info, args.dry_run)
-            total_success += s
-            total_count += t
-            if not args.dry_run and t > 0:
-                time.sleep(REQUEST_DELAY)
+        print(f"\n--- PATRISTIC SOURCES ({len(patristic)} entries) ---")
+        selected.update(patristic)
+
+    total_success, total_count = download_all(
+        selected, args.dry_run, args.jobs, args.refresh, args.reclean
+    )
 
     print_modern_instructions()
 
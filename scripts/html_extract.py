@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+html_extract.py — Plain text from downloaded HTML pages, one pass per page.
+
+download_sources.py used to build a BeautifulSoup tree of every page
+(html.parser), decompose the navigation, find the site's text container
+and call get_text(). Building the tree costs more than tokenizing the
+page, and the downloader does it for every Perseus chunk and every
+multi-megabyte Gutenberg book. extract_text reads the same html.parser
+token stream without building a tree: it tracks only the stack of open
+tags, and collects the text of each candidate container as the tokens go
+by, so one pass finds the container and its text at once.
+
+What each site keeps is a SiteProfile: candidate containers in order of
+preference, and elements removed inside the chosen one. The tree rules
+are Beautiful Soup's (an end tag closes up to the nearest open tag of its
+name; void tags close at once; no implied closing of <p> and the like),
+so the text is the same as get_text() gave on the old tree.
+
+Usage:
+    from html_extract import extract_text
+    text = extract_text(resp.text, url)
+"""
+
+import re
+from dataclasses import dataclass
+from html.parser import HTMLParser
+
+from bs4.builder import HTMLTreeBuilder
+from bs4.dammit import EntitySubstitution, UnicodeDammit
+
+# Removed with everything inside them wherever they are, before a
+# container is chosen.
+REMOVED_TAGS = frozenset({"script", "style", "nav", "header", "footer", "aside"})
+
+# Tags closed as soon as they open, and tags whose text is not page text
+# (ruby annotations, templates), as Beautiful Soup treats them.
+VOID_TAGS = frozenset(HTMLTreeBuilder.DEFAULT_EMPTY_ELEMENT_TAGS)
+NON_TEXT_CONTAINERS = frozenset(HTMLTreeBuilder.DEFAULT_STRING_CONTAINERS) - {"script", "style"}
+
+# A numeric reference html.parser passed on with trailing characters
+# ("&#150abc" style): the leading number is the reference, the rest text.
+_LEADING_DECIMAL = re.compile(r"([0-9]+)(.*)")
+_LEADING_HEX = re.compile(r"([0-9a-f]+)(.*)")
+
+
+@dataclass(frozen=True)
+class Selector:
+    """An element by tag name and, optionally, a class, a class pattern or
+    an id. A class matches one of the element's space-separated classes."""
+    tag: str
+    cls: str = None
+    cls_pattern: re.Pattern = None
+    id: str = None
+
+    def matches(self, tag, attrs):
+        if tag != self.tag:
+            return False
+        if self.id is not None and attrs.get("id") != self.id:
+            return False
+        if self.cls is not None or self.cls_pattern is not None:
+            classes = attrs.get("class", "").split()
+            if self.cls is not None and self.cls not in classes:
+                return False
+            if self.cls_pattern is not None and not any(
+                self.cls_pattern.search(c) for c in classes
+            ):
+                return False
+        return True
+
+
+@dataclass(frozen=True)
+class Container:
+    """A candidate text container, and the elements removed inside it."""
+    selector: Selector
+    strip: tuple = ()
+
+
+@dataclass(frozen=True)
+class SiteProfile:
+    """How to read one site's pages.
+
+    The first container found, in the order listed, holds the text; with
+    none found the whole page does. repair is a (pattern, replacement)
+    applied to pages where no container was found, for sites whose markup
+    hides the container from html.parser.
+    """
+    domain: str
+    containers: tuple
+    repair: tuple = None
+
+
+BODY = Container(Selector("body"))
+
+SITE_PROFILES = (
+    SiteProfile("perseus.tufts.edu", (
+        Container(Selector("div", cls="text_container")),
+        Container(Selector("div", id="text_container")),
+    )),
+    SiteProfile("newadvent.org", (
+        Container(Selector("div", cls="entry-content")),
+        # Older pages: the whole body, less the menu and sidebar blocks.
+        Container(Selector("body"), strip=(
+            Selector("div", cls_pattern=re.compile(r"nav|menu|sidebar|footer|header", re.I)),
+        )),
+    )),
+    # LacusCurtius
+    SiteProfile("penelope.uchicago.edu", (
+        Container(Selector("div", cls="text")),
+        Container(Selector("td", cls="text")),
+    )),
+    SiteProfile("earlyjewishwritings.com", (BODY,)),
+    SiteProfile("earlychristianwritings.com", (
+        Container(Selector("div", id="infolayer")),
+        BODY,
+    )),
+    # tertullian.org has malformed tags (e.g. "</style" without ">") that
+    # leave html.parser inside the style element to the end of the page.
+    SiteProfile("tertullian.org", (BODY,), repair=(re.compile(r"</style(?!\s*>)", re.I), "</style>")),
+    SiteProfile("gutenberg.org", (BODY,)),
+    SiteProfile("attalus.org", (BODY,)),
+    SiteProfile("wikisource.org", tuple(
+        Container(selector, strip=(
+            Selector("span", cls="mw-editsection"),
+            Selector("div", cls_pattern=re.compile(r"nav|catlinks|mw-jump")),
+        ))
+        for selector in (Selector("div", cls="mw-parser-output"), Selector("body"))
+    )),
+)
+
+
+def site_profile(url):
+    """Return the SiteProfile for url, or None for a site without one."""
+    for profile in SITE_PROFILES:
+        if profile.domain in url:
+            return profile
+    return None
+
+
+def extract_text(html, url=""):
+    """Extract readable text from HTML, removing navigation, scripts, etc.
+
+    Returns the text of the site's container (or of the whole page) with
+    one stripped, non-empty line per line of text.
+    """
+    profile = site_profile(url)
+    containers = profile.containers if profile else ()
+    found, page = _collect_text(html, containers)
+    if found is None and profile and profile.repair:
+        pattern, replacement = profile.repair
+        found, page = _collect_text(pattern.sub(replacement, html), containers)
+
+    text = "\n".join(page if found is None else found)
+    lines = [line.strip() for line in text.split("\n")]
+    return "\n".join(line for line in lines if line)
+
+
+def _collect_text(html, containers):
+    """Return (strings of the first container found or None, strings of
+    the whole page) for one pass over html."""
+    parser = _TextCollector(containers)
+    parser.feed(html)
+    parser.close()
+    parser.flush()
+    for found in parser.found:
+        if found is not None:
+            return found.strings, parser.page
+    return None, parser.page
+
+
+class _Found:
+    """A container found in the page: where it sits on the tag stack, and
+    the text collected inside it so far."""
+
+    __slots__ = ("container", "depth", "strip_depth", "strings")
+
+    def __init__(self, container, depth):
+        self.container = container
+        self.depth = depth        # stack index; None once it has closed
+        self.strip_depth = None   # stack index of an open stripped element
+        self.strings = []
+
+
+class _TextCollector(HTMLParser):
+    """An html.parser token handler keeping Beautiful Soup's tag stack and
+    the text strings get_text() would have returned.
+
+    Text arrives in pieces (between entity references, for one); the
+    pieces of one run of text up to the next tag make one string, and
+    strings are joined with newlines, as get_text(separator="\\n") did.
+    """
+
+    def __init__(self, containers):
+        # Entity references are resolved as Beautiful Soup resolves them.
+        super().__init__(convert_charrefs=False)
+        self.containers = containers
+        self.found = [None] * len(containers)
+        self.page = []
+        self.pending = []
+        # Open tags: (name, removed, non_text), where removed and non_text
+        # also cover the tags around it.
+        self.stack = []
+        self.open_counts = {}
+        # Void tags closed at their start tag, by name, whose end tag
+        # may still come. A count, not Beautiful Soup's list, which every
+        # end tag searched: a book with 20,000 <br> made that quadratic.
+        self.closed_void = {}
+
+    # Tree building
+
+    def handle_starttag(self, tag, attrs, void_closes=True):
+        self.flush()
+        attr_map = {name: "" if value is None else value for name, value in attrs}
+        removed, non_text = self.stack[-1][1:] if self.stack else (False, False)
+        removed = removed or tag in REMOVED_TAGS
+        if tag in NON_TEXT_CONTAINERS:
+            non_text = True
+        elif tag in ("script", "style"):
+            non_text = False
+        depth = len(self.stack)
+        self.stack.append((tag, removed, non_text))
+        self.open_counts[tag] = self.open_counts.get(tag, 0) + 1
+
+        if not removed:
+            for found in self.found:
+                if found is not None and found.depth is not None and found.strip_depth is None:
+                    if any(s.matches(tag, attr_map) for s in found.container.strip):
+                        found.strip_depth = depth
+            for i, container in enumerate(self.containers):
+                if self.found[i] is None and container.selector.matches(tag, attr_map):
+                    self.found[i] = _Found(container, depth)
+
+        if void_closes and tag in VOID_TAGS:
+            self._pop_to(tag)
+            self.closed_void[tag] = self.closed_void.get(tag, 0) + 1
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs, void_closes=False)
+        self.flush()
+        self._pop_to(tag)
+
+    def handle_endtag(self, tag):
+        if self.closed_void.get(tag):
+            # The end tag of a void tag already closed ("<br></br>") is
+            # dropped without ending the run of text around it.
+            self.closed_void[tag] -= 1
+        else:
+            self.flush()
+            self._pop_to(tag)
+
+    def _pop_to(self, tag):
+        """Close the innermost open tag named tag and every tag inside it;
+        an end tag with no such open tag is ignored."""
+        if not self.open_counts.get(tag):
+            return
+        while True:
+            name = self.stack.pop()[0]
+            self.open_counts[name] -= 1
+            depth = len(self.stack)
+            for found in self.found:
+                if found is not None:
+                    if found.depth == depth:
+                        found.depth = None
+                    if found.strip_depth == depth:
+                        found.strip_depth = None
+            if name == tag:
+                return
+
+    # Text
+
+    def handle_data(self, data):
+        self.pending.append(data)
+
+    def handle_entityref(self, name):
+        character = EntitySubstitution.HTML_ENTITY_TO_CHARACTER.get(name)
+        self.pending.append(character if character is not None else f"&{name}")
+
+    def handle_charref(self, name):
+        if name[:1] in ("x", "X"):
+            number, base, leading = name[1:], 16, _LEADING_HEX
+        else:
+            number, base, leading = name, 10, _LEADING_DECIMAL
+        try:
+            value, rest = int(number, base), ""
+        except ValueError:
+            match = leading.match(number)
+            if match is None:
+                self.pending.append(number)
+                return
+            value, rest = int(match.group(1), base), match.group(2)
+        self.pending.append(UnicodeDammit.numeric_character_reference(value)[0])
+        self.pending.append(rest)
+
+    def unknown_decl(self, data):
+        self.flush()
+        if data.upper().startswith("CDATA["):
+            self._emit(data[len("CDATA["):], cdata=True)
+
+    def handle_comment(self, data):
+        self.flush()
+
+    def handle_decl(self, decl):
+        self.flush()
+
+    def handle_pi(self, data):
+        self.flush()
+
+    def flush(self):
+        """End the current run of text: it becomes one string."""
+        if self.pending:
+            string = "".join(self.pending)
+            self.pending = []
+            self._emit(string)
+
+    def _emit(self, string, cdata=False):
+        removed, non_text = self.stack[-1][1:] if self.stack else (False, False)
+        if removed or (non_text and not cdata):
+            return
+        self.page.append(string)
+        for found in self.found:
+            if found is not None and found.depth is not None and found.strip_depth is None:
+                found.strings.append(string)
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+http_cache.py — Raw HTTP responses kept on disk, revalidated with conditional GETs.
+
+download_sources.py used to keep only the cleaned .txt of each page, so
+improving the HTML cleaner for one site meant downloading every page of
+it again. HttpCache keeps each successful response body with the headers
+needed to revalidate it (ETag, Last-Modified) and the final URL after
+redirects. A refresh asks the server whether the page changed and reuses
+the stored body on 304 Not Modified; re-cleaning reads the stored bodies
+without touching the network.
+
+Layout: sources/.http_cache/ab/abcdef....body and ....json, named by the
+SHA-256 of the requested URL.
+
+Usage:
+    from http_cache import HttpCache
+    cache = HttpCache(SOURCES_DIR / ".http_cache")
+    resp = cache.get(session, url, timeout=60)   # conditional GET when cached
+    resp = cache.load(url)                       # cached response or None, offline
+    resp = cache.load(url, max_age=86400)        # ... stored within the last day
+    cache.put(url, body)                         # store a body assembled locally
+"""
+
+import calendar
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import requests
+
+# When an entry was stored, in its metadata (UTC).
+FETCHED_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+
+@dataclass
+class CachedResponse:
+    """A stored response: the parts of requests.Response the downloaders use."""
+    url: str  # final URL, after redirects
+    content: bytes
+    encoding: str
+    status_code: int = 200
+    from_cache: bool = False  # True when the body came from disk (304 or offline)
+
+    @property
+    def text(self):
+        try:
+            return str(self.content, self.encoding, errors="replace")
+        except (LookupError, TypeError):
+            return str(self.content, errors="replace")
+
+    def json(self):
+        # As requests.Response.json() does: a body that is not JSON (a
+        # "Service busy" page sent with 200) raises a RequestException.
+        try:
+            return json.loads(self.content)
+        except json.JSONDecodeError as e:
+            raise requests.exceptions.JSONDecodeError(e.msg, e.doc, e.pos)
+
+    def raise_for_status(self):
+        pass  # only successful responses are stored
+
+
+class HttpCache:
+    """Successful GET responses on disk, keyed by requested URL."""
+
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        base = self.root / key[:2] / key
+        return base.with_suffix(".json"), base.with_suffix(".body")
+
+    def load(self, url, max_age=None):
+        """Return the stored response for url, or None, without any request.
+
+        With max_age (seconds), a response stored longer ago than that
+        counts as none.
+        """
+        entry = self._entry(url)
+        if entry is None:
+            return None
+        if max_age is not None and _age(entry[0]) > max_age:
+            return None
+        return _cached_response(entry)
+
+    def _entry(self, url):
+        """Return (metadata, body) stored for url, or None when there is
+        none or the body does not match the recorded length."""
+        meta_path, body_path = self._paths(url)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            content = body_path.read_bytes()
+        except (OSError, ValueError):
+            return None
+        if meta.get("url") != url or len(content) != meta.get("length"):
+            return None
+        return meta, content
+
+    def get(self, session, url, revalidate=True, **kwargs):
+        """GET url through session and store the response if successful.
+
+        With a stored copy and revalidate, the request carries
+        If-None-Match / If-Modified-Since, and a 304 answer returns the
+        stored copy. revalidate=False fetches the full body regardless (a
+        stored copy that cleaned to a suspiciously short text). An
+        unsuccessful response is returned as is and not stored.
+        """
+        headers = dict(kwargs.pop("headers", None) or {})
+        entry = self._entry(url) if revalidate else None
+        if entry is not None:
+            meta, _ = entry
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        resp = session.get(url, headers=headers, **kwargs)
+        if resp.status_code == 304 and entry is not None:
+            self._revalidated(url, entry[0], resp.headers)
+            return _cached_response(entry)
+        if not 200 <= resp.status_code < 300:
+            return resp
+
+        stored = CachedResponse(
+            url=resp.url,
+            content=resp.content,
+            # What resp.text would decode with, so a re-clean reads the
+            # same text the first download did.
+            encoding=resp.encoding or resp.apparent_encoding,
+            status_code=resp.status_code,
+        )
+        self._store(url, stored, resp.headers)
+        return stored
+
+    def put(self, url, content, encoding="utf-8"):
+        """Store content as the response to url without requesting it: a
+        response assembled from a larger one (one title's part of a batch).
+        It has no validators, so a refresh fetches it in full."""
+        self._store(url, CachedResponse(url=url, content=content, encoding=encoding), {})
+
+    def _store(self, url, response, headers):
+        meta_path, body_path = self._paths(url)
+        meta = {
+            "url": url,
+            "final_url": response.url,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "content_type": headers.get("Content-Type"),
+            "encoding": response.encoding,
+            "length": len(response.content),
+            "fetched": time.strftime(FETCHED_FORMAT, time.gmtime()),
+        }
+        meta_path.parent.mkdir(parents=True, exist_ok=True)
+        # Body first, metadata last: load() trusts an entry only once its
+        # metadata names the body's length.
+        _write_atomic(body_path, response.content)
+        _write_atomic(meta_path, json.dumps(meta, indent=2).encode("utf-8"))
+
+    def _revalidated(self, url, meta, headers):
+        """Restamp a stored entry the server just confirmed unchanged, with
+        any new validators it sent, so load(max_age=...) counts its age
+        from now rather than from the first download."""
+        meta = dict(meta, fetched=time.strftime(FETCHED_FORMAT, time.gmtime()))
+        if headers.get("ETag"):
+            meta["etag"] = headers["ETag"]
+        if headers.get("Last-Modified"):
+            meta["last_modified"] = headers["Last-Modified"]
+        meta_path, _ = self._paths(url)
+        _write_atomic(meta_path, json.dumps(meta, indent=2).encode("utf-8"))
+
+
+def _age(meta):
+    """Seconds since the entry was stored; an unreadable stamp is stale."""
+    try:
+        fetched = calendar.timegm(time.strptime(meta["fetched"], FETCHED_FORMAT))
+    except (KeyError, TypeError, ValueError):
+        return float("inf")
+    return time.time() - fetched
+
+
+def _cached_response(entry):
+    meta, content = entry
+    return CachedResponse(
+        url=meta["final_url"], content=content, encoding=meta["encoding"], from_cache=True
+    )
+
+
+def _write_atomic(path, data):
+    partial = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    partial.write_bytes(data)
+    os.replace(partial, path)
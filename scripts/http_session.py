@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+http_session.py — Pooled HTTP sessions shared by the download and lookup scripts.
+
+A bare requests.get opens a new TCP and TLS connection for every call,
+and completing one Perseus book alone takes ~80 chunk fetches. A session
+from make_session keeps connections to each host alive and reuses them,
+caps how many it opens per host, and retries transient failures (dropped
+connections, 429 and 5xx responses) with the same backoff for every
+script.
+
+The transport is a requests adapter, so a test or a caller with special
+needs can mount its own in place of the pooled one. HostRateLimiter
+spaces requests to each host for callers fetching from several threads;
+given to pooled_transport, it spaces the transport's retries too.
+
+Usage:
+    from http_session import make_session
+    HTTP = make_session(HEADERS)
+    resp = HTTP.get(url, timeout=REQUEST_TIMEOUT)
+"""
+
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Hosts whose connections are kept pooled, and connections kept open to
+# each. With pool_block a thread wanting one more connection to a host
+# waits for a free one instead of opening it.
+POOL_HOSTS = 16
+CONNECTIONS_PER_HOST = 2
+
+# Retries after a failed first attempt, and the backoff factor in
+# seconds: urllib3 waits 0, then 2x, 4x, ... the factor between attempts,
+# or as long as a Retry-After header asks (and then, with a limiter, for
+# the host's next slot).
+RETRIES = 2
+BACKOFF = 3
+
+# Responses worth retrying: rate limiting and transient server errors
+# (Perseus answers 503 intermittently).
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def pooled_transport(retries=RETRIES, backoff=BACKOFF, connections_per_host=CONNECTIONS_PER_HOST,
+                     limiter=None):
+    """Return the default transport: a keep-alive connection pool with
+    retry and backoff.
+
+    Only idempotent requests are retried, so a login or loan POST is never
+    sent twice. After the last retry the final response is returned, not
+    an exception, so callers see its status as they would without retries.
+
+    urllib3 resends a retried request itself, without the caller's
+    HostRateLimiter; with limiter, each retry also waits for its host's
+    next slot, so a 503 from Perseus is not answered by an immediate
+    second request.
+    """
+    retry = _LimitedRetry(
+        total=retries,
+        backoff_factor=backoff,
+        status_forcelist=RETRY_STATUSES,
+        raise_on_status=False,
+    )
+    retry.limiter = limiter
+    return HTTPAdapter(
+        pool_connections=POOL_HOSTS,
+        pool_maxsize=connections_per_host,
+        pool_block=True,
+        max_retries=retry,
+    )
+
+
+class _LimitedRetry(Retry):
+    """Retry that, after its backoff, waits on limiter (when set) for the
+    host of the connection pool the request failed on."""
+    limiter = None
+    host_url = None
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        retry = super().increment(method, url, response, error, _pool, _stacktrace)
+        retry.limiter = self.limiter
+        if _pool is not None:
+            port = f":{_pool.port}" if _pool.port else ""
+            retry.host_url = f"{_pool.scheme}://{_pool.host}{port}"
+        else:
+            retry.host_url = self.host_url
+        return retry
+
+    def sleep(self, response=None):
+        super().sleep(response)
+        if self.limiter is not None and self.host_url:
+            self.limiter.wait(self.host_url)
+
+
+def make_session(headers=None, transport=None):
+    """Return a requests.Session sending headers with every request, over
+    transport (default: pooled_transport()) for both http and https."""
+    session = requests.Session()
+    if headers:
+        session.headers.update(headers)
+    transport = transport or pooled_transport()
+    session.mount("http://", transport)
+    session.mount("https://", transport)
+    return session
+
+
+class HostRateLimiter:
+    """A token bucket per host, shared by every thread fetching from it.
+
+    Each host gets one request per interval seconds, with a burst of one,
+    however many threads fetch from it: download_sources.py keeps Perseus
+    to the spacing of a serial crawl while newadvent.org and gutenberg.org
+    download beside it. A caller takes the next free slot for its host and
+    sleeps until that slot comes, so waiting threads are served in the
+    order they asked.
+
+    host_intervals overrides interval for the hosts it names: the APIs
+    verify_modern_works.py queries each have their own limits.
+    """
+
+    def __init__(self, interval, host_intervals=None):
+        self.interval = interval
+        self.host_intervals = dict(host_intervals or {})
+        self._lock = threading.Lock()
+        self._next_slot = {}  # host -> monotonic time its next request may go
+
+    def wait(self, url):
+        """Block until a request to url's host is allowed."""
+        host = urlparse(url).hostname
+        interval = self.host_intervals.get(host, self.interval)
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + interval
+        if slot > now:
+            time.sleep(slot - now)
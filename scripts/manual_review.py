@@ -21,9 +21,12 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from source_registry import SOURCES, MODERN
 from verify_citations import (
     PROJECT_ROOT,
+    SOURCE_CACHE,
     SOURCES_DIR,
     extract_citations,
+    as_source_index,
     extract_claim,
+    find_first_match,
     find_source_files,
     normalize_ref,
     Citation,
@@ -547,13 +550,14 @@ MANUAL_OVERRIDES = {
 def improved_search(text, passage, key, filename=""):
     """Improved passage search that tries harder to find the right section.
 
+    text is the source text or its SourceIndex (as SOURCE_CACHE returns).
     Returns (snippet, quality) where quality is 'exact', 'nearby', or 'header'.
     """
     ref = normalize_ref(passage)
     if not ref:
         return "", "none"
 
-    lines = text.split("\n")
+    lines = as_source_index(text).lines
     section = ref.get("section")
     chapter = ref.get("chapter")
     book = ref.get("book")
@@ -575,13 +579,12 @@ def improved_search(text, passage, key, filename=""):
             rf"CHAPTER\s+{section}\b",
             rf"Chapter\s+{section}\.",
         ]
-        for pat in chapter_patterns:
-            for i, line in enumerate(lines):
-                if re.search(pat, line, re.IGNORECASE):
-                    # Skip if this is just a Table of Contents entry (short line)
-                    if len(line.strip()) < 15:
-                        continue
-                    return extract_snippet(i, before=2, after=30), "exact"
+        # Skip Table of Contents entries (short lines)
+        match = find_first_match(
+            lines, chapter_patterns, accept=lambda line: len(line.strip()) >= 15
+        )
+        if match:
+            return extract_snippet(match[1], before=2, after=30), "exact"
 
     # Strategy B: For book.chapter.section refs, search for "Chapter Y" within right book
     if chapter and section:
@@ -589,16 +592,17 @@ def improved_search(text, passage, key, filename=""):
             rf"Chapter\s+{chapter}\b",
             rf"CHAPTER\s+{chapter}\b",
         ]
-        for pat in chap_patterns:
-            for i, line in enumerate(lines):
-                if re.search(pat, line, re.IGNORECASE):
-                    # Found chapter header — now search for section number nearby
-                    search_end = min(len(lines), i + 200)
-                    for j in range(i, search_end):
-                        if re.search(rf"\b{section}\b", lines[j]):
-                            return extract_snippet(j, before=3, after=25), "exact"
-                    # Chapter found but section not pinpointed
-                    return extract_snippet(i, before=2, after=30), "nearby"
+        match = find_first_match(lines, chap_patterns)
+        if match:
+            i = match[1]
+            # Found chapter header — now search for section number nearby
+            nearby = find_first_match(
+                lines, [rf"\b{section}\b"], flags=0, start=i, stop=i + 200
+            )
+            if nearby:
+                return extract_snippet(nearby[1], before=3, after=25), "exact"
+            # Chapter found but section not pinpointed
+            return extract_snippet(i, before=2, after=30), "nearby"
 
     # Strategy C: Keyword + number (Vision 1, Similitude 9, Book 1)
     if keyword and number:
@@ -606,10 +610,9 @@ def improved_search(text, passage, key, filename=""):
             rf"{keyword}\s+{number}\b",
             rf"{keyword}\s+[IVXLC]+\b",  # Roman numeral
         ]
-        for pat in kw_patterns:
-            for i, line in enumerate(lines):
-                if re.search(pat, line, re.IGNORECASE):
-                    return extract_snippet(i, before=2, after=30), "exact"
+        match = find_first_match(lines, kw_patterns)
+        if match:
+            return extract_snippet(match[1], before=2, after=30), "exact"
 
     # Strategy D: Section number patterns (for Josephus-style "N. text")
     if section:
@@ -620,20 +623,16 @@ def improved_search(text, passage, key, filename=""):
             rf"\[{section}\]",                       # "[618]"
             rf"§\s*{section}\b",                     # "§14"
         ]
-        for pat in num_patterns:
-            for i, line in enumerate(lines):
-                if re.search(pat, line):
-                    return extract_snippet(i, before=3, after=25), "exact"
+        match = find_first_match(lines, num_patterns, flags=0)
+        if match:
+            return extract_snippet(match[1], before=3, after=25), "exact"
 
     # Strategy E: Just the bare number (larger sections)
     if section and section > 20:
-        pat = rf"\b{section}\b"
-        for i, line in enumerate(lines):
-            if re.search(pat, line):
-                # Skip very early lines (headers, TOC)
-                if i < 20:
-                    continue
-                return extract_snippet(i, before=3, after=20), "nearby"
+        # Skip very early lines (headers, TOC)
+        match = find_first_match(lines, [rf"\b{section}\b"], flags=0, start=20)
+        if match:
+            return extract_snippet(match[1], before=3, after=20), "nearby"
 
     return "", "none"
 
@@ -681,8 +680,8 @@ def review_all():
         best_file = ""
 
         for fpath in source_files:
-            text = fpath.read_text(encoding="utf-8", errors="replace")
-            snippet, quality = improved_search(text, c.passage, key, fpath.name)
+            source = SOURCE_CACHE.load(fpath)
+            snippet, quality = improved_search(source, c.passage, key, fpath.name)
             if snippet:
                 # Prefer better quality matches
                 quality_rank = {"exact": 3, "nearby": 2, "header": 1, "none": 0}
@@ -27,6 +27,7 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from source_registry import SOURCES, MODERN
 from verify_citations import (
     PROJECT_ROOT,
+    SOURCE_CACHE,
     SOURCES_DIR,
     extract_citations,
     extract_claim,
@@ -65,8 +66,8 @@ def get_all_found_citations():
 
         # Search with deep=True for extended snippets
         for fpath in source_files:
-            text = fpath.read_text(encoding="utf-8", errors="replace")
-            snippet = search_passage_in_text(text, c.passage, key, deep=True)
+            source = SOURCE_CACHE.load(fpath)
+            snippet = search_passage_in_text(source, c.passage, key, deep=True)
             if snippet:
                 c.status = "FOUND"
                 c.snippet = f"[{fpath.name}] {snippet}"
@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+source_corpus.py — Memory-mapped access to downloaded source texts.
+
+The corpus under sources/ancient and sources/patristic is a set of plain
+UTF-8 .txt files. Reading each into a Python str and splitting it holds
+every book in memory at once and repeats the I/O on every run. A
+MappedSource maps the file instead and keeps only a table of line start
+offsets, cached next to the file; a line is decoded when something asks
+for it. The file's chunk markers ("[314]" and bare-number section
+markers) are cached next to it the same way, so the downloader scans them
+once when it saves a book and the verifier reads them back.
+
+A book OCR'd page by page (download_ia_authenticated.py) also carries a
+page table, so a citation by page goes straight to that page's lines.
+
+Usage:
+    from source_corpus import MappedSource
+    source = MappedSource.open(path)
+    source.lines[120:125]       # decoded lines, as read_text().split("\\n")
+    source.chunk_markers        # [(number, line_index, record), ...]
+    source.pages.lines("123")   # (start, stop) of printed page 123, or None
+"""
+
+import bisect
+import functools
+import json
+import mmap
+import os
+import re
+import struct
+from array import array
+from pathlib import Path
+
+# Sidecar holding a file's line start offsets: "book2.txt" -> "book2.txt.lines".
+# The suffix keeps it out of find_source_files' "*.txt" glob.
+LINE_TABLE_SUFFIX = ".lines"
+
+# Header: magic, source mtime_ns, source size, plain flag, line count.
+_LINE_TABLE_HEADER = struct.Struct("<8sqQBI")
+_LINE_TABLE_MAGIC = b"HJLINES1"
+
+# Path.read_text reads with universal newlines, so "\r\n" and a lone "\r"
+# end a line just as "\n" does.
+_LINE_END = re.compile(rb"\r\n|\r|\n")
+
+# A file is plain when every byte is printable ASCII, a tab, "\n", "\v" or
+# "\f". On such a file a bytes regex sees exactly the characters the str
+# regex would on its decoded lines: no "\r" for universal newlines to
+# drop, and nothing that str-mode "\s", "\d" or case folding reads
+# differently from bytes mode.
+_NOT_PLAIN = re.compile(rb"[^\t\n\x0b\x0c\x20-\x7e]")
+
+# Sidecar holding a file's chunk markers: "book2.txt" -> "book2.txt.markers".
+MARKER_INDEX_SUFFIX = ".markers"
+
+# Header: magic, source mtime_ns, source size, marker count. The body is
+# (number, line index, record flag) per marker, as unsigned 64-bit ints.
+_MARKER_INDEX_HEADER = struct.Struct("<8sqQI")
+_MARKER_INDEX_MAGIC = b"HJMARKS1"
+
+# Chunk markers: "[N]" anywhere on a line, or a number alone on its line.
+_BRACKET_MARKER = re.compile(r"\[\s*(\d+)\s*\]")
+_BARE_MARKER = re.compile(r"^\s*(\d+)\s*$")
+_DIGIT = re.compile(r"\d")
+
+# Page table of a book saved page by page: "full.txt" -> "full.txt.pages".
+# Unlike the line table and marker index it cannot be rebuilt from the
+# text, so it is checked against the text's size only: a copy of the
+# sources tree with fresh mtimes keeps its page tables.
+PAGE_TABLE_SUFFIX = ".pages"
+
+# Text between two pages of a paged book: a blank line.
+PAGE_SEPARATOR = "\n\n"
+_LINE_END_TEXT = re.compile(r"\r\n|\r|\n")
+
+
+class MappedSource:
+    """One source text file, memory-mapped, with its line start table."""
+
+    def __init__(self, path, buffer, starts, plain, stat):
+        self.path = path
+        self.stat = stat
+        self.buffer = buffer
+        self.starts = starts  # array("I"): byte offset where each line starts
+        self.plain = plain
+        self.lines = MappedLines(self)
+
+    @classmethod
+    def open(cls, path):
+        """Map the file at path, reusing its cached line table when the
+        file's mtime and size still match the ones the table was built for."""
+        path = Path(path)
+        stat = path.stat()
+        with open(path, "rb") as f:
+            if stat.st_size:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                buffer = b""  # an empty file cannot be mapped
+        table = _read_line_table(path, stat)
+        if table is None:
+            starts = array("I", [0])
+            starts.extend(m.end() for m in _LINE_END.finditer(buffer))
+            plain = _NOT_PLAIN.search(buffer) is None
+            _write_line_table(path, stat, starts, plain)
+        else:
+            starts, plain = table
+        return cls(path, buffer, starts, plain, stat)
+
+    @property
+    def size(self):
+        """Bytes this source holds: the mapped file and its line table."""
+        return len(self.buffer) + self.starts.itemsize * len(self.starts)
+
+    @functools.cached_property
+    def chunk_markers(self):
+        """The file's chunk markers, as scan_chunk_markers returns them,
+        read from the cached sidecar while it matches the file's mtime and
+        size, otherwise scanned and cached."""
+        markers = _read_marker_index(self.path, self.stat)
+        if markers is None:
+            markers = scan_chunk_markers(self.lines)
+            _write_marker_index(self.path, self.stat, markers)
+        return markers
+
+    @functools.cached_property
+    def pages(self):
+        """The file's PageTable, or None for a file not saved page by page."""
+        return read_page_table(self.path, self.stat, len(self.starts))
+
+    def line(self, index):
+        """Decode one line, without its line ending."""
+        start = self.starts[index]
+        if index + 1 < len(self.starts):
+            end = self.starts[index + 1]
+            if self.buffer[end - 2:end] == b"\r\n":
+                end -= 2
+            else:
+                end -= 1
+        else:
+            end = len(self.buffer)
+        return self.buffer[start:end].decode("utf-8", errors="replace")
+
+    def line_at(self, offset):
+        """Return the index of the line containing byte offset."""
+        return bisect.bisect_right(self.starts, offset) - 1
+
+    def candidate_lines(self, regex, start=0, stop=None):
+        """Yield, in order, the index of every line in [start, stop) on which
+        a match of the bytes regex begins, once per line.
+
+        regex runs over the mapped bytes with re.MULTILINE, so a match may
+        run past its line's end; each yielded line is only a candidate for
+        the caller to confirm on the decoded line. No line holding a match
+        is skipped: a scan resumes at the start of the line after each
+        candidate, and the leftmost match from there starts no later than
+        any match within a later line.
+        """
+        if stop is None or stop > len(self.starts):
+            stop = len(self.starts)
+        if start >= stop:
+            return
+        pos = self.starts[start]
+        endpos = len(self.buffer) if stop == len(self.starts) else self.starts[stop]
+        while True:
+            match = regex.search(self.buffer, pos, endpos)
+            if match is None:
+                return
+            index = self.line_at(match.start())
+            if index >= stop:
+                return
+            yield index
+            if index + 1 >= stop:
+                return
+            pos = self.starts[index + 1]
+
+
+class MappedLines:
+    """The lines of a MappedSource as a read-only sequence of str.
+
+    Indexing and slicing decode only the lines asked for, so extracting a
+    snippet never decodes the rest of the book.
+    """
+
+    def __init__(self, source):
+        self.source = source
+
+    def __len__(self):
+        return len(self.source.starts)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.source.line(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("line index out of range")
+        return self.source.line(index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self.source.line(index)
+
+
+class PageTable:
+    """Where each page of a paged book starts in its text.
+
+    entries holds (label, leaf, first_line) per page, in text order: label
+    is the page number printed on the page (None where none could be
+    read), leaf the scan's page index.
+    """
+
+    def __init__(self, entries, line_count):
+        self.entries = entries
+        self.line_count = line_count
+        # Printed label -> position of its first page in entries.
+        self.labels = {}
+        for position, (label, _, _) in enumerate(entries):
+            if label is not None:
+                self.labels.setdefault(label, position)
+
+    def lines(self, label):
+        """Return the (start, stop) line range of the page printed label,
+        or None when the book has no such page."""
+        position = self.labels.get(str(label))
+        if position is None:
+            return None
+        start = self.entries[position][2]
+        if position + 1 < len(self.entries):
+            # Stop before the blank line separating it from the next page.
+            stop = self.entries[position + 1][2] - 1
+        else:
+            stop = self.line_count
+        return start, stop
+
+
+def write_paged_text(path, pages):
+    """Save a book given as (label, leaf, text) per page, in order: the
+    pages joined by PAGE_SEPARATOR, and the page table beside them.
+    Returns the text saved."""
+    path = Path(path)
+    entries = []
+    texts = []
+    line = 0
+    for label, leaf, text in pages:
+        # One kind of line end, so the lines counted here are the lines
+        # MappedSource finds ("\r" before the separator would join it).
+        text = _LINE_END_TEXT.sub("\n", text)
+        entries.append([None if label is None else str(label), leaf, line])
+        texts.append(text)
+        line += text.count("\n") + len(PAGE_SEPARATOR)
+    text = PAGE_SEPARATOR.join(texts)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    table = {"size": path.stat().st_size, "pages": entries}
+    page_table_path(path).write_text(json.dumps(table), encoding="utf-8")
+    return text
+
+
+def page_table_path(path):
+    """Return the sidecar path holding the page table of a paged book."""
+    return path.with_name(path.name + PAGE_TABLE_SUFFIX)
+
+
+def read_page_table(path, stat, line_count):
+    """Return the PageTable of the text at path, which has line_count
+    lines, or None when it has none or the table was written for a text
+    of another size."""
+    try:
+        table = json.loads(page_table_path(path).read_text(encoding="utf-8"))
+        size, entries = table["size"], [tuple(entry) for entry in table["pages"]]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    if size != stat.st_size:
+        return None
+    return PageTable(entries, line_count)
+
+
+def chunk_marker_numbers(line):
+    """Return the chunk-marker numbers on a line: "[N]" markers, then a
+    bare number standing alone on the line."""
+    numbers = [int(m.group(1)) for m in _BRACKET_MARKER.finditer(line)]
+    m = _BARE_MARKER.match(line)
+    if m:
+        numbers.append(int(m.group(1)))
+    return numbers
+
+
+def scan_chunk_markers(lines):
+    """Return (number, line_index, record) for every chunk marker in lines,
+    in file order. record is True for a marker larger than every marker
+    before it: Perseus chunk markers increase through a book, while numbers
+    that reset (per-chapter subsections, page numbers) never set a record."""
+    markers = []
+    highest = 0
+    for index, line in enumerate(lines):
+        if not _DIGIT.search(line):
+            continue
+        for number in chunk_marker_numbers(line):
+            record = number > highest
+            if record:
+                highest = number
+            markers.append((number, index, record))
+    return markers
+
+
+def line_table_path(path):
+    """Return the sidecar path holding the line table of a source file."""
+    return path.with_name(path.name + LINE_TABLE_SUFFIX)
+
+
+def _read_line_table(path, stat):
+    """Return (starts, plain) from the sidecar, or None when it is missing,
+    unreadable, or was built for a different mtime or size."""
+    try:
+        data = line_table_path(path).read_bytes()
+        magic, mtime_ns, size, plain, count = _LINE_TABLE_HEADER.unpack_from(data)
+    except (OSError, struct.error):
+        return None
+    if (magic, mtime_ns, size) != (_LINE_TABLE_MAGIC, stat.st_mtime_ns, stat.st_size):
+        return None
+    starts = array("I")
+    starts.frombytes(data[_LINE_TABLE_HEADER.size:])
+    if len(starts) != count:
+        return None
+    return starts, bool(plain)
+
+
+def _write_line_table(path, stat, starts, plain):
+    """Cache the line table next to the source file. A table that cannot be
+    written (read-only checkout) is rebuilt on the next run instead."""
+    table_path = line_table_path(path)
+    partial = table_path.with_name(f"{table_path.name}.{os.getpid()}.tmp")
+    header = _LINE_TABLE_HEADER.pack(
+        _LINE_TABLE_MAGIC, stat.st_mtime_ns, stat.st_size, int(plain), len(starts)
+    )
+    try:
+        partial.write_bytes(header + starts.tobytes())
+        os.replace(partial, table_path)
+    except OSError:
+        partial.unlink(missing_ok=True)
+
+
+def marker_index_path(path):
+    """Return the sidecar path holding the chunk markers of a source file."""
+    return path.with_name(path.name + MARKER_INDEX_SUFFIX)
+
+
+def _read_marker_index(path, stat):
+    """Return the markers from the sidecar, or None when it is missing,
+    unreadable, or was built for a different mtime or size."""
+    try:
+        data = marker_index_path(path).read_bytes()
+        magic, mtime_ns, size, count = _MARKER_INDEX_HEADER.unpack_from(data)
+    except (OSError, struct.error):
+        return None
+    if (magic, mtime_ns, size) != (_MARKER_INDEX_MAGIC, stat.st_mtime_ns, stat.st_size):
+        return None
+    flat = array("Q")
+    flat.frombytes(data[_MARKER_INDEX_HEADER.size:])
+    if len(flat) != 3 * count:
+        return None
+    return [
+        (flat[i], flat[i + 1], bool(flat[i + 2])) for i in range(0, len(flat), 3)
+    ]
+
+
+def _write_marker_index(path, stat, markers):
+    """Cache the chunk markers next to the source file. Markers that cannot
+    be written (read-only checkout, a number past 64 bits) are rescanned on
+    the next run instead."""
+    try:
+        flat = array("Q", [value for marker in markers for value in marker])
+    except OverflowError:
+        return
+    index_path = marker_index_path(path)
+    partial = index_path.with_name(f"{index_path.name}.{os.getpid()}.tmp")
+    header = _MARKER_INDEX_HEADER.pack(
+        _MARKER_INDEX_MAGIC, stat.st_mtime_ns, stat.st_size, len(markers)
+    )
+    try:
+        partial.write_bytes(header + flat.tobytes())
+        os.replace(partial, index_path)
+    except OSError:
+        partial.unlink(missing_ok=True)
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""Tests for benchmark_verification.py."""
+
+from benchmark_verification import (
+    compare_reports,
+    generate_corpus,
+    run_benchmark,
+    synthetic_sources,
+)
+from source_registry import SOURCES
+from verify_citations import SOURCE_CACHE, search_passage_in_text
+
+
+def test_each_workload_is_answered_by_its_own_strategy(tmp_path):
+    """A timing is only comparable across commits if it keeps measuring the
+    same strategy: hinted passages resolve from hints alone, in-chunk
+    sections anchor at their chunk, and the rest are found or not by the
+    section and number searches before Strategy 4 is reached."""
+    registry, workloads = generate_corpus(tmp_path, seed=1, scale=0.1)
+
+    with synthetic_sources(tmp_path, registry):
+        def search(name, **kwargs):
+            return [
+                search_passage_in_text(SOURCE_CACHE.load(path), passage, key, **kwargs)
+                for path, passage, key in workloads[name]
+            ]
+
+        assert all(search("hints", hints_only=True))
+        assert all(s.startswith("(from the chunk marked") for s in search("chunk_anchor"))
+        for name in ("section_markers", "number"):
+            assert all(s and not s.startswith("(from the chunk marked") for s in search(name))
+        assert not any(search("not_found"))
+
+    assert not set(registry) & set(SOURCES)
+
+
+def test_report_times_every_stage(tmp_path):
+    report = run_benchmark(tmp_path, seed=0, scale=0.05, repeat=1)
+
+    assert set(report["timings"]) == {
+        "extract_citations", "normalize_ref",
+        "index_source_file.scan", "index_source_file.sidecars",
+        "search.hints", "search.section_markers", "search.number",
+        "search.chunk_anchor", "search.not_found",
+        "verify_citation.cold", "verify_citation.warm",
+    }
+    assert report["corpus"]["citations"] >= 150
+    assert report["timings"]["verify_citation.cold"]["outcome"]["LOCATED"]
+
+
+def test_compare_flags_only_slowdowns_past_the_tolerance():
+    def report(**best):
+        return {"timings": {name: {"best_s": s} for name, s in best.items()}}
+
+    rows, regressions = compare_reports(
+        report(search=1.0, index=1.0, verify=1.0),
+        report(search=1.2, index=1.5, verify=0.5),
+        tolerance=0.25,
+    )
+
+    assert [name for name, *_ in rows] == ["index", "search", "verify"]
+    assert regressions == ["index"]
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""Tests for download_ia_authenticated.py, against a local fake of
+BookReaderGetTextWrapper.php."""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+import download_ia_authenticated
+from download_ia_authenticated import (
+    decode_page,
+    download_book_text,
+    page_boxes_path,
+    page_journal_path,
+    printed_page_labels,
+)
+from http_session import make_session, pooled_transport
+from source_corpus import MappedSource
+
+PAGES = 6
+
+
+def page_text(page):
+    return f"Page {page} of the OCR text, long enough to count as a page with text. " * 5
+
+
+class BookReaderStub(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        page = int(parse_qs(urlparse(self.path).query)["page"][0])
+        with server.lock:
+            server.requested.append(page)
+            failing = server.failures.get(page, 0)
+            if failing:
+                server.failures[page] = failing - 1
+        if failing:
+            status, body = 500, b"<html>Internal Server Error</html>"
+        else:
+            coords = [[0, 0, 10, 10]]
+            status = 200
+            body = f"br.ttsStartCB({json.dumps([[page_text(page), coords]])})".encode()
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def book_reader(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), BookReaderStub)
+    server.lock = threading.Lock()
+    server.requested = []
+    server.failures = {}
+    server.returned = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    meta = {
+        "title": "The Fall of Jerusalem",
+        "pages": PAGES,
+        "server": f"127.0.0.1:{server.server_address[1]}",
+        "dir": "/items/fallofjerusalem",
+        "identifier": "fallofjerusalemc0000bran",
+    }
+    page_url = download_ia_authenticated.PAGE_TEXT_URL.replace("https://", "http://")
+    monkeypatch.setattr(download_ia_authenticated, "PAGE_TEXT_URL", page_url)
+    monkeypatch.setattr(download_ia_authenticated, "get_book_metadata", lambda session, identifier: meta)
+    monkeypatch.setattr(download_ia_authenticated, "borrow_book", lambda session, identifier: True)
+    monkeypatch.setattr(
+        download_ia_authenticated, "return_book",
+        lambda session, identifier: server.returned.append(identifier),
+    )
+    monkeypatch.setattr(download_ia_authenticated.time, "sleep", lambda seconds: None)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def session():
+    # No transport retries: the stub's failures reach the page retry rounds.
+    return make_session(transport=pooled_transport(retries=0, connections_per_host=4))
+
+
+def test_a_restart_fetches_only_the_pages_not_journaled(book_reader, tmp_path):
+    dest = tmp_path / "full.txt"
+    journal = page_journal_path(dest)
+    journal.write_text(
+        json.dumps({"identifier": "fallofjerusalemc0000bran", "pages": PAGES}) + "\n"
+        + "".join(json.dumps({"page": n, "text": page_text(n)}) + "\n" for n in (0, 1, 2))
+        + '{"page": 3, "text": "cut sh',  # the crash came mid-line
+        encoding="utf-8",
+    )
+
+    assert download_book_text(session(), "fallofjerusalemc0000bran", dest)
+
+    assert sorted(book_reader.requested) == [3, 4, 5]
+    assert dest.read_text(encoding="utf-8") == "\n\n".join(page_text(n) for n in range(PAGES))
+    assert not journal.exists()
+    assert book_reader.returned == ["fallofjerusalemc0000bran"]
+    assert [leaf for _, leaf, _ in MappedSource.open(dest).pages.entries] == list(range(PAGES))
+    # The pages fetched this run came with word coordinates; the journaled
+    # ones had none.
+    boxes = json.loads(page_boxes_path(dest).read_text(encoding="utf-8"))
+    assert boxes == {
+        "size": dest.stat().st_size,
+        "pages": {str(n): [[[[0, 0, 10, 10]]]] for n in (3, 4, 5)},
+    }
+
+
+def test_failed_pages_are_retried_after_the_rest_and_never_dropped(book_reader, tmp_path):
+    dest = tmp_path / "full.txt"
+    book_reader.failures = {2: 1, 4: 5}  # page 2 fails once, page 4 every round
+
+    assert download_book_text(session(), "fallofjerusalemc0000bran", dest)
+
+    assert book_reader.requested.count(2) == 2
+    assert book_reader.requested.count(4) == 3
+    assert page_text(2) in dest.read_text(encoding="utf-8")
+    # Page 4 is still missing: the journal stays, and the next run fetches
+    # just that page even though full.txt exists.
+    book_reader.requested.clear()
+    book_reader.failures = {}
+
+    assert download_book_text(session(), "fallofjerusalemc0000bran", dest)
+
+    assert book_reader.requested == [4]
+    assert dest.read_text(encoding="utf-8") == "\n\n".join(page_text(n) for n in range(PAGES))
+    assert not page_journal_path(dest).exists()
+
+
+def test_decode_page_keeps_paragraph_text_and_boxes():
+    body = (
+        'br.ttsStartCB([["The Zealots", [[10, 20, 90, 5], [95, 20, 160, 5]]], '
+        '[1, 2], ["and Jesus.", [[10, 40, 80, 25]]]])'
+    ).encode()
+
+    page = decode_page(body)
+
+    assert page.text == "The Zealots\nand Jesus."
+    assert page.paragraphs[0].boxes == [[[10, 20, 90, 5], [95, 20, 160, 5]]]
+
+
+def test_decode_page_falls_back_for_other_bodies():
+    assert decode_page(b"<!DOCTYPE html><html>Error</html>") is None
+    assert decode_page(b"   ") is None
+    assert decode_page(b'["plain", ["json", []]]').text == "plain\njson"
+    assert decode_page(b"<p>Tagged\n  text</p>").text == "Tagged text"
+    assert decode_page(b'br.ttsStartCB([["cut').text == 'br.ttsStartCB([["cut'
+
+
+def test_printed_page_labels_follow_the_running_numbers():
+    """Leaves 0-1 are front matter, leaf 2 is printed page 1; leaf 5 opens
+    a chapter without a number; leaf 7 is an unnumbered plate, after which
+    the numbers run one behind the leaves."""
+    pages = {
+        0: "THE FALL OF JERUSALEM",
+        1: "First published 1951\n1951",
+        2: "Preface text.\n1",
+        3: "2 THE FALL OF JERUSALEM\nText.",
+        4: "THE ROMAN WAR 3\nText.",
+        5: "CHAPTER 4\nThe Zealots.",
+        6: "5 THE FALL OF JERUSALEM\nText.",
+        7: "Plate: the Arch of Titus",
+        8: "6 THE FALL OF JERUSALEM\nText.",
+        9: "THE ROMAN WAR 7\nText ending in a footnote\n12",
+        10: "8 THE FALL OF JERUSALEM",
+    }
+
+    labels = printed_page_labels(pages)
+
+    assert labels == {
+        0: None, 1: None, 2: "1", 3: "2", 4: "3", 5: "4", 6: "5",
+        7: None, 8: "6", 9: "7", 10: "8",
+    }
@@ -1,15 +1,40 @@
 #!/usr/bin/env python3
 """Tests for download_sources.py."""
 
+import pytest
+import requests
+
 import download_sources
+from http_cache import HttpCache
+from source_corpus import MappedSource, marker_index_path
 from download_sources import (
     _present_sections,
+    download_all,
     complete_perseus_book,
     download_url,
     perseus_section_links,
+    plan_section_fetches,
 )
 
 
+@pytest.fixture(autouse=True)
+def raw_cache(tmp_path, monkeypatch):
+    """Keep every test's raw responses out of sources/.http_cache."""
+    cache = HttpCache(tmp_path / ".http_cache")
+    monkeypatch.setattr(download_sources, "RAW_CACHE", cache)
+    return cache
+
+
+def make_response(url, text, status=200, headers=None):
+    resp = requests.Response()
+    resp.url = url
+    resp.status_code = status
+    resp._content = text.encode("utf-8")
+    resp.encoding = "utf-8"
+    resp.headers.update(headers or {})
+    return resp
+
+
 def test_present_sections_reads_bracket_and_bare_line_markers():
     text = """Book II
 1
@@ -31,15 +56,9 @@ def test_redirect_to_site_root_is_a_failed_download(tmp_path, monkeypatch):
     which cached the homepage as source text for 17 files. A response whose
     final URL dropped the requested path is a dead page, not a download."""
 
-    class FakeResponse:
-        url = "https://classics.mit.edu/"
-        text = "<html>homepage</html>"
-
-        def raise_for_status(self):
-            pass
-
     monkeypatch.setattr(
-        download_sources.requests, "get", lambda *a, **k: FakeResponse()
+        download_sources.HTTP, "get",
+        lambda *a, **k: make_response("https://classics.mit.edu/", "<html>homepage</html>"),
     )
     monkeypatch.setattr(download_sources.time, "sleep", lambda seconds: None)
     dest = tmp_path / "full.txt"
@@ -50,6 +69,43 @@ def test_redirect_to_site_root_is_a_failed_download(tmp_path, monkeypatch):
     assert not dest.exists()
 
 
+def test_a_saved_book_gets_its_marker_index(tmp_path, monkeypatch):
+    """The downloader writes the chunk-marker sidecar with the book, so the
+    verifier never has to scan for markers itself."""
+
+    url = "https://www.perseus.tufts.edu/hopper/text?doc=war"
+    book = "[314]\nThe chunk containing the cited section.\n" * 50
+    monkeypatch.setattr(download_sources.HTTP, "get", lambda *a, **k: make_response(url, "<html>book</html>"))
+    monkeypatch.setattr(download_sources.time, "sleep", lambda seconds: None)
+    monkeypatch.setattr(download_sources, "clean_html_to_text", lambda html, url="": book)
+    monkeypatch.setattr(download_sources, "perseus_section_links", lambda html, doc: [])
+    dest = tmp_path / "book4.txt"
+
+    assert download_url(url, dest)
+
+    assert marker_index_path(dest).exists()
+    assert MappedSource.open(dest).chunk_markers[0] == (314, 0, True)
+
+
+def test_reclean_rebuilds_the_text_from_the_raw_cache_offline(tmp_path, monkeypatch):
+    url = "https://www.newadvent.org/fathers/0103.htm"
+    dest = tmp_path / "against_heresies.txt"
+    monkeypatch.setattr(download_sources, "_get_min_size", lambda url: 10)
+    monkeypatch.setattr(download_sources.HTTP, "get", lambda *a, **k: make_response(url, "<p>Book I</p>"))
+    monkeypatch.setattr(download_sources, "clean_html_to_text", lambda html, url="": "old cleaner output")
+    assert download_url(url, dest)
+
+    def offline(*args, **kwargs):
+        raise AssertionError("--reclean must not touch the network")
+
+    monkeypatch.setattr(download_sources.HTTP, "get", offline)
+    monkeypatch.setattr(download_sources, "clean_html_to_text", lambda html, url="": f"new cleaner: {html}")
+
+    assert download_url(url, dest, reclean=True)
+    assert dest.read_text(encoding="utf-8") == "new cleaner: <p>Book I</p>"
+    assert not download_url("https://www.newadvent.org/fathers/0104.htm", tmp_path / "x.txt", reclean=True)
+
+
 def test_perseus_section_links_reads_only_the_requested_doc():
     doc = "Perseus%3Atext%3A1999.01.0148%3Abook%3D2"
     html = (
@@ -81,16 +137,9 @@ def test_complete_perseus_book_builds_the_book_from_its_chunks(monkeypatch):
     }
     fetched_urls = []
 
-    class FakeResponse:
-        def __init__(self, chunk_url):
-            self.text = chunk_url
-
-        def raise_for_status(self):
-            pass
-
     def fake_get(chunk_url, headers=None, timeout=None):
         fetched_urls.append(chunk_url)
-        return FakeResponse(chunk_url)
+        return make_response(chunk_url, chunk_url)
 
     def fake_clean(html_content, url=""):
         for suffix, chunk_text in chunks.items():
@@ -98,7 +147,7 @@ def test_complete_perseus_book_builds_the_book_from_its_chunks(monkeypatch):
                 return chunk_text
         raise AssertionError(f"unexpected chunk fetch: {html_content}")
 
-    monkeypatch.setattr(download_sources.requests, "get", fake_get)
+    monkeypatch.setattr(download_sources.HTTP, "get", fake_get)
     monkeypatch.setattr(download_sources.time, "sleep", lambda seconds: None)
     monkeypatch.setattr(download_sources, "clean_html_to_text", fake_clean)
 
@@ -113,3 +162,103 @@ def test_complete_perseus_book_builds_the_book_from_its_chunks(monkeypatch):
     assert "Full page text without section markers." not in text
     assert "Archelaus chunk." in text
     assert "Judas the Galilean chunk." in text
+
+
+def test_complete_perseus_book_plans_chunks_from_the_sampled_stride(monkeypatch):
+    """Sections 1–20 in chunks 1–5, 6–10, 11–12, 13–14, 15–20. The two
+    sampled chunks give a stride of 5; the plan 11, 16 steps over chunk
+    13–14, which a second round fills. Five fetches, assembled in marker
+    order whatever order the parallel fetches finished in."""
+    doc = "Perseus%3Atext%3A1999.01.0146%3Abook%3D18"
+    url = f"https://www.perseus.tufts.edu/hopper/text?doc={doc}"
+    html = "".join(
+        f'<a href="?doc={doc}%3Asection%3D{section}">{section}</a>' for section in range(1, 21)
+    )
+    bounds = [(1, 5), (6, 10), (11, 12), (13, 14), (15, 20)]
+    fetched = []
+
+    def fake_get(chunk_url, headers=None, timeout=None):
+        section = int(chunk_url.rsplit("%3D", 1)[1])
+        fetched.append(section)
+        first, last = next(b for b in bounds if b[0] <= section <= b[1])
+        return make_response(chunk_url, "\n".join(f"[{n}]\nSection {n}." for n in range(first, last + 1)))
+
+    monkeypatch.setattr(download_sources.HTTP, "get", fake_get)
+    monkeypatch.setattr(download_sources.time, "sleep", lambda seconds: None)
+    monkeypatch.setattr(download_sources, "clean_html_to_text", lambda html, url="": html)
+
+    text = complete_perseus_book(url, html, "Book XVIII\n")
+
+    assert sorted(fetched) == [1, 6, 11, 13, 16]
+    assert text.split("\n")[::2] == [f"[{n}]" for n in range(1, 21)]
+
+
+def test_complete_perseus_book_fetches_about_one_link_per_uneven_chunk(monkeypatch):
+    """650 sections in chunks of 4 to 12, the first two the shortest: a
+    plan stepping by the sampled chunks would fetch most chunks twice."""
+    doc = "Perseus%3Atext%3A1999.01.0148%3Abook%3D4"
+    url = f"https://www.perseus.tufts.edu/hopper/text?doc={doc}"
+    html = "".join(
+        f'<a href="?doc={doc}%3Asection%3D{section}">{section}</a>' for section in range(1, 651)
+    )
+    sizes = [4, 4, 12, 7, 10, 5, 11, 9, 6, 12, 8]
+    bounds = []
+    first = 1
+    while first <= 650:
+        last = min(650, first + sizes[len(bounds) % len(sizes)] - 1)
+        bounds.append((first, last))
+        first = last + 1
+    fetched = []
+
+    def fake_get(chunk_url, headers=None, timeout=None):
+        section = int(chunk_url.rsplit("%3D", 1)[1])
+        fetched.append(section)
+        first, last = next(b for b in bounds if b[0] <= section <= b[1])
+        return make_response(chunk_url, "\n".join(f"[{n}]\nSection {n}." for n in range(first, last + 1)))
+
+    monkeypatch.setattr(download_sources.HTTP, "get", fake_get)
+    monkeypatch.setattr(download_sources.time, "sleep", lambda seconds: None)
+    monkeypatch.setattr(download_sources, "clean_html_to_text", lambda html, url="": html)
+
+    text = complete_perseus_book(url, html, "Book IV\n")
+
+    assert text.split("\n")[::2] == [f"[{n}]" for n in range(1, 651)]
+    assert len(bounds) == 82
+    assert len(fetched) <= 90  # a plan from the first two chunks: 163
+
+
+def test_plan_section_fetches_starts_each_uncovered_run_afresh():
+    sections = list(range(1, 13))
+    covered = {1, 2, 3, 7}
+
+    assert plan_section_fetches(sections, covered, 2) == [4, 6, 8, 10, 12]
+    assert plan_section_fetches(sections, set(sections), 2) == []
+
+
+def test_download_all_runs_hosts_in_parallel_and_groups_output(monkeypatch, capsys):
+    """Sources on different hosts download at the same time; each source's
+    progress lines still print together under its own heading."""
+    sources = {
+        "josephus:war": {"title": "The Jewish War", "urls": {"book1": "https://www.perseus.tufts.edu/a"}},
+        "josephus:ant": {"title": "Antiquities", "urls": {"book1": "https://www.perseus.tufts.edu/b"}},
+        "clement:firstclement": {"title": "First Clement", "urls": {"full": "https://www.newadvent.org/c"}},
+    }
+    started = {}
+    both_hosts_running = download_sources.threading.Barrier(2, timeout=5)
+
+    def fake_download_source(key, info, dry_run=False, refresh=False, reclean=False):
+        host = download_sources.urlparse(next(iter(info["urls"].values()))).hostname
+        if host not in started:
+            started[host] = key
+            both_hosts_running.wait()
+        download_sources._log(f"  SAVED: {key}")
+        return 1, 1
+
+    monkeypatch.setattr(download_sources, "download_source", fake_download_source)
+
+    assert download_all(sources, jobs=2) == (3, 3)
+
+    out = capsys.readouterr().out
+    for key in sources:
+        assert f"[{key}] {sources[key]['title']}\n  SAVED: {key}\n" in out
+    assert out.index("josephus:war") < out.index("josephus:ant")
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Tests for html_extract.py.
+
+The expected texts are what the BeautifulSoup extractor it replaced
+(download_sources.clean_html_to_text) returned for the same pages.
+"""
+
+import pytest
+
+from html_extract import extract_text, site_profile
+
+# (url, page, text): one page in the markup of each site profile.
+PAGES = [
+    pytest.param(
+        "https://www.perseus.tufts.edu/hopper/text?doc=Perseus%3Atext%3A1999.01.0148",
+        (
+            "<html><head><title>War</title><script>var nav = 1;</script></head><body>"
+            '<div id="header"><a href="/">Perseus</a></div><div class="text_container">'
+            '<div class="text"><span class="milestone">[1]</span>'
+            "<p>When Archelaus had gone &mdash; to Rome &amp; Caesar &#8212;</p>"
+            '<p>the people<br>rose up.</p><span class="milestone">[2]</span><p>And Sabinus'
+            "</p></div></div><footer>Tufts</footer></body></html>"
+        ),
+        "[1]\nWhen Archelaus had gone — to Rome & Caesar —\nthe people\nrose up.\n[2]\nAnd Sabinus",
+        id="perseus",
+    ),
+    pytest.param(
+        "https://www.newadvent.org/fathers/0103.htm",
+        (
+            '<html><body><div class="navbar">Home &gt; Fathers</div><div id="mi5">'
+            "<h1>Against Heresies (Book I)</h1>"
+            "<p>Inasmuch as certain men have set the truth aside&#133;</p>"
+            '<div class="MenuBottom">Copyright</div></div></body></html>'
+        ),
+        "Against Heresies (Book I)\nInasmuch as certain men have set the truth aside…",
+        id="newadvent_old",
+    ),
+    pytest.param(
+        "https://www.newadvent.org/cathen/08537a.htm",
+        (
+            '<html><body><div class="navbar">Home</div><div class="entry-content">'
+            "<p>Josephus, Flavius</p><p>Jewish historian</p></div></body></html>"
+        ),
+        "Josephus, Flavius\nJewish historian",
+        id="newadvent_entry",
+    ),
+    pytest.param(
+        "https://en.wikisource.org/wiki/The_Works_of_Philo",
+        (
+            '<html><body><div id="mw-navigation">nav</div><div class="mw-parser-output">'
+            '<h2>On the Creation<span class="mw-editsection">[edit]</span></h2>'
+            '<div class="navbox">Works of Philo</div><p>Of other lawgivers, some</p>'
+            '<div class="catlinks">Categories</div></div></body></html>'
+        ),
+        "On the Creation\nOf other lawgivers, some",
+        id="wikisource",
+    ),
+    pytest.param(
+        "http://www.earlychristianwritings.com/text/1clement.html",
+        (
+            '<html><body><table><tr><td>Nav</td></tr></table><div id="infolayer">'
+            "<p>The Church of God which sojourneth in Rome</p></div></body></html>"
+        ),
+        "The Church of God which sojourneth in Rome",
+        id="ecw",
+    ),
+    pytest.param(
+        "https://www.tertullian.org/fathers/eusebius_hist.htm",
+        (
+            "<html><head><style>p { margin: 0 }</style</head><body><nav>Index</nav>"
+            "<h1>Church History</h1><p>Book I</p></body></html>"
+        ),
+        "Church History\nBook I",
+        id="tertullian",
+    ),
+    pytest.param(
+        "https://www.gutenberg.org/files/2848/2848-h/2848-h.htm",
+        (
+            "<html><head><style>body { }</style></head><body>"
+            "<pre>The Project Gutenberg EBook</pre><h2>CHAPTER I.</h2>"
+            "<p>  Those Jews who had been\n  taken captive,<br/>returned.  </p><p><ruby>漢"
+            "<rt>kan</rt></ruby></p></body></html>"
+        ),
+        "The Project Gutenberg EBook\nCHAPTER I.\nThose Jews who had been\ntaken captive,\nreturned.\n漢",
+        id="gutenberg",
+    ),
+    pytest.param(
+        "https://penelope.uchicago.edu/Thayer/E/Roman/Texts/Tacitus/Histories/5A*.html",
+        (
+            '<html><body><table><tr><td class="text"><p>The Jews are a race</p></td></tr>'
+            "</table></body></html>"
+        ),
+        "The Jews are a race",
+        id="lacus",
+    ),
+    pytest.param(
+        "https://example.org/page.html",
+        (
+            "<html><body><header>Site</header><p>Plain page &copy 2024</p><aside>Ads"
+            "</aside></body></html>"
+        ),
+        "Plain page © 2024",
+        id="unknown",
+    ),
+]
+
+
+@pytest.mark.parametrize("url, page, text", PAGES)
+def test_extracts_the_same_text_as_the_tree_extractor(url, page, text):
+    assert extract_text(page, url) == text
+
+
+def test_text_runs_and_void_end_tags_follow_beautiful_soup():
+    """A run of text is one string up to the next tag, whatever entity
+    references split it; a stray </br> after <br> does not end the run;
+    an end tag without an open tag is ignored."""
+    page = "<p>Tom &amp; Jerry&#150;<b>bold</b>tail<br>one</br> two</i></p>"
+
+    assert extract_text(page) == "Tom & Jerry–\nbold\ntail\none two"
+
+
+def test_the_first_listed_container_wins_over_an_earlier_one():
+    page = (
+        '<body><div id="text_container">by id</div>'
+        '<div class="x text_container">by class</div></body>'
+    )
+
+    assert extract_text(page, "https://www.perseus.tufts.edu/hopper/") == "by class"
+    assert site_profile("https://example.org/") is None
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""Tests for http_cache.py, with a fake session standing in for the network."""
+
+import json
+
+import requests
+
+from http_cache import HttpCache
+
+
+class FakeSession:
+    """Answers each GET with the next queued (status, body, headers) and
+    records the headers it was sent."""
+
+    def __init__(self, *answers):
+        self.answers = list(answers)
+        self.sent = []
+
+    def get(self, url, headers=None, **kwargs):
+        self.sent.append(headers or {})
+        status, body, response_headers = self.answers.pop(0)
+        resp = requests.Response()
+        resp.url = url
+        resp.status_code = status
+        resp._content = body.encode("utf-8")
+        resp.encoding = "utf-8"
+        resp.headers.update(response_headers)
+        return resp
+
+
+URL = "https://www.newadvent.org/fathers/0103.htm"
+
+
+def test_a_304_answer_returns_the_stored_body(tmp_path):
+    cache = HttpCache(tmp_path)
+    session = FakeSession(
+        (200, "<html>Against Heresies</html>", {"ETag": '"v1"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"}),
+        (304, "", {}),
+    )
+
+    first = cache.get(session, URL)
+    second = cache.get(session, URL)
+
+    assert not first.from_cache
+    assert second.from_cache
+    assert second.text == "<html>Against Heresies</html>"
+    assert session.sent[0] == {}
+    assert session.sent[1] == {
+        "If-None-Match": '"v1"',
+        "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT",
+    }
+
+
+def test_failures_are_not_stored_and_revalidate_false_refetches(tmp_path):
+    cache = HttpCache(tmp_path)
+    session = FakeSession(
+        (404, "missing", {}),
+        (200, "old", {"ETag": '"v1"'}),
+        (200, "new", {"ETag": '"v2"'}),
+    )
+
+    assert cache.get(session, URL).status_code == 404
+    assert cache.load(URL) is None
+
+    cache.get(session, URL)
+    assert cache.get(session, URL, revalidate=False).text == "new"
+    assert "If-None-Match" not in session.sent[2]
+    assert cache.load(URL).text == "new"
+
+
+def test_a_truncated_body_is_not_trusted(tmp_path):
+    cache = HttpCache(tmp_path)
+    cache.get(FakeSession((200, "<html>full page</html>", {})), URL)
+
+    _, body_path = cache._paths(URL)
+    body_path.write_bytes(b"<html>ful")
+
+    assert cache.load(URL) is None
+
+
+def test_load_with_max_age_skips_an_old_entry(tmp_path):
+    cache = HttpCache(tmp_path)
+    cache.get(FakeSession((200, '{"totalItems": 0}', {})), URL)
+
+    assert cache.load(URL, max_age=3600).json() == {"totalItems": 0}
+
+    meta_path, _ = cache._paths(URL)
+    meta = json.loads(meta_path.read_text(encoding="utf-8"))
+    meta["fetched"] = "2020-01-01T00:00:00Z"
+    meta_path.write_text(json.dumps(meta), encoding="utf-8")
+
+    assert cache.load(URL, max_age=3600) is None
+    assert cache.load(URL).text == '{"totalItems": 0}'
+
+
+def test_a_304_restamps_the_entry_and_keeps_new_validators(tmp_path):
+    cache = HttpCache(tmp_path)
+    session = FakeSession(
+        (200, '{"totalItems": 1}', {"ETag": '"v1"'}),
+        (304, "", {"ETag": '"v2"'}),
+    )
+    cache.get(session, URL)
+    meta_path, _ = cache._paths(URL)
+    meta = json.loads(meta_path.read_text(encoding="utf-8"))
+    meta["fetched"] = "2020-01-01T00:00:00Z"
+    meta_path.write_text(json.dumps(meta), encoding="utf-8")
+    assert cache.load(URL, max_age=3600) is None
+
+    assert cache.get(session, URL).from_cache
+
+    assert cache.load(URL, max_age=3600).json() == {"totalItems": 1}
+    assert json.loads(meta_path.read_text(encoding="utf-8"))["etag"] == '"v2"'
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""Tests for http_session.py, against a stub server on localhost."""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+
+import http_session
+from http_session import HostRateLimiter, make_session, pooled_transport
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def do_GET(self):
+        server = self.server
+        server.clients.append(self.client_address)
+        status = server.statuses.pop(0) if server.statuses else 200
+        body = f"{self.path} {status}".encode()
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.clients = []
+    server.statuses = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_requests_to_one_host_reuse_the_connection(stub_server):
+    session = make_session({"User-Agent": "test"})
+    base = f"http://127.0.0.1:{stub_server.server_address[1]}"
+
+    for section in (1, 2, 3):
+        assert session.get(f"{base}/chunk{section}", timeout=5).text == f"/chunk{section} 200"
+
+    assert len(set(stub_server.clients)) == 1
+
+
+def test_transient_failures_are_retried_and_a_lasting_one_returned(stub_server):
+    session = make_session(transport=pooled_transport(retries=2, backoff=0))
+    base = f"http://127.0.0.1:{stub_server.server_address[1]}"
+
+    stub_server.statuses = [503, 503]
+    assert session.get(f"{base}/chunk", timeout=5).status_code == 200
+
+    stub_server.statuses = [503, 503, 503]
+    assert session.get(f"{base}/chunk", timeout=5).status_code == 503
+    assert len(stub_server.clients) == 6
+
+
+def test_retries_wait_for_the_host_limiter(stub_server):
+    class RecordingLimiter:
+        def __init__(self):
+            self.waited = []
+
+        def wait(self, url):
+            self.waited.append(url)
+
+    limiter = RecordingLimiter()
+    session = make_session(transport=pooled_transport(retries=2, backoff=0, limiter=limiter))
+    base = f"http://127.0.0.1:{stub_server.server_address[1]}"
+
+    stub_server.statuses = [503, 503]
+    assert session.get(f"{base}/chunk", timeout=5).status_code == 200
+
+    assert limiter.waited == [f"http://127.0.0.1:{stub_server.server_address[1]}"] * 2
+    assert len(stub_server.clients) == 3
+
+
+def test_a_custom_transport_replaces_the_network():
+    class CannedTransport(BaseAdapter):
+        def send(self, request, **kwargs):
+            response = requests.Response()
+            response.status_code = 200
+            response._content = f"canned {request.headers['User-Agent']}".encode()
+            response.url = request.url
+            response.request = request
+            return response
+
+        def close(self):
+            pass
+
+    session = make_session({"User-Agent": "stub"}, transport=CannedTransport())
+
+    assert session.get("https://www.perseus.tufts.edu/hopper/text").text == "canned stub"
+
+
+def test_rate_limiter_spaces_requests_per_host_only(monkeypatch):
+    """Three Perseus requests at once wait 0, 3 and 6 seconds; a New Advent
+    request made beside them does not wait behind Perseus."""
+    slept = []
+    monkeypatch.setattr(http_session.time, "monotonic", lambda: 100.0)
+    monkeypatch.setattr(http_session.time, "sleep", slept.append)
+    limiter = HostRateLimiter(3)
+
+    for _ in range(3):
+        limiter.wait("https://www.perseus.tufts.edu/hopper/text?doc=a")
+    limiter.wait("https://www.newadvent.org/fathers/0316.htm")
+
+    assert slept == [3.0, 6.0]
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""Tests for source_corpus.py."""
+
+import os
+import re
+
+import pytest
+
+import source_corpus
+from source_corpus import (
+    MappedSource,
+    line_table_path,
+    marker_index_path,
+    page_table_path,
+    scan_chunk_markers,
+    write_paged_text,
+)
+from verify_citations import find_first_match
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        b"Book II\n[\n497\n]\nNow the people of Cesarea.\n",
+        b"Windows line endings\r\n14. A section\r\nlast line without newline",
+        b"Old Mac\rline endings\r\r\nmixed\n",
+        "§ 14 — Ἀρχή\n".encode("utf-8"),
+        b"an invalid byte \xe2\x80\nafter it\n",
+        b"",
+        b"\n\n",
+    ],
+)
+def test_mapped_lines_match_read_text_lines(tmp_path, content):
+    path = tmp_path / "book1.txt"
+    path.write_bytes(content)
+
+    source = MappedSource.open(path)
+
+    expected = path.read_text(encoding="utf-8", errors="replace").split("\n")
+    assert list(source.lines) == expected
+    assert len(source.lines) == len(expected)
+    assert source.lines[1:3] == expected[1:3]
+    assert source.lines[-1] == expected[-1]
+
+
+def test_line_table_is_reused_until_the_file_changes(tmp_path):
+    path = tmp_path / "book1.txt"
+    path.write_bytes(b"first\nsecond\n")
+    MappedSource.open(path)
+    table = line_table_path(path)
+    assert table.name == "book1.txt.lines"
+    built = table.stat().st_mtime_ns
+
+    reopened = MappedSource.open(path)
+    assert table.stat().st_mtime_ns == built
+    assert list(reopened.lines) == ["first", "second", ""]
+
+    path.write_bytes(b"first line rewritten\nsecond\nthird\n")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    assert list(MappedSource.open(path).lines) == [
+        "first line rewritten", "second", "third", "",
+    ]
+
+
+def test_plain_flag_marks_printable_ascii_files_only(tmp_path):
+    plain = tmp_path / "plain.txt"
+    plain.write_bytes(b"Chapter 14\n\tindented\n")
+    crlf = tmp_path / "crlf.txt"
+    crlf.write_bytes(b"Chapter 14\r\n")
+    greek = tmp_path / "greek.txt"
+    greek.write_bytes("λόγος\n".encode("utf-8"))
+
+    assert MappedSource.open(plain).plain
+    assert not MappedSource.open(crlf).plain
+    assert not MappedSource.open(greek).plain
+
+
+def test_a_match_spanning_lines_in_the_mapped_bytes_is_not_a_line_match(tmp_path):
+    """Over the whole mapped file "\\s+" also crosses line ends, so "Chapter"
+    at the end of one line and "14" at the start of the next form a bytes
+    match the line-by-line search never makes."""
+    path = tmp_path / "book1.txt"
+    path.write_bytes(b"Table of Contents, Chapter\n14 lines later\nChapter 14 begins\n")
+    source = MappedSource.open(path)
+
+    assert find_first_match(source.lines, [r"Chapter\s+14\b"]) == (0, 2)
+
+
+def test_candidate_lines_yields_each_matching_line_once(tmp_path):
+    path = tmp_path / "book1.txt"
+    path.write_bytes(b"[1] and [2]\nnothing\n[3]\n")
+    source = MappedSource.open(path)
+
+    lines = list(source.candidate_lines(re.compile(rb"\[\d\]", re.MULTILINE)))
+
+    assert lines == [0, 2]
+
+
+def test_only_markers_above_every_earlier_marker_are_records():
+    """LacusCurtius interleaves chapter markers with per-chapter subsection
+    numbers; the subsections are markers but never records."""
+    lines = ["17", "1", "text [2] more", "18", "[ 19 ]", "nothing"]
+
+    assert scan_chunk_markers(lines) == [
+        (17, 0, True), (1, 1, False), (2, 2, False), (18, 3, True), (19, 4, True),
+    ]
+
+
+def test_chunk_markers_are_read_from_the_sidecar_until_the_file_changes(tmp_path, monkeypatch):
+    path = tmp_path / "book4.txt"
+    path.write_bytes(b"[\n310\n]\nEarlier chunk.\n[314]\nAnanus was slain here.\n")
+    markers = MappedSource.open(path).chunk_markers
+    assert marker_index_path(path).name == "book4.txt.markers"
+    assert markers == [(310, 1, True), (314, 4, True)]
+
+    def rescan(lines):
+        raise AssertionError("markers rescanned despite a current sidecar")
+
+    monkeypatch.setattr(source_corpus, "scan_chunk_markers", rescan)
+    assert MappedSource.open(path).chunk_markers == markers
+
+    monkeypatch.undo()
+    path.write_bytes(b"[326]\nA later chunk.\n")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert MappedSource.open(path).chunk_markers == [(326, 0, True)]
+
+
+def test_page_table_gives_each_printed_page_its_lines(tmp_path):
+    path = tmp_path / "full.txt"
+    text = write_paged_text(path, [
+        (None, 0, "THE SEARCH FOR GOD"),
+        ("1", 1, "Chapter One\r\nThe first page."),
+        (None, 2, "A plate."),
+        ("2", 3, "The second page.\n2"),
+    ])
+    assert path.read_text(encoding="utf-8") == text
+    assert page_table_path(path).name == "full.txt.pages"
+
+    source = MappedSource.open(path)
+    assert [source.lines[i] for i in range(*source.pages.lines("1"))] == ["Chapter One", "The first page."]
+    assert [source.lines[i] for i in range(*source.pages.lines(2))] == ["The second page.", "2"]
+    assert source.pages.lines("3") is None
+
+    # Rewritten to another size: the table no longer describes the text.
+    path.write_text(text + "\nAn appendix.", encoding="utf-8")
+    assert MappedSource.open(path).pages is None
+
+    unpaged = tmp_path / "book1.txt"
+    unpaged.write_text("No page table.", encoding="utf-8")
+    assert MappedSource.open(unpaged).pages is None
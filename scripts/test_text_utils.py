@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""Tests for text_utils.py."""
+
+from text_utils import strip_latex
+from verify_citations import clean_claim
+
+
+def test_strip_latex_keeps_readable_text_for_tts():
+    latex = (
+        "\\section{The Divine Man}\n"
+        "% a comment\n"
+        "The \\emph{theios an\u0113r} --- ``divine man''\\cite{bieler}~was   known.\n"
+        "\n\n\n"
+        "\\begin{quote}Next\tparagraph.\\end{quote}\n"
+    )
+
+    assert strip_latex(latex) == (
+        'The Divine Man.\n\n'
+        'The theios an\u0113r — "divine man" was known.\n\n'
+        'Next\tparagraph.'
+    )
+
+
+def test_clean_claim_unwraps_nested_commands():
+    """The cleaning steps run one after another, so the second step sees
+    the inner command the first one exposed."""
+    assert clean_claim("\\emph{\\textbf{Son of God}}") == "Son of God"
+
+
+def test_clean_claim_collapses_spaces_and_tabs_but_keeps_line_breaks():
+    claim = "Josephus \t reports\\cite[2.497]{josephus:war}  the  riot.\n  \n\t\nIn Caesarea."
+
+    assert clean_claim(claim) == "Josephus reports the riot.\nIn Caesarea."
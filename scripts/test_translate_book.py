@@ -3,13 +3,36 @@
 Tests for translate_book.py
 """
 
+import subprocess
+import sys
+import threading
+import time
+import types
+
 import pytest
 from pathlib import Path
+
+import translate_book
+from benchmark_fingerprints import reference_fingerprints
 from translate_book import (
     split_into_fragments,
     split_at_paragraphs,
     normalize_language,
     create_translation_prompt,
+    extract_fingerprints,
+    fragment_cache_key,
+    get_cache_dir,
+    load_cached_fragments,
+    match_translations_to_sources,
+    max_weight_assignment,
+    plan_sync,
+    split_keeping_fragments,
+    split_paragraphs,
+    sync_chapter,
+    translate_chapter,
+    ChatGPTDesktopBackend,
+    EchoBackend,
+    backend_jobs,
     DEFAULT_FRAGMENT_SIZE,
 )
 
@@ -156,5 +179,325 @@ class TestOutputDirectoryLogic:
         assert str(result) == "translations/Polish"
 
 
+CHAPTER = "\n\n".join(
+    f"Part {n} of the chapter, on the Zealots, citing \\cite{{josephus:war{n}}}." for n in range(1, 7)
+)
+
+
+class BarrierEchoBackend(EchoBackend):
+    """Echoes parts 1-3 only once all three are in flight together, and
+    drops the citation of part 5."""
+
+    def __init__(self):
+        self.in_flight = threading.Barrier(3, timeout=5)
+
+    def translate(self, fragment, prompt):
+        if "Part 5" in fragment:
+            return super().translate(fragment.replace("\\cite{josephus:war5}", ""), prompt)
+        if fragment[:6] in ("Part 1", "Part 2", "Part 3"):
+            self.in_flight.wait()
+        return super().translate(fragment, prompt)
+
+
+class RecordingEchoBackend(EchoBackend):
+    def __init__(self):
+        self.sent = []
+
+    def translate(self, fragment, prompt):
+        self.sent.append(fragment)
+        return super().translate(fragment, prompt)
+
+
+class TestTranslationPipeline:
+    def chapter(self, tmp_path):
+        path = tmp_path / "chapter3.tex"
+        path.write_text(CHAPTER, encoding="utf-8")
+        return path
+
+    def test_echo_backend_translates_a_chapter_end_to_end(self, tmp_path):
+        output = translate_chapter(str(self.chapter(tmp_path)), "Polish", str(tmp_path / "out"),
+                                   fragment_size=80, backend=EchoBackend())
+
+        assert Path(output).name == "chapter3_po.tex"
+        assert Path(output).read_text(encoding="utf-8") == CHAPTER
+
+    def test_jobs_never_put_two_prompts_into_the_chatgpt_window(self, tmp_path, monkeypatch):
+        in_window = []
+        overlapped = []
+
+        def send_prompt(prompt, wait_for_reply=True, wait_seconds=0):
+            in_window.append(prompt)
+            time.sleep(0.01)  # long enough for a second prompt to arrive
+            overlapped.append(len(in_window) > 1)
+            parts = [part for part in CHAPTER.split("\n\n") if part in prompt]
+            in_window.remove(prompt)
+            return "```latex\n" + "\n\n".join(parts) + "\n```"
+
+        monkeypatch.setitem(sys.modules, "chatgpt_desktop", types.SimpleNamespace(send_prompt=send_prompt))
+        monkeypatch.setattr(ChatGPTDesktopBackend, "delay", 0)
+        backend = ChatGPTDesktopBackend()
+        assert backend_jobs(backend, 4) == 1
+        assert backend_jobs(EchoBackend(), 12) == 12
+
+        output = translate_chapter(str(self.chapter(tmp_path)), "Polish", str(tmp_path / "out"),
+                                   fragment_size=80, backend=backend, jobs=4)
+
+        assert Path(output).read_text(encoding="utf-8") == CHAPTER
+        assert len(overlapped) == 6 and not any(overlapped)
+        # The window lock holds even when a caller runs translate() in threads.
+        with translate_book.ThreadPoolExecutor(max_workers=4) as pool:
+            list(pool.map(lambda part: backend.translate(part, part), CHAPTER.split("\n\n")))
+        assert len(overlapped) == 12 and not any(overlapped)
+
+    def test_valid_fragments_are_cached_as_they_land_despite_an_invalid_one(self, tmp_path):
+        path = self.chapter(tmp_path)
+        fragments = split_into_fragments(CHAPTER, 80)
+        assert len(fragments) == 6
+
+        with pytest.raises(SystemExit):
+            translate_chapter(str(path), "Polish", str(tmp_path / "out"),
+                              fragment_size=80, backend=BarrierEchoBackend(), jobs=3)
+
+        cached, _ = load_cached_fragments(get_cache_dir(str(tmp_path / "out")), fragments, "Polish")
+        assert cached[:3] == fragments[:3]
+        assert cached[4] is None
+
+    def test_a_rerun_after_an_edit_translates_only_the_changed_fragment(self, tmp_path):
+        """Fragments of two parts each. Part 2 grows, so a fresh split would
+        pair 2 with 3 and 4 with 5 and miss the cache for every fragment
+        after the edit."""
+        path = self.chapter(tmp_path)
+        out = str(tmp_path / "out")
+        translate_chapter(str(path), "Polish", out, fragment_size=140, backend=EchoBackend())
+
+        edited = CHAPTER.replace("Part 2 of the chapter,", "Part 2 of the chapter, revised,")
+        assert split_into_fragments(edited, 140)[1].startswith("Part 2")
+        path.write_text(edited, encoding="utf-8")
+        backend = RecordingEchoBackend()
+        output = translate_chapter(str(path), "Polish", out, fragment_size=140, backend=backend)
+
+        assert [fragment[:6] for fragment in backend.sent] == ["Part 1", "Part 2"]
+        assert Path(output).read_text(encoding="utf-8") == edited
+
+    def test_the_cache_key_covers_language_and_prompt_version(self, monkeypatch):
+        key = fragment_cache_key("Part 1.", "Polish")
+
+        assert fragment_cache_key("Part 1.", "German") != key
+        monkeypatch.setattr(translate_book, "PROMPT_VERSION", translate_book.PROMPT_VERSION + 1)
+        assert fragment_cache_key("Part 1.", "Polish") != key
+
+    def test_split_keeping_fragments_splits_only_between_unchanged_fragments(self):
+        previous = ["Alpha.", "Beta.", "Gamma."]
+        content = "Alpha.\n\nBeta, now edited.\n\nNew paragraph.\n\nGamma."
+
+        assert split_keeping_fragments(content, previous, 20) == [
+            "Alpha.", "Beta, now edited.", "New paragraph.", "Gamma.",
+        ]
+
+    def test_split_keeping_fragments_finds_fragments_that_lost_whitespace(self):
+        previous = ["Alpha.\\section{Beta}", "\\label{sec:beta} Beta."]
+        content = "Alpha.\n\n\\section{Beta}\\label{sec:beta} Beta.\n"
+
+        assert split_keeping_fragments(content, previous, 20) == previous
+
+    @pytest.mark.parametrize("name", ["chapter2", "chapter3", "chapter5"])
+    def test_a_rerun_of_an_unchanged_book_chapter_sends_nothing(self, name, tmp_path, monkeypatch):
+        """These chapters have fragments that are not verbatim slices of
+        the source (a blank line before a \\section is dropped)."""
+        source = (Path(__file__).resolve().parent.parent / f"{name}.tex").read_text(encoding="utf-8")
+        assert any(fragment not in source for fragment in split_into_fragments(source, DEFAULT_FRAGMENT_SIZE))
+        path = tmp_path / f"{name}.tex"
+        path.write_text(source, encoding="utf-8")
+        out = str(tmp_path / "out")
+        # split_into_fragments cuts some \\section{} from its \\label{}, so
+        # an echoed fragment would fail the label check.
+        monkeypatch.setattr(translate_book, "validate_label_attachment", lambda text: [])
+        translate_chapter(str(path), "Polish", out, backend=EchoBackend())
+
+        backend = RecordingEchoBackend()
+        translate_chapter(str(path), "Polish", out, backend=backend)
+
+        assert backend.sent == []
+
+
+FINGERPRINT_FIXTURES = [
+    CHAPTER,
+    "\\section{The War}\\label{sec:war-1948} In 66 CE, per Mark 13:1-2 and \\cite{a, b,c}, "
+    "\\emph{λόγος} and \\textgreek{ὁ λόγος} (שלום) \\footnotemark{} \\footnote{3000 bc}.",
+    "\\label{a\\label{b} 1:2:3 2024ad 0000 x2024 12345 BC \\href{http://x.org/1999}{link} "
+    "\\includegraphics[width=2cm]{fig/map.png} \\ref{fig:1} α \\subsubsection{\\textbf{\\textit{x}}}",
+    "",
+]
+
+
+@pytest.mark.parametrize("text", FINGERPRINT_FIXTURES)
+def test_extract_fingerprints_matches_the_per_kind_regex_passes(text):
+    fp = extract_fingerprints(text)
+    expected = reference_fingerprints(text)
+
+    assert {key: fp[key] for key in expected} == expected
+    assert list(fp['command_counts']) == list(expected['command_counts'])
+    with pytest.raises(AttributeError):
+        fp.labels = frozenset()
+
+
+def test_max_weight_assignment_beats_best_pair_first():
+    """Row 0 fits column 0 best, but only column 0 fits row 1."""
+    weights = {(0, 0): 3.0, (0, 1): 2.9, (1, 0): 2.0, (2, 5): 1.0}
+
+    assert max_weight_assignment(weights) == [(0, 1), (1, 0), (2, 5)]
+
+
+def test_match_translations_uses_shared_cites_over_command_counts():
+    """Translation A' lost an \\emph and B' gained one, so by
+    fingerprint_similarity alone B' fits A best; the cites say otherwise."""
+    a = "Alpha \\emph{one} and \\emph{two} \\cite{josephus:war}."
+    b = "Beta \\emph{one} \\cite{josephus:war,tacitus:annals}."
+    a_translated = "Alfa \\emph{jeden} i dwa \\cite{josephus:war}."
+    b_translated = "Beta \\emph{jeden} \\emph{dwa} \\cite{josephus:war,tacitus:annals}."
+
+    matches = match_translations_to_sources([a, b], [b_translated, "Unrelated reply.", a_translated])
+
+    assert [(index, text) for index, text, _ in matches] == [(1, a_translated), (2, b_translated)]
+
+
+def git(repo, *args):
+    subprocess.run(["git", "-C", str(repo), "-c", "user.name=t", "-c", "user.email=t@t", *args],
+                   check=True, capture_output=True)
+
+
+class TestSync:
+    """A committed chapter and its translation (every paragraph of it
+    marked "PL:", with an extra paragraph the translator split off);
+    the English then changes."""
+
+    def setup_repo(self, tmp_path):
+        chapter = tmp_path / "chapter3.tex"
+        chapter.write_text(CHAPTER, encoding="utf-8")
+        out = tmp_path / "translations" / "polish"
+        out.mkdir(parents=True)
+        paragraphs = [f"PL: {p}" for p in CHAPTER.split("\n\n")]
+        paragraphs.insert(3, "PL: Przypis tłumacza.")
+        translation = out / "chapter3_po.tex"
+        translation.write_text("\n\n".join(paragraphs) + "\n", encoding="utf-8")
+        git(tmp_path, "init", "-q")
+        git(tmp_path, "add", ".")
+        git(tmp_path, "commit", "-qm", "translated")
+        return chapter, translation
+
+    def test_sync_retranslates_and_splices_only_the_changed_paragraphs(self, tmp_path):
+        chapter, translation = self.setup_repo(tmp_path)
+        edited = CHAPTER.replace("Part 2 of the chapter,", "Part 2 of the chapter, revised,")
+        edited = edited.replace("\n\nPart 5 of the chapter, on the Zealots, citing \\cite{josephus:war5}.", "")
+        chapter.write_text(edited, encoding="utf-8")
+        backend = RecordingEchoBackend()
+
+        sync_chapter(str(chapter), "Polish", str(translation.parent), backend=backend)
+
+        assert backend.sent == ["Part 2 of the chapter, revised, on the Zealots, citing \\cite{josephus:war2}."]
+        paragraphs = translation.read_text(encoding="utf-8").split("\n\n")
+        assert [p[:10] for p in paragraphs] == [
+            "PL: Part 1", "Part 2 of ", "PL: Part 3", "PL: Przypi", "PL: Part 4", "PL: Part 6",
+        ]
+        assert translation.read_text(encoding="utf-8").endswith("war6}.\n")
+
+    def test_sync_of_an_unchanged_chapter_sends_nothing(self, tmp_path):
+        chapter, translation = self.setup_repo(tmp_path)
+        before = translation.read_text(encoding="utf-8")
+        backend = RecordingEchoBackend()
+
+        sync_chapter(str(chapter), "Polish", str(translation.parent), backend=backend)
+
+        assert backend.sent == []
+        assert translation.read_text(encoding="utf-8") == before
+
+    def merge_and_edit(self, tmp_path):
+        chapter, translation = self.setup_repo(tmp_path)
+        paragraphs = translation.read_text(encoding="utf-8").split("\n\n")
+        paragraphs[5:7] = [paragraphs[5] + " " + paragraphs[6]]  # the translator merged parts 5 and 6
+        translation.write_text("\n\n".join(paragraphs), encoding="utf-8")
+        git(tmp_path, "commit", "-qam", "merged")
+        edited = CHAPTER.replace("Part 5 of the chapter,", "Part 5 of the chapter, revised,")
+        chapter.write_text(edited, encoding="utf-8")
+        return chapter, translation, edited
+
+    def test_sync_stops_where_paragraphs_do_not_line_up(self, tmp_path, capsys):
+        chapter, translation, _ = self.merge_and_edit(tmp_path)
+        before = translation.read_text(encoding="utf-8")
+        backend = RecordingEchoBackend()
+
+        with pytest.raises(SystemExit):
+            sync_chapter(str(chapter), "Polish", str(translation.parent), backend=backend)
+
+        assert backend.sent == []
+        assert translation.read_text(encoding="utf-8") == before
+        assert "English paragraphs 5-6" in capsys.readouterr().err
+
+    def test_force_full_retranslates_the_whole_chapter_where_paragraphs_do_not_line_up(self, tmp_path):
+        chapter, translation, edited = self.merge_and_edit(tmp_path)
+
+        sync_chapter(str(chapter), "Polish", str(translation.parent), fragment_size=80,
+                     backend=EchoBackend(), force_full=True)
+
+        assert translation.read_text(encoding="utf-8") == edited
+
+    def test_sync_reports_a_chapter_missing_at_base(self, tmp_path, capsys):
+        chapter, translation = self.setup_repo(tmp_path)
+        added = chapter.with_name("chapter4.tex")
+        added.write_text(CHAPTER, encoding="utf-8")
+        (translation.parent / "chapter4_po.tex").write_text(CHAPTER, encoding="utf-8")
+
+        with pytest.raises(SystemExit):
+            sync_chapter(str(added), "Polish", str(translation.parent), base="HEAD")
+
+        assert "ERROR: Cannot read chapter4.tex at HEAD" in capsys.readouterr().err
+
+    def test_sync_outside_a_repository_reports_it(self, tmp_path, capsys):
+        chapter = tmp_path / "chapter3.tex"
+        chapter.write_text(CHAPTER, encoding="utf-8")
+        (tmp_path / "chapter3_po.tex").write_text(CHAPTER, encoding="utf-8")
+
+        with pytest.raises(SystemExit):
+            sync_chapter(str(chapter), "Polish", str(tmp_path), base="HEAD")
+
+        assert "ERROR: Cannot read chapter3.tex" in capsys.readouterr().err
+
+
+BOOK = Path(__file__).resolve().parent.parent
+
+
+class TestSyncOfTheBook:
+    """plan_sync on chapter 3 and its Polish translation, which splits and
+    merges paragraphs in places."""
+
+    english = (BOOK / "chapter3.tex").read_text(encoding="utf-8")
+    polish = (BOOK / "translations" / "polish" / "chapter3_po.tex").read_text(encoding="utf-8")
+
+    def add_sentence(self, paragraph):
+        end = self.english.index("\n\n", self.english.index(paragraph))
+        return self.english[:end] + " This sentence was added." + self.english[end:]
+
+    def test_a_sentence_added_to_a_paragraph_replaces_its_translation(self):
+        plan = plan_sync(self.english, self.add_sentence("\\paragraph{Mary as Queen of Heaven.}"), self.polish)
+
+        assert len(plan) == 1
+        start, stop, new_text = plan[0]
+        translated = split_paragraphs(self.polish)[0][start:stop]
+        assert len(translated) == len(new_text.split("\n\n"))
+        assert translated[-1].startswith("\\paragraph{Maria jako Królowa Niebios.}")
+        assert new_text.split("\n\n")[-1].startswith("\\paragraph{Mary as Queen of Heaven.}")
+
+    def test_every_span_replaces_as_many_paragraphs_as_it_was_translated_from(self):
+        paragraphs = [p.strip() for p in split_paragraphs(self.english)[0] if p.strip()]
+        for paragraph in paragraphs[::7]:
+            try:
+                plan = plan_sync(self.english, self.add_sentence(paragraph), self.polish)
+            except ValueError:
+                continue  # sync_chapter stops on these
+            for start, stop, new_text in plan:
+                translated = [p for p in split_paragraphs(self.polish)[0][start:stop] if p.strip()]
+                assert len(translated) == len(new_text.split("\n\n")), paragraph[:40]
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
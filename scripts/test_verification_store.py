@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""Tests for verification_store.py."""
+
+import os
+
+from verification_store import VerificationStore
+
+
+def test_result_is_found_only_under_the_inputs_it_was_stored_with(tmp_path):
+    store = VerificationStore(tmp_path / "results.sqlite")
+    inputs = ("josephus:war", "2.497--507", False, "sources-a", "registry-a")
+
+    store.put(inputs, "LOCATED", "[book2.txt] Cesarea")
+
+    assert store.get(inputs) == ("LOCATED", "[book2.txt] Cesarea")
+    assert store.get(inputs[:3] + ("sources-b", "registry-a")) is None
+    assert store.get(inputs[:2] + (True,) + inputs[3:]) is None
+
+
+def test_a_new_result_replaces_the_stale_one(tmp_path):
+    store = VerificationStore(tmp_path / "results.sqlite")
+    old = ("josephus:war", "4.317", False, "sources-a", "registry-a")
+    new = ("josephus:war", "4.317", False, "sources-b", "registry-a")
+
+    store.put(old, "NOT_FOUND", "")
+    store.put(new, "LOCATED", "[book4.txt] Ananus")
+    store.close()
+    reopened = VerificationStore(tmp_path / "results.sqlite")
+
+    assert reopened.get(new) == ("LOCATED", "[book4.txt] Ananus")
+    assert reopened.get(old) is None
+
+
+def test_files_hash_follows_file_contents(tmp_path):
+    path = tmp_path / "book1.txt"
+    path.write_text("first version", encoding="utf-8")
+    store = VerificationStore(tmp_path / "results.sqlite")
+    first = store.files_hash([path])
+    store.close()
+
+    path.write_text("second version", encoding="utf-8")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    fresh = VerificationStore(tmp_path / "results.sqlite")
+
+    assert fresh.files_hash([path]) != first
+    assert fresh.files_hash([]) == VerificationStore(tmp_path / "other.sqlite").files_hash([])
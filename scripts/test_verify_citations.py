@@ -1,9 +1,13 @@
 #!/usr/bin/env python3
 """Tests for verify_citations.py."""
 
+import os
+
 import pytest
 
 import verify_citations
+from source_corpus import page_table_path, write_paged_text
+from verification_store import VerificationStore
 from verify_citations import find_source_files, normalize_ref, search_passage_in_text
 
 
@@ -250,6 +254,15 @@ def test_reference_with_a_book_number_searches_that_book_first(tmp_path, monkeyp
     assert selected_file_names(tmp_path, "51.22", monkeypatch) == ["book51.txt", "full.txt"]
 
 
+def test_page_reference_searches_a_paged_file_first(tmp_path, monkeypatch):
+    monkeypatch.setattr(verify_citations, "SOURCES_DIR", epiphanius_sources_dir(tmp_path))
+    write_paged_text(tmp_path / "patristic" / "epiphanius_panarion" / "english.txt", [("42", 44, "Page 42.")])
+
+    names = [f.name for f in find_source_files("epiphanius:panarion", ref=normalize_ref("42"))]
+
+    assert names == ["english.txt", "full.txt", "book51.txt"]
+
+
 def test_citation_without_a_passage_keeps_alphabetical_order(tmp_path, monkeypatch):
     assert selected_file_names(tmp_path, None, monkeypatch) == ["book51.txt", "full.txt"]
 
@@ -336,3 +349,247 @@ def test_registered_hint_in_a_later_file_beats_an_earlier_section_match(tmp_path
 
     assert citation.status == "LOCATED"
     assert citation.snippet.startswith("[book16ch2.txt]")
+
+
+def test_source_index_records_the_first_line_of_each_marker():
+    text = """Front matter.
+[
+497
+]
+First chunk.
+Chapter 2
+[497]
+A repeated marker further down.
+"""
+
+    source = verify_citations.index_source_text(text)
+
+    assert source.markers[("bare", "497")] == 2
+    assert source.markers[("bracket", "497")] == 6
+    assert source.markers[("chapter", "2")] == 5
+
+
+def test_zero_padded_marker_does_not_answer_for_the_section():
+    """The index keys markers by their digits as written, so "[0497]" is
+    not section 497, just as the literal pattern r"\\[497\\]" never matched it."""
+    text = "Front matter.\n[0497]\nA padded page number.\n"
+
+    snippet = search_passage_in_text(text, "2.497", "josephus:war")
+
+    assert snippet == ""
+
+
+def test_find_first_match_prefers_pattern_priority_over_line_order():
+    """A lower-priority pattern matching an earlier line must not win over
+    the first pattern's match further down, even where the combined scan
+    reports the lower-priority alternative first on a shared line."""
+    lines = [
+        "Vision IV of the Shepherd.",
+        "Fourth Vision, and Vision 4 again.",
+        "Vision 4 begins here.",
+    ]
+
+    match = verify_citations.find_first_match(
+        lines, [r"Vision\s+4\b", r"Vision\s+IV\b", r"Fourth\s+Vision"]
+    )
+
+    assert match == (0, 1)
+
+
+def test_find_first_match_handles_patterns_that_cannot_be_combined():
+    lines = ["abab", "xx"]
+
+    assert verify_citations.find_first_match(lines, [r"(x)\1", r"(ab)\1"]) == (0, 1)
+
+
+def test_a_page_reference_reads_the_page_from_the_page_table(tmp_path):
+    path = tmp_path / "full.txt"
+    write_paged_text(path, [
+        ("309", 10, "Footnote: the 400 priests of Amun at Thebes."),
+        ("310", 11, "THE SEARCH FOR GOD 310\nThe hidden god of Thebes."),
+        ("311", 12, "311\nAmun, one and many."),
+    ])
+    source = verify_citations.index_source_file(path)
+
+    assert search_passage_in_text(source, "310--311", "assmann:searchgod") == (
+        "(p. 310) THE SEARCH FOR GOD 310\nThe hidden god of Thebes."
+    )
+    assert search_passage_in_text(source, "p. 311", "assmann:searchgod").startswith("(p. 311) 311\nAmun")
+    # The book has no page 400; another "400" in it is not that page.
+    assert search_passage_in_text(source, "400", "assmann:searchgod") == ""
+
+
+def test_source_cache_opens_each_file_once(tmp_path, monkeypatch):
+    path = tmp_path / "book1.txt"
+    path.write_text("1. The first section.\n", encoding="utf-8")
+    opened = []
+    index_source_file = verify_citations.index_source_file
+
+    def counting_index_source_file(source_path):
+        opened.append(source_path.name)
+        return index_source_file(source_path)
+
+    monkeypatch.setattr(verify_citations, "index_source_file", counting_index_source_file)
+    cache = verify_citations.SourceCache(max_bytes=10**6)
+
+    first = cache.load(path)
+    second = cache.load(path)
+
+    assert first is second
+    assert opened == ["book1.txt"]
+
+
+def test_source_cache_evicts_the_least_recently_used_text(tmp_path):
+    paths = {}
+    for name in ("book1.txt", "book2.txt", "book3.txt"):
+        paths[name] = tmp_path / name
+        paths[name].write_text("x" * 1000, encoding="utf-8")
+    probe = verify_citations.SourceCache(max_bytes=10**6)
+    probe.load(paths["book1.txt"])
+    cache = verify_citations.SourceCache(max_bytes=2 * probe.size)
+
+    cache.load(paths["book1.txt"])
+    cache.load(paths["book2.txt"])
+    cache.load(paths["book1.txt"])
+    cache.load(paths["book3.txt"])
+
+    assert [path.name for path in cache._entries] == ["book1.txt", "book3.txt"]
+
+
+def test_parallel_verification_matches_a_serial_run(tmp_path, monkeypatch):
+    source_dir = tmp_path / "ancient" / "josephus_war"
+    source_dir.mkdir(parents=True)
+    (source_dir / "book2.txt").write_text(
+        "Book II\n[\n497\n]\nNow the people of Cesarea had slain the Jews.\n",
+        encoding="utf-8",
+    )
+    (source_dir / "book4.txt").write_text(
+        "[\n310\n]\nEarlier.\n[\n314\n]\nAnanus was slain here.\n[\n326\n]\nLater.\n",
+        encoding="utf-8",
+    )
+    monkeypatch.setattr(verify_citations, "SOURCES_DIR", tmp_path)
+
+    def citations():
+        return [
+            verify_citations.Citation("chapter5.tex", 10, "josephus:war", "2.497--507", ""),
+            verify_citations.Citation("chapter5.tex", 12, "josephus:war", "4.317", ""),
+            verify_citations.Citation("chapter5.tex", 14, "josephus:war", "7.1", ""),
+            verify_citations.Citation("chapter5.tex", 16, "no:such-key", "1", ""),
+            verify_citations.Citation("chapter5.tex", 18, "josephus:war", "", ""),
+        ]
+
+    serial = citations()
+    for citation in serial:
+        verify_citations.verify_citation(citation)
+    parallel = citations()
+    verify_citations.verify_in_parallel(parallel, jobs=2)
+
+    assert [(c.status, c.snippet) for c in parallel] == [(c.status, c.snippet) for c in serial]
+    assert [c.status for c in parallel] == [
+        "LOCATED", "LOCATED", "NO_SOURCE", "UNKNOWN_KEY", "NO_PASSAGE",
+    ]
+
+
+def test_stored_results_are_reused_until_a_source_file_changes(tmp_path, monkeypatch):
+    source_dir = tmp_path / "ancient" / "josephus_war"
+    source_dir.mkdir(parents=True)
+    book = source_dir / "book2.txt"
+    book.write_text("Book II\n[\n497\n]\nThe Jews of Cesarea.\n", encoding="utf-8")
+    monkeypatch.setattr(verify_citations, "SOURCES_DIR", tmp_path)
+    store = VerificationStore(tmp_path / "results.sqlite")
+
+    def citation(line_num):
+        return verify_citations.Citation(
+            "chapter5.tex", line_num, "josephus:war", "2.497--507", f"line {line_num}"
+        )
+
+    first = [citation(10)]
+    stale = verify_citations.reuse_stored_results(first, False, store)
+    assert list(stale) == [0]
+    verify_citations.verify_citation(first[0])
+    store.put(stale[0], first[0].status, first[0].snippet)
+
+    moved = [citation(42)]
+    assert verify_citations.reuse_stored_results(moved, False, store) == {}
+    assert (moved[0].status, moved[0].snippet) == (first[0].status, first[0].snippet)
+    assert moved[0].line_num == 42
+    store.close()
+
+    book.write_text("Book II\nThe section is gone.\n", encoding="utf-8")
+    stat = book.stat()
+    os.utime(book, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    fresh_store = VerificationStore(tmp_path / "results.sqlite")
+
+    assert list(verify_citations.reuse_stored_results([citation(42)], False, fresh_store)) == [0]
+
+
+def test_stored_results_are_not_reused_once_a_page_table_appears_or_goes(tmp_path, monkeypatch):
+    """A page table changes what a page reference finds without changing
+    the text beside it."""
+    book = tmp_path / "patristic" / "epiphanius_panarion" / "english.txt"
+    book.parent.mkdir(parents=True)
+    book.write_text("Page 42.", encoding="utf-8")
+    monkeypatch.setattr(verify_citations, "SOURCES_DIR", tmp_path)
+    cite = verify_citations.Citation("chapter5.tex", 10, "epiphanius:panarion", "p. 42", "line 10")
+
+    def stored_inputs():
+        store = VerificationStore(tmp_path / "results.sqlite")
+        inputs = verify_citations.citation_inputs(cite, False, store)
+        store.close()
+        return inputs
+
+    plain = stored_inputs()
+    write_paged_text(book, [("42", 44, "Page 42.")])
+    paged = stored_inputs()
+    page_table_path(book).unlink()
+
+    assert book.read_text(encoding="utf-8") == "Page 42."
+    assert paged != plain
+    assert stored_inputs() == plain
+
+
+MANUSCRIPT = r"""\section{Oracles}
+% \cite[1.1]{josephus:war} in a comment is not a citation
+The oracle was read as a prophecy of Vespasian \cite[6.312--313]{josephus:war}.
+\begin{quote}
+\emph{That a man from their country} should become governor of the habitable earth.
+\end{quote}
+Tacitus reports the same oracle \cite[5.13]{tacitus:histories}.
+"""
+
+
+def test_manuscript_reads_citations_outside_comment_lines():
+    manuscript = verify_citations.parse_manuscript(MANUSCRIPT, "chapter5.tex")
+
+    cites = [(c.line_num, c.key, c.passage) for c in manuscript.citations()]
+
+    assert cites == [(3, "josephus:war", "6.312--313"), (7, "tacitus:histories", "5.13")]
+    assert manuscript.quote_ends == {3: 5}
+
+
+def test_claim_extends_over_the_following_quote_block_and_strips_latex():
+    manuscript = verify_citations.parse_manuscript(MANUSCRIPT, "chapter5.tex")
+
+    claim = manuscript.claim(3)
+
+    assert "That a man from their country should become governor" in claim
+    assert "\\cite" not in claim
+    assert "\\begin{quote}" not in claim
+
+
+def test_manuscript_file_is_read_once_for_citations_and_claims(tmp_path, monkeypatch):
+    tex_path = tmp_path / "chapter5.tex"
+    tex_path.write_text(MANUSCRIPT, encoding="utf-8")
+    reads = []
+    read_text = type(tex_path).read_text
+
+    def counting_read_text(self, *args, **kwargs):
+        reads.append(self.name)
+        return read_text(self, *args, **kwargs)
+
+    monkeypatch.setattr(type(tex_path), "read_text", counting_read_text)
+
+    for citation in verify_citations.extract_citations(tex_path):
+        verify_citations.extract_claim(tex_path, citation.line_num)
+
+    assert reads == ["chapter5.tex"]
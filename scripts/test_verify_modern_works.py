@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""Tests for verify_modern_works.py, against a local fake of the Google
+Books, Open Library and Wikipedia APIs."""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+import verify_modern_works
+from http_cache import HttpCache
+from http_session import HostRateLimiter, make_session
+from verify_modern_works import ApiClient, search_google_books, search_open_library, verify_work
+
+DESCRIPTION = "Brandon argues that Jesus was closely associated with the Zealot movement. " * 3
+
+
+class LookupApiStub(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        url = urlparse(self.path)
+        query = {name: values[0] for name, values in parse_qs(url.query).items()}
+        with server.lock:
+            server.requested.append(self.path)
+
+        if url.path in server.busy:
+            data = b"<html>Service busy</html>"
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+            return
+        if url.path == "/books/v1/volumes":
+            server.catalogs_running.wait()
+            body = {"totalItems": 1, "items": [{"volumeInfo": {
+                "title": "Jesus and the Zealots", "authors": ["S. G. F. Brandon"],
+                "description": DESCRIPTION,
+            }}]}
+        elif url.path == "/search.json":
+            server.catalogs_running.wait()
+            body = {"numFound": 1, "docs": [{"key": "/works/OL1W", "title": "Jesus and the Zealots"}]}
+        elif url.path == "/works/OL1W.json":
+            body = {"description": {"value": DESCRIPTION}}
+        elif query.get("list") == "search":
+            # The book's article, and one on its subject.
+            book = query["srsearch"].split(" ", 1)[-1] if "Brandon" in query["srsearch"] else query["srsearch"]
+            body = {"query": {"search": [
+                {"title": book, "snippet": f"<span>{book}</span> is a book by a scholar of early Christianity"},
+                {"title": "Zealots", "snippet": "short"},
+            ]}}
+        else:
+            titles = query["titles"].split("|")
+            body = {"query": {"pages": {
+                str(n): {"title": title, "extract": DESCRIPTION} for n, title in enumerate(titles)
+            }}}
+
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class NoWait:
+    def wait(self):
+        pass
+
+
+@pytest.fixture
+def lookup_apis(tmp_path, monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), LookupApiStub)
+    server.lock = threading.Lock()
+    server.requested = []
+    server.busy = set()  # paths answered with a 200 HTML page
+    # The Google Books and Open Library searches each wait for the other:
+    # run one after the other, they would time out.
+    server.catalogs_running = threading.Barrier(2, timeout=5)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    monkeypatch.setattr(verify_modern_works, "GOOGLE_BOOKS_URL", f"{base}/books/v1/volumes")
+    monkeypatch.setattr(verify_modern_works, "OPEN_LIBRARY_URL", base)
+    monkeypatch.setattr(verify_modern_works, "WIKIPEDIA_API_URL", f"{base}/w/api.php")
+    api = ApiClient(make_session(), HttpCache(tmp_path / ".api_cache"), HostRateLimiter(0), max_age=3600)
+    monkeypatch.setattr(verify_modern_works, "API", api)
+    monkeypatch.setattr(verify_modern_works, "WIKI", verify_modern_works.WikipediaClient())
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+CLAIM = {
+    "title": "Jesus and the Zealots",
+    "author": "S. G. F. Brandon",
+    "year": "1967",
+    "citations": [{"file": "chapter03.tex", "line": 120, "claim": "Brandon reads Jesus as close to the Zealots."}],
+}
+
+
+def test_lookups_run_together_and_a_second_run_is_served_from_the_cache(lookup_apis):
+    first = verify_work("brandon:zealots", CLAIM)
+
+    assert first["verified"] and first["book_exists"]
+    assert [e["source"] for e in first["evidence"]] == [
+        "Google Books (metadata)",
+        "Open Library (metadata)",
+        "Wikipedia: Jesus and the Zealots",  # the claim search
+        "Wikipedia: Jesus and the Zealots",  # the book's article
+    ]
+    assert lookup_apis.requested
+
+    lookup_apis.requested.clear()
+    lookup_apis.catalogs_running = NoWait()
+
+    assert verify_work("brandon:zealots", CLAIM) == first
+    assert lookup_apis.requested == []
+
+
+def test_a_stale_cached_response_is_requested_again(lookup_apis):
+    lookup_apis.catalogs_running = NoWait()
+    verify_work("brandon:zealots", CLAIM)
+    lookup_apis.requested.clear()
+
+    verify_modern_works.API.max_age = 0
+    verify_work("brandon:zealots", CLAIM)
+
+    assert any(path.startswith("/books/v1/volumes") for path in lookup_apis.requested)
+
+
+def extract_requests(requested):
+    return [
+        parse_qs(urlparse(path).query)["titles"][0].split("|")
+        for path in requested
+        if "prop=extracts" in path and "exintro" in path
+    ]
+
+
+def test_prefetch_fetches_the_intros_of_every_work_in_one_request(lookup_apis):
+    lookup_apis.catalogs_running = NoWait()
+    claims = {
+        "brandon:zealots": CLAIM,
+        "brandon:fall": {**CLAIM, "title": "The Fall of Jerusalem"},
+    }
+
+    verify_modern_works.WIKI.prefetch_summaries(claims)
+    summaries = [verify_modern_works.fetch_wikipedia_summary(c["title"], c["author"]) for c in claims.values()]
+
+    assert extract_requests(lookup_apis.requested) == [
+        ["Jesus and the Zealots", "The Fall of Jerusalem", "Zealots"],
+    ]
+    assert [s["page_title"] for s in summaries] == ["Jesus and the Zealots", "The Fall of Jerusalem"]
+
+
+def test_a_later_run_with_more_works_requests_only_the_new_intros(lookup_apis):
+    """Adding a work changes which titles share a batch; the intros of the
+    titles already fetched come from the cache all the same."""
+    lookup_apis.catalogs_running = NoWait()
+    verify_modern_works.WIKI.prefetch_summaries({"brandon:zealots": CLAIM})
+    lookup_apis.requested.clear()
+
+    verify_modern_works.WIKI = verify_modern_works.WikipediaClient()
+    verify_modern_works.WIKI.prefetch_summaries({
+        "brandon:zealots": CLAIM,
+        "brandon:fall": {**CLAIM, "title": "The Fall of Jerusalem"},
+    })
+    summary = verify_modern_works.fetch_wikipedia_summary(CLAIM["title"], CLAIM["author"])
+
+    assert extract_requests(lookup_apis.requested) == [["The Fall of Jerusalem"]]
+    assert summary["page_title"] == "Jesus and the Zealots"
+
+
+def test_a_200_that_is_not_json_counts_as_not_found(lookup_apis):
+    lookup_apis.catalogs_running = NoWait()
+    lookup_apis.busy = {"/books/v1/volumes", "/search.json", "/w/api.php"}
+
+    assert search_google_books(CLAIM["title"], CLAIM["author"]) is None
+    assert search_open_library(CLAIM["title"], CLAIM["author"]) is None
+    result = verify_work("brandon:zealots", CLAIM)
+    assert "book_exists" not in result and not result["evidence"]
+
+
+def test_an_intro_cached_as_a_page_that_is_not_json_is_requested_again(lookup_apis):
+    params = verify_modern_works._intro_params(["Zealots"])
+    url = verify_modern_works._request_url(verify_modern_works.WIKIPEDIA_API_URL, params)
+    verify_modern_works.API.cache.put(url, b"<html>Service busy</html>")
+
+    assert verify_modern_works.WIKI.intros(["Zealots"]) == {"Zealots": DESCRIPTION}
+    assert extract_requests(lookup_apis.requested) == [["Zealots"]]
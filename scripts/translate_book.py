@@ -9,110 +9,178 @@ Features:
   - Sends each fragment to ChatGPT for translation
   - Preserves LaTeX formatting and commands
   - Writes translated output to new files
+  - Caches each translated fragment by its source text, so a re-run
+    after an edit translates only the fragments that changed
   - Supports recovering fragments from ChatGPT conversation (--recover)
+  - Keeps several fragments in flight on a backend that allows it (--jobs)
+  - Updates an existing translation after the English changed, re-translating
+    only the changed paragraphs (--sync)
+
+Backends (--backend): chatgpt (the macOS ChatGPT app, one fragment at a
+time), openai (the OpenAI API), echo (returns the source unchanged; for
+trying the pipeline without a model).
 
 Usage:
   poetry run python scripts/translate_book.py chapter1.tex --lang Polish
   poetry run python scripts/translate_book.py chapter1.tex --lang Polish --recover
   poetry run python scripts/translate_book.py --all --lang Polish
+  poetry run python scripts/translate_book.py --all --lang Polish --backend openai --jobs 6
+  poetry run python scripts/translate_book.py chapter3.tex --lang Polish --sync
 """
 
 import argparse
+import difflib
 import os
 import re
+import subprocess
 import sys
+import threading
 import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Tuple, Optional
+from types import MappingProxyType
+from typing import Dict, List, Tuple, Optional
+import hashlib
 import json
 import shutil
 
 
-def extract_fingerprints(text: str) -> dict:
+# LaTeX commands counted in a fingerprint's command_counts
+COUNTED_COMMANDS = ('section', 'subsection', 'subsubsection',
+                    'footnote', 'emph', 'textit', 'textbf', 'textgreek')
+
+# Where a fingerprint can start: a command name, a run of digits, a run of
+# two or more Greek or Hebrew letters. extract_fingerprints finds them all
+# in one scan, then reads each fingerprint with an anchored pattern at its
+# start. The pattern opens with a class of the characters a token can
+# start with, which lets the regex engine skip ahead to the next one
+# instead of trying each alternative at every position.
+_GREEK = '\u0370-\u03FF\u1F00-\u1FFF'
+_HEBREW = '\u0590-\u05FF'
+_FINGERPRINT_TOKEN = re.compile(
+    rf'[\\\d{_GREEK}{_HEBREW}]'
+    r'(?:(?<=\\)(label|ref|cite|href|includegraphics|'
+    + '|'.join(sorted(COUNTED_COMMANDS, key=len, reverse=True)) + r')'
+    r'|(?<=\d)(\d*)'
+    rf'|(?<=[{_GREEK}])([{_GREEK}]+)'
+    rf'|(?<=[{_HEBREW}])([{_HEBREW}]+))'
+)
+
+# Command arguments, matched right after the command name
+_COMMAND_ARGUMENT = {
+    'label': re.compile(r'\{([^}]+)\}'),
+    'ref': re.compile(r'\{([^}]+)\}'),
+    'cite': re.compile(r'\{([^}]+)\}'),
+    'href': re.compile(r'\{([^}]+)\}\{'),
+    'includegraphics': re.compile(r'(?:\[[^\]]*\])?\{([^}]+)\}'),
+}
+_COMMAND_FIELD = {'label': 'labels', 'ref': 'refs', 'cite': 'cites',
+                  'href': 'urls', 'includegraphics': 'images'}
+
+# Significant numbers, matched at the start of a run of digits: years
+# (4 digits; 1-2100 kept), verse refs (N:N or N:N-N) and BCE/CE years
+_YEAR = re.compile(r'\b(\d{4})\b')
+_VERSE = re.compile(r'\b(\d{1,3}:\d{1,3}(?:-\d{1,3})?)\b')
+_ERA_YEAR = re.compile(r'\b(\d{1,4})\s*(?:BCE|CE|BC|AD)\b', re.IGNORECASE)
+
+
+@dataclass(frozen=True, slots=True)
+class Fingerprints:
+    """Structural fingerprints of a LaTeX text: elements that MUST survive
+    translation unchanged. Read like the dict they used to be
+    (fp['labels']); command_counts is a read-only mapping."""
+    labels: frozenset
+    refs: frozenset
+    cites: frozenset
+    urls: frozenset
+    images: frozenset
+    greek_strings: frozenset
+    hebrew_strings: frozenset
+    numbers: frozenset
+    command_counts: MappingProxyType
+
+    def __getitem__(self, key: str):
+        return getattr(self, key)
+
+
+def extract_fingerprints(text: str) -> Fingerprints:
     """Extract structural fingerprints from LaTeX text.
 
     Fingerprints are elements that MUST survive translation unchanged.
     Even if 10% of text is lost, these should still match.
 
-    Returns dict with:
-        - labels: set of \\label{} values (never translated)
-        - refs: set of \\ref{} values (never translated)
-        - cites: set of \\cite{} keys (never translated)
-        - urls: set of URLs from \\href{} (never translated)
-        - images: set of \\includegraphics{} paths (never translated)
-        - greek_strings: set of Greek Unicode text (preserved exactly)
-        - hebrew_strings: set of Hebrew Unicode text (preserved exactly)
-        - numbers: set of significant numbers (years, verses, etc.)
-        - command_counts: dict of LaTeX command counts
+    Returns Fingerprints with:
+        - labels: \\label{} values (never translated)
+        - refs: \\ref{} values (never translated)
+        - cites: \\cite{} keys (never translated)
+        - urls: URLs from \\href{} (never translated)
+        - images: \\includegraphics{} paths (never translated)
+        - greek_strings: Greek Unicode text (preserved exactly)
+        - hebrew_strings: Hebrew Unicode text (preserved exactly)
+        - numbers: significant numbers (years, verses, etc.)
+        - command_counts: LaTeX command counts
+
+    One scan over the text finds where each fingerprint can start. The
+    result is what a separate re.finditer per kind gives: a kind's next
+    match is looked for only after its previous one ends, while other
+    kinds are still found inside it (a year in a label, say).
     """
-    fingerprints = {
-        'labels': set(),
-        'refs': set(),
-        'cites': set(),
-        'urls': set(),
-        'images': set(),
-        'greek_strings': set(),
-        'hebrew_strings': set(),
-        'numbers': set(),
-        'command_counts': {},
-    }
-
-    # \label{...} - never translated
-    for match in re.finditer(r'\\label\{([^}]+)\}', text):
-        fingerprints['labels'].add(match.group(1))
-
-    # \ref{...} - never translated
-    for match in re.finditer(r'\\ref\{([^}]+)\}', text):
-        fingerprints['refs'].add(match.group(1))
-
-    # \cite{...} - never translated (may have multiple keys)
-    for match in re.finditer(r'\\cite\{([^}]+)\}', text):
-        for key in match.group(1).split(','):
-            fingerprints['cites'].add(key.strip())
-
-    # \href{URL}{...} - URL never translated
-    for match in re.finditer(r'\\href\{([^}]+)\}\{', text):
-        fingerprints['urls'].add(match.group(1))
-
-    # \includegraphics{...} or \includegraphics[...]{...} - path never translated
-    for match in re.finditer(r'\\includegraphics(?:\[[^\]]*\])?\{([^}]+)\}', text):
-        fingerprints['images'].add(match.group(1))
-
-    # Greek Unicode text (U+0370-03FF basic, U+1F00-1FFF extended)
-    for match in re.finditer(r'[\u0370-\u03FF\u1F00-\u1FFF]{2,}', text):
-        fingerprints['greek_strings'].add(match.group(0))
-
-    # Hebrew Unicode text (U+0590-05FF)
-    for match in re.finditer(r'[\u0590-\u05FF]{2,}', text):
-        fingerprints['hebrew_strings'].add(match.group(0))
-
-    # Significant numbers: years (4 digits), verse refs (N:N), standalone numbers
-    # Years: 4-digit numbers that look like years (70-2100 range plausible)
-    for match in re.finditer(r'\b(\d{4})\b', text):
-        year = int(match.group(1))
-        if 1 <= year <= 2100:
-            fingerprints['numbers'].add(match.group(1))
-
-    # Verse references: N:N or N:N-N patterns
-    for match in re.finditer(r'\b(\d{1,3}:\d{1,3}(?:-\d{1,3})?)\b', text):
-        fingerprints['numbers'].add(match.group(1))
-
-    # BCE/CE years: "N BCE" or "N CE"
-    for match in re.finditer(r'\b(\d{1,4})\s*(?:BCE|CE|BC|AD)\b', text, re.IGNORECASE):
-        fingerprints['numbers'].add(match.group(1))
-
-    # Command counts - count occurrences of key LaTeX commands
-    commands_to_count = ['section', 'subsection', 'subsubsection',
-                         'footnote', 'emph', 'textit', 'textbf', 'textgreek']
-    for cmd in commands_to_count:
-        count = len(re.findall(rf'\\{cmd}\{{', text))
-        if count > 0:
-            fingerprints['command_counts'][cmd] = count
-
-    return fingerprints
-
-
-def fingerprint_similarity(source_fp: dict, translated_fp: dict) -> float:
+    fields = {'labels': set(), 'refs': set(), 'cites': set(), 'urls': set(), 'images': set()}
+    greek, hebrew, numbers = set(), set(), set()
+    command_counts = {}
+    # End of the last match of each kind
+    ends = dict.fromkeys(('label', 'ref', 'cite', 'href', 'includegraphics', 'year', 'verse', 'era'), 0)
+
+    for token in _FINGERPRINT_TOKEN.finditer(text):
+        kind = token.lastindex
+        if kind == 1:
+            command = token.group(1)
+            pos = token.end()
+            argument = _COMMAND_ARGUMENT.get(command)
+            if argument is None:
+                if text.startswith('{', pos):
+                    command_counts[command] = command_counts.get(command, 0) + 1
+                continue
+            if token.start() < ends[command]:
+                continue
+            match = argument.match(text, pos)
+            if match:
+                ends[command] = match.end()
+                if command == 'cite':
+                    fields['cites'].update(key.strip() for key in match.group(1).split(','))
+                else:
+                    fields[_COMMAND_FIELD[command]].add(match.group(1))
+        elif kind == 2:
+            pos = token.start()
+            for kind, pattern in (('year', _YEAR), ('verse', _VERSE), ('era', _ERA_YEAR)):
+                if pos < ends[kind]:
+                    continue
+                match = pattern.match(text, pos)
+                if match and (kind != 'year' or 1 <= int(match.group(1)) <= 2100):
+                    ends[kind] = match.end()
+                    numbers.add(match.group(1))
+        elif kind == 3:
+            greek.add(token.group())
+        else:
+            hebrew.add(token.group())
+
+    return Fingerprints(
+        labels=frozenset(fields['labels']),
+        refs=frozenset(fields['refs']),
+        cites=frozenset(fields['cites']),
+        urls=frozenset(fields['urls']),
+        images=frozenset(fields['images']),
+        greek_strings=frozenset(greek),
+        hebrew_strings=frozenset(hebrew),
+        numbers=frozenset(numbers),
+        command_counts=MappingProxyType(
+            {cmd: command_counts[cmd] for cmd in COUNTED_COMMANDS if cmd in command_counts}),
+    )
+
+
+def fingerprint_similarity(source_fp: Fingerprints, translated_fp: Fingerprints) -> float:
     """Calculate similarity score for MATCHING translations to sources.
 
     PURPOSE: Find which translation belongs to which source fragment.
@@ -175,7 +243,7 @@ def validate_label_attachment(text: str) -> List[str]:
     return errors
 
 
-def validate_fingerprints(source_fp: dict, translated_fp: dict, verbose: bool = False, translated_text: str = None) -> Tuple[bool, List[str]]:
+def validate_fingerprints(source_fp: Fingerprints, translated_fp: Fingerprints, verbose: bool = False, translated_text: str = None) -> Tuple[bool, List[str]]:
     r"""Validate that translation matches source.
 
     PHILOSOPHY:
@@ -239,51 +307,157 @@ def validate_fingerprints(source_fp: dict, translated_fp: dict, verbose: bool =
     return len(errors) == 0, errors
 
 
+def _match_keys(fp: Fingerprints) -> set:
+    """The marks that tie a translation to its source fragment: labels,
+    cites, and Greek and Hebrew strings, all copied verbatim."""
+    return ({('label', v) for v in fp['labels']} | {('cite', v) for v in fp['cites']}
+            | {('greek', v) for v in fp['greek_strings']} | {('hebrew', v) for v in fp['hebrew_strings']})
+
+
+def max_weight_assignment(weights: Dict[Tuple[int, int], float]) -> List[Tuple[int, int]]:
+    """Pair rows with columns, each used at most once, for the largest total
+    weight; weights maps (row, column) to a positive weight, and a pair not
+    in it cannot be made.
+
+    The Hungarian algorithm (shortest augmenting paths, as in
+    scipy.optimize.linear_sum_assignment), run separately on each set of
+    rows and columns connected by weights: recovery's candidates mostly
+    share marks with one or two fragments, so the sets are small.
+    """
+    # Union-find over rows ('r', i) and columns ('c', j)
+    parent = {}
+
+    def find(x):
+        parent.setdefault(x, x)
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for row, col in weights:
+        parent[find(('r', row))] = find(('c', col))
+
+    components = {}
+    for row, col in weights:
+        rows, cols = components.setdefault(find(('r', row)), (set(), set()))
+        rows.add(row)
+        cols.add(col)
+
+    pairs = []
+    for rows, cols in components.values():
+        rows, cols = sorted(rows), sorted(cols)
+        transpose = len(rows) > len(cols)
+        if transpose:
+            rows, cols = cols, rows
+        # Minimise cost = -weight; an impossible pair costs 0, the same as
+        # leaving both unpaired, and is dropped below.
+        cost = [[-weights.get((c, r) if transpose else (r, c), 0.0) for c in cols] for r in rows]
+        for i, j in _hungarian(cost):
+            row, col = (cols[j], rows[i]) if transpose else (rows[i], cols[j])
+            if (row, col) in weights:
+                pairs.append((row, col))
+    return sorted(pairs)
+
+
+def _hungarian(cost: List[List[float]]) -> List[Tuple[int, int]]:
+    """Minimum-cost assignment of every row of cost (n rows, m >= n
+    columns) to a distinct column. Returns (row, column) pairs."""
+    n, m = len(cost), len(cost[0])
+    inf = float('inf')
+    u = [0.0] * (n + 1)
+    v = [0.0] * (m + 1)
+    owner = [0] * (m + 1)  # owner[j]: 1-based row assigned to column j, 0 for none
+    way = [0] * (m + 1)
+    for i in range(1, n + 1):
+        owner[0] = i
+        j0 = 0
+        minv = [inf] * (m + 1)
+        used = [False] * (m + 1)
+        while True:
+            used[j0] = True
+            i0 = owner[j0]
+            row = cost[i0 - 1]
+            delta, j1 = inf, 0
+            for j in range(1, m + 1):
+                if not used[j]:
+                    reduced = row[j - 1] - u[i0] - v[j]
+                    if reduced < minv[j]:
+                        minv[j] = reduced
+                        way[j] = j0
+                    if minv[j] < delta:
+                        delta, j1 = minv[j], j
+            for j in range(m + 1):
+                if used[j]:
+                    u[owner[j]] += delta
+                    v[j] -= delta
+                else:
+                    minv[j] -= delta
+            j0 = j1
+            if owner[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            owner[j0] = owner[j1]
+            j0 = j1
+    return [(owner[j] - 1, j - 1) for j in range(1, m + 1) if owner[j]]
+
+
 def match_translations_to_sources(
     source_fragments: List[str],
     translated_texts: List[str]
 ) -> List[Tuple[int, str, float]]:
     """Match translated texts to source fragments using fingerprinting.
 
+    A source is scored only against the translations sharing one of its
+    match keys (labels, cites, Greek, Hebrew) through an index of the
+    translations; a source with none is scored against all of them. The
+    pairing with the largest total score is then chosen (a greedy choice
+    of the best pair first can take the one translation a later source
+    needed). Scores are fingerprint_similarity plus the share of match
+    keys in common, which tells apart sources with the same command
+    counts, plus a tenth for how close the length comes to the expected
+    translation length, which tells apart sources with no marks at all.
+
     Args:
         source_fragments: List of source LaTeX fragments
         translated_texts: List of translated texts (order unknown)
 
     Returns:
-        List of (fragment_index, translated_text, confidence) tuples.
-        fragment_index is 1-based. Only includes matches with confidence > 0.5.
+        List of (fragment_index, translated_text, confidence) tuples, where
+        confidence is fingerprint_similarity. fragment_index is 1-based.
+        Only includes matches with confidence > 0.
     """
-    # Extract fingerprints for all sources
-    source_fps = [(i+1, extract_fingerprints(frag)) for i, frag in enumerate(source_fragments)]
-
-    # Extract fingerprints for all translations
-    translated_fps = [(text, extract_fingerprints(text)) for text in translated_texts]
-
-    matches = []
-    used_sources = set()
-    used_translations = set()
-
-    # Find best matches greedily (highest similarity first)
-    all_pairs = []
-    for src_idx, src_fp in source_fps:
-        for t_idx, (t_text, t_fp) in enumerate(translated_fps):
-            similarity = fingerprint_similarity(src_fp, t_fp)
+    source_fps = [extract_fingerprints(frag) for frag in source_fragments]
+    translated_fps = [extract_fingerprints(text) for text in translated_texts]
+    translated_keys = [_match_keys(fp) for fp in translated_fps]
+    source_lengths = [len(frag) for frag in source_fragments]
+    translated_lengths = [len(text) for text in translated_texts]
+
+    index = {}
+    for t_idx, keys in enumerate(translated_keys):
+        for key in keys:
+            index.setdefault(key, []).append(t_idx)
+
+    weights = {}
+    confidence = {}
+    for s_idx, src_fp in enumerate(source_fps):
+        keys = _match_keys(src_fp)
+        if keys:
+            candidates = {t_idx for key in keys for t_idx in index.get(key, ())}
+        else:
+            candidates = range(len(translated_fps))
+        for t_idx in candidates:
+            similarity = fingerprint_similarity(src_fp, translated_fps[t_idx])
             if similarity > 0:  # Any match at all
-                all_pairs.append((similarity, src_idx, t_idx, t_text))
+                union = keys | translated_keys[t_idx]
+                shared = len(keys & translated_keys[t_idx]) / len(union) if union else 0.0
+                expected = source_lengths[s_idx] * TRANSLATION_LENGTH_RATIO
+                length = min(expected, translated_lengths[t_idx]) / max(expected, translated_lengths[t_idx], 1)
+                weights[s_idx, t_idx] = similarity + shared + 0.1 * length
+                confidence[s_idx, t_idx] = similarity
 
-    # Sort by score descending
-    all_pairs.sort(reverse=True, key=lambda x: x[0])
-
-    # Greedy matching - fingerprint score is the validation
-    for score, src_idx, t_idx, t_text in all_pairs:
-        if src_idx in used_sources or t_idx in used_translations:
-            continue
-
-        used_sources.add(src_idx)
-        used_translations.add(t_idx)
-        matches.append((src_idx, t_text, score))
-
-    return sorted(matches, key=lambda x: x[0])
+    return [(s_idx + 1, translated_texts[t_idx], confidence[s_idx, t_idx])
+            for s_idx, t_idx in max_weight_assignment(weights)]
 
 
 # Fragment size in characters (~500 lines, ChatGPT handles large context well)
@@ -390,84 +564,69 @@ def split_at_paragraphs(content: str, max_size: int) -> List[str]:
     return fragments
 
 
-def get_cache_dir(output_dir: str, chapter_name: str) -> Path:
-    """Get the fragment cache directory for a chapter."""
-    return Path(output_dir) / ".fragments" / chapter_name
+# Bump when create_translation_prompt changes: fragments translated with
+# an older prompt are then translated again rather than read from the cache.
+PROMPT_VERSION = 1
+
 
+def get_cache_dir(output_dir: str) -> Path:
+    """Get the fragment cache directory, shared by every chapter.
 
-def get_cache_metadata_path(cache_dir: Path) -> Path:
-    """Get the metadata file path for fragment cache."""
-    return cache_dir / "metadata.json"
+    Translations are stored by what produced them (fragment_cache_key), so
+    a fragment is found again wherever it sits in its chapter, and the
+    cache is kept after a successful run.
+    """
+    return Path(output_dir) / ".fragments"
 
 
-def save_fragment_to_cache(cache_dir: Path, fragment_num: int, source: str, translated: str) -> None:
-    """Save a translated fragment to cache."""
-    cache_dir.mkdir(parents=True, exist_ok=True)
+def fragment_cache_key(source: str, target_lang: str) -> str:
+    """Key a translation by its source fragment's text, the target
+    language and PROMPT_VERSION."""
+    identity = f"{PROMPT_VERSION}\0{target_lang}\0{source}"
+    return hashlib.sha256(identity.encode('utf-8')).hexdigest()
 
-    # Save the translated fragment
-    fragment_path = cache_dir / f"fragment_{fragment_num:03d}.tex"
-    with open(fragment_path, 'w', encoding='utf-8') as f:
-        f.write(translated)
 
-    # Update metadata
-    metadata_path = get_cache_metadata_path(cache_dir)
-    metadata = {}
-    if metadata_path.exists():
-        with open(metadata_path, 'r', encoding='utf-8') as f:
-            metadata = json.load(f)
+def get_fragment_path(cache_dir: Path, source: str, target_lang: str) -> Path:
+    """Get the cache path of the translation of source."""
+    key = fragment_cache_key(source, target_lang)
+    return cache_dir / key[:2] / f"{key}.tex"
 
-    if "fragments" not in metadata:
-        metadata["fragments"] = {}
 
-    metadata["fragments"][str(fragment_num)] = {
-        "source_length": len(source),
-        "translated_length": len(translated),
-        "timestamp": time.time()
-    }
+def get_chapter_plan_path(cache_dir: Path, chapter_name: str) -> Path:
+    """Get the path recording how a chapter was last split into fragments."""
+    return cache_dir / "chapters" / f"{chapter_name}.json"
 
-    with open(metadata_path, 'w', encoding='utf-8') as f:
-        json.dump(metadata, f, indent=2)
+
+def save_fragment_to_cache(cache_dir: Path, fragment_num: int, source: str, translated: str,
+                           target_lang: str) -> None:
+    """Save a translated fragment to cache."""
+    fragment_path = get_fragment_path(cache_dir, source, target_lang)
+    fragment_path.parent.mkdir(parents=True, exist_ok=True)
+
+    # Written whole or not at all: a partial file would be read as a
+    # (fingerprint-invalid) translation.
+    partial = fragment_path.with_suffix(".tmp")
+    with open(partial, 'w', encoding='utf-8') as f:
+        f.write(translated)
+    os.replace(partial, fragment_path)
 
     print(f"  [Cache] Saved fragment {fragment_num} ({len(translated)} chars)", file=sys.stderr)
 
 
-def load_cached_fragments(cache_dir: Path, source_fragments: List[str]) -> Tuple[List[Optional[str]], int]:
+def load_cached_fragments(cache_dir: Path, source_fragments: List[str],
+                          target_lang: str) -> Tuple[List[Optional[str]], int]:
     """Load cached fragments and determine resume point.
 
     Returns:
         Tuple of (list of translated fragments or None for missing, first fragment to translate)
     """
-    metadata_path = get_cache_metadata_path(cache_dir)
-
-    if not cache_dir.exists() or not metadata_path.exists():
-        return [None] * len(source_fragments), 1
-
-    with open(metadata_path, 'r', encoding='utf-8') as f:
-        metadata = json.load(f)
-
-    cached_fragments = metadata.get("fragments", {})
     translated = []
     resume_from = len(source_fragments) + 1  # Default: all done
 
     for i, source in enumerate(source_fragments, 1):
-        fragment_path = cache_dir / f"fragment_{i:03d}.tex"
-        cache_info = cached_fragments.get(str(i))
-
-        if fragment_path.exists() and cache_info:
-            # Validate: check if source length matches and translation isn't suspiciously short
-            source_len = len(source)
-            cached_source_len = cache_info.get("source_length", 0)
-
-            # Source must match (within 5% to account for minor edits)
-            source_match = abs(source_len - cached_source_len) / max(source_len, 1) < 0.05
-
-            if not source_match:
-                print(f"  [Cache] Fragment {i} source changed, needs re-translation", file=sys.stderr)
-                translated.append(None)
-                if resume_from > i:
-                    resume_from = i
-                continue
+        fragment_path = get_fragment_path(cache_dir, source, target_lang)
 
+        if fragment_path.exists():
             # Load and validate using fingerprints
             with open(fragment_path, 'r', encoding='utf-8') as f:
                 cached_translation = f.read()
@@ -495,14 +654,84 @@ def load_cached_fragments(cache_dir: Path, source_fragments: List[str]) -> Tuple
     return translated, resume_from
 
 
-def clear_cache(cache_dir: Path) -> None:
-    """Clear the fragment cache for a chapter."""
-    if cache_dir.exists():
-        shutil.rmtree(cache_dir)
-        print(f"  [Cache] Cleared cache: {cache_dir}", file=sys.stderr)
+def clear_cache(cache_dir: Path, chapter_name: str, source_fragments: List[str], target_lang: str) -> None:
+    """Clear a chapter's cached fragments and its recorded split."""
+    removed = 0
+    for source in source_fragments:
+        fragment_path = get_fragment_path(cache_dir, source, target_lang)
+        if fragment_path.exists():
+            fragment_path.unlink()
+            removed += 1
+    plan_path = get_chapter_plan_path(cache_dir, chapter_name)
+    if plan_path.exists():
+        plan_path.unlink()
+    print(f"  [Cache] Cleared {removed} cached fragments of {chapter_name}", file=sys.stderr)
+
+
+def split_keeping_fragments(content: str, previous: List[str], max_size: int) -> List[str]:
+    """Split content into fragments, keeping each of previous (the last
+    run's fragments, in order) that still appears unchanged.
+
+    split_into_fragments packs sections greedily, so a paragraph added to
+    fragment 2 can move every later boundary and change the text of every
+    later fragment, none of which would then be found in the cache. Here
+    only the text between unchanged fragments is split afresh.
+
+    Fragments are not verbatim slices of the chapter: split_at_paragraphs
+    rejoins paragraphs with a single blank line and strips what it packs,
+    so the blank line before a \\section that ends a fragment is lost. A
+    previous fragment is therefore looked for with all whitespace ignored,
+    and kept as it was (its cache key unchanged) where it is found; an edit
+    that only changes whitespace inside it is not re-sent.
+    """
+    # content without whitespace, and the offset in content of each of its
+    # characters
+    positions = [i for i, char in enumerate(content) if not char.isspace()]
+    squeezed = ''.join(content[i] for i in positions)
+
+    fragments = []
+    pos = 0
+    squeezed_pos = 0
+    for fragment in previous:
+        needle = ''.join(fragment.split())
+        if not needle:
+            continue
+        index = squeezed.find(needle, squeezed_pos)
+        if index < 0:
+            continue
+        start = positions[index]
+        fragments.extend(split_into_fragments(content[pos:start], max_size))
+        fragments.append(fragment)
+        squeezed_pos = index + len(needle)
+        pos = positions[squeezed_pos - 1] + 1
+    fragments.extend(split_into_fragments(content[pos:], max_size))
+    return fragments
 
 
-def scrape_conversation_to_cache(cache_dir: Path, source_fragments: List[str]) -> int:
+def plan_fragments(content: str, cache_dir: Path, chapter_name: str, max_size: int,
+                   record: bool = True) -> List[str]:
+    """Split a chapter into fragments, reusing the boundaries of its last
+    split where the text has not changed, and (if record) record the new
+    split for the next run."""
+    plan_path = get_chapter_plan_path(cache_dir, chapter_name)
+    previous = []
+    if plan_path.exists():
+        with open(plan_path, 'r', encoding='utf-8') as f:
+            plan = json.load(f)
+        if plan.get("fragment_size") == max_size:
+            previous = plan.get("fragments", [])
+
+    fragments = split_keeping_fragments(content, previous, max_size)
+    if not record:
+        return fragments
+
+    plan_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(plan_path, 'w', encoding='utf-8') as f:
+        json.dump({"fragment_size": max_size, "fragments": fragments}, f, ensure_ascii=False)
+    return fragments
+
+
+def scrape_conversation_to_cache(cache_dir: Path, source_fragments: List[str], target_lang: str) -> int:
     """Scrape ChatGPT conversation and save translated fragments to cache.
 
     Uses fingerprint matching to correctly identify which translation
@@ -566,7 +795,7 @@ def scrape_conversation_to_cache(cache_dir: Path, source_fragments: List[str]) -
     for frag_idx, translated, confidence in matches:
         source = source_fragments[frag_idx - 1]
         print(f"  [Scrape] Fragment {frag_idx}: matched with {confidence:.0%} confidence ({len(translated)} chars)", file=sys.stderr)
-        save_fragment_to_cache(cache_dir, frag_idx, source, translated)
+        save_fragment_to_cache(cache_dir, frag_idx, source, translated, target_lang)
         recovered += 1
 
     # Report unmatched fragments
@@ -578,7 +807,7 @@ def scrape_conversation_to_cache(cache_dir: Path, source_fragments: List[str]) -
     return recovered
 
 
-def show_cache_status(input_file: str, output_dir: str, fragment_size: int) -> None:
+def show_cache_status(input_file: str, output_dir: str, fragment_size: int, target_lang: str) -> None:
     """Show the status of cached fragments for a chapter."""
     input_path = Path(input_file)
 
@@ -589,52 +818,25 @@ def show_cache_status(input_file: str, output_dir: str, fragment_size: int) -> N
     with open(input_path, 'r', encoding='utf-8') as f:
         content = f.read()
 
-    fragments = split_into_fragments(content, fragment_size)
-    cache_dir = get_cache_dir(output_dir, input_path.stem)
+    cache_dir = get_cache_dir(output_dir)
+    fragments = plan_fragments(content, cache_dir, input_path.stem, fragment_size, record=False)
 
     print(f"\nCache status for {input_path.name}:", file=sys.stderr)
     print(f"  Source: {len(content)} chars, {len(fragments)} fragments", file=sys.stderr)
     print(f"  Cache dir: {cache_dir}", file=sys.stderr)
 
-    if not cache_dir.exists():
-        print(f"  Status: No cache exists", file=sys.stderr)
-        return
-
-    metadata_path = get_cache_metadata_path(cache_dir)
-    if not metadata_path.exists():
-        print(f"  Status: Cache dir exists but no metadata", file=sys.stderr)
-        return
-
-    with open(metadata_path, 'r', encoding='utf-8') as f:
-        metadata = json.load(f)
-
-    cached_fragments = metadata.get("fragments", {})
-
-    print(f"\n  {'Frag':<6} {'Source':<10} {'Cached':<10} {'Match':<8} {'Status':<12}", file=sys.stderr)
-    print(f"  {'-'*6} {'-'*10} {'-'*10} {'-'*8} {'-'*12}", file=sys.stderr)
+    print(f"\n  {'Frag':<6} {'Source':<10} {'Cached':<10} {'Status':<12}", file=sys.stderr)
+    print(f"  {'-'*6} {'-'*10} {'-'*10} {'-'*12}", file=sys.stderr)
 
     good = 0
     bad = 0
     missing = 0
 
     for i, source in enumerate(fragments, 1):
-        fragment_path = cache_dir / f"fragment_{i:03d}.tex"
-        cache_info = cached_fragments.get(str(i))
+        fragment_path = get_fragment_path(cache_dir, source, target_lang)
         source_len = len(source)
 
-        if fragment_path.exists() and cache_info:
-            cached_source_len = cache_info.get("source_length", 0)
-            translated_len = cache_info.get("translated_length", 0)
-
-            # Check if source changed
-            source_match = abs(source_len - cached_source_len) / max(source_len, 1) < 0.05
-
-            if not source_match:
-                status = "⚠ SRC CHANGED"
-                bad += 1
-                print(f"  {i:<6} {source_len:<10} {translated_len:<10} {'—':<8} {status:<12}", file=sys.stderr)
-                continue
-
+        if fragment_path.exists():
             # Validate: 100% or invalid
             with open(fragment_path, 'r', encoding='utf-8') as f:
                 cached_translation = f.read()
@@ -650,18 +852,19 @@ def show_cache_status(input_file: str, output_dir: str, fragment_size: int) -> N
                 status = f"✗ INVALID"
                 bad += 1
 
-            print(f"  {i:<6} {source_len:<10} {translated_len:<10} {status:<12}", file=sys.stderr)
+            print(f"  {i:<6} {source_len:<10} {len(cached_translation):<10} {status:<12}", file=sys.stderr)
 
             # Show errors for invalid
             if not is_valid:
                 validate_fingerprints(src_fp, tgt_fp, verbose=True, translated_text=cached_translation)
         else:
+            # Never translated, or its source text changed since
             missing += 1
-            print(f"  {i:<6} {source_len:<10} {'—':<10} {'—':<8} {'✗ MISSING':<12}", file=sys.stderr)
+            print(f"  {i:<6} {source_len:<10} {'—':<10} {'✗ MISSING':<12}", file=sys.stderr)
 
     print(f"\n  Summary: {good} OK, {bad} invalid, {missing} missing", file=sys.stderr)
     if bad > 0 or missing > 0:
-        print(f"  Run with --recover to translate missing/invalid fragments", file=sys.stderr)
+        print(f"  Run again to translate missing/invalid fragments", file=sys.stderr)
 
 
 def create_translation_prompt(fragment: str, target_lang: str, fragment_num: int, total: int) -> str:
@@ -734,18 +937,118 @@ def fix_section_label_formatting(text: str) -> str:
     return fixed
 
 
-def translate_fragment(fragment: str, target_lang: str, fragment_num: int, total: int) -> str:
-    """Send a fragment to ChatGPT for translation."""
-    # chatgpt_desktop drives the macOS ChatGPT app and lives outside this repo, so it
-    # is imported at call time to keep the rest of this module importable elsewhere.
-    from chatgpt_desktop import send_prompt
+# Model the openai backend uses unless --model names another.
+OPENAI_TRANSLATION_MODEL = "gpt-4o"
+
+
+class TranslationBackend(ABC):
+    """Where translation prompts are sent.
+
+    translate() returns the raw reply to one fragment's prompt; fragment is
+    the source text the prompt asks for. max_in_flight is how many
+    fragments the backend can work on at once, the default for --jobs;
+    a backend that is not parallel never gets more than that, whatever
+    --jobs says (backend_jobs). recoverable backends keep a conversation
+    that --recover can scrape.
+    """
+    name = "backend"
+    max_in_flight = 1
+    parallel = False
+    recoverable = False
+
+    @abstractmethod
+    def translate(self, fragment: str, prompt: str) -> str:
+        pass
+
+
+class ChatGPTDesktopBackend(TranslationBackend):
+    """The macOS ChatGPT app, driven through its window: one prompt at a time."""
+    name = "chatgpt"
+    recoverable = True
+
+    # Seconds to wait after each reply before the next prompt, to avoid
+    # rate limiting.
+    delay = 2
+
+    # There is one app window, whichever backend object drives it: a prompt
+    # typed into it while another is answered would join that turn.
+    window = threading.Lock()
+
+    def translate(self, fragment: str, prompt: str) -> str:
+        # chatgpt_desktop drives the macOS ChatGPT app and lives outside this repo, so it
+        # is imported at call time to keep the rest of this module importable elsewhere.
+        from chatgpt_desktop import send_prompt
+
+        with self.window:
+            # Send to ChatGPT with longer timeout for translation
+            result = send_prompt(prompt, wait_for_reply=True, wait_seconds=300)
+            time.sleep(self.delay)
+        return result
+
+
+class OpenAIBackend(TranslationBackend):
+    """The OpenAI chat API. Requests are independent, so several fragments
+    can be in flight; OPENAI_API_KEY comes from the environment or .env."""
+    name = "openai"
+    max_in_flight = 4
+    parallel = True
+
+    def __init__(self, model: str = None):
+        from dotenv import load_dotenv
+        from openai import OpenAI
+
+        load_dotenv(Path(__file__).parent.parent / ".env")
+        self.model = model or OPENAI_TRANSLATION_MODEL
+        self.client = OpenAI(timeout=300.0)
+
+    def translate(self, fragment: str, prompt: str) -> str:
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+        )
+        return response.choices[0].message.content or ""
+
+
+class EchoBackend(TranslationBackend):
+    """Replies with the source fragment in a code block, as a model would
+    with its translation. The reply passes validation, so the pipeline can
+    be run end to end without a model."""
+    name = "echo"
+    max_in_flight = 8
+    parallel = True
+
+    def translate(self, fragment: str, prompt: str) -> str:
+        return f"```latex\n{fragment}\n```"
+
+
+BACKENDS = {
+    backend.name: backend for backend in (ChatGPTDesktopBackend, OpenAIBackend, EchoBackend)
+}
+
+
+def backend_jobs(backend: TranslationBackend, jobs: int = None) -> int:
+    """Fragments to keep in flight on backend: jobs, by default its
+    max_in_flight, and no more than that unless the backend is parallel."""
+    jobs = jobs or backend.max_in_flight
+    return jobs if backend.parallel else min(jobs, backend.max_in_flight)
 
+
+def make_backend(name: str, model: str = None) -> TranslationBackend:
+    """Create the backend registered under name."""
+    if name == OpenAIBackend.name:
+        return OpenAIBackend(model)
+    return BACKENDS[name]()
+
+
+def translate_fragment(fragment: str, target_lang: str, fragment_num: int, total: int,
+                       backend: TranslationBackend = None) -> str:
+    """Send a fragment to the backend (ChatGPT by default) for translation."""
+    backend = backend or ChatGPTDesktopBackend()
     prompt = create_translation_prompt(fragment, target_lang, fragment_num, total)
 
     print(f"  Translating fragment {fragment_num}/{total} ({len(fragment)} chars)...", file=sys.stderr)
 
-    # Send to ChatGPT with longer timeout for translation
-    result = send_prompt(prompt, wait_for_reply=True, wait_seconds=300)
+    result = backend.translate(fragment, prompt)
 
     # Extract content from code block if present
     code_block_match = re.search(r'```(?:latex)?\s*\n(.*?)\n```', result, re.DOTALL)
@@ -762,9 +1065,63 @@ def translate_fragment(fragment: str, target_lang: str, fragment_num: int, total
     return result.strip()
 
 
+def translate_fragments(fragments: List[str], pending: List[int], target_lang: str,
+                        backend: TranslationBackend, jobs: int,
+                        cache_dir: Path) -> Tuple[Dict[int, str], Dict[int, List[str]]]:
+    """Translate the fragments numbered in pending (1-based), keeping up to
+    jobs of them in flight on the backend.
+
+    Each translation is validated as it lands, and a valid one is saved to
+    the cache at once, so an interrupted run keeps every fragment finished
+    before it stopped. After the first invalid translation no further
+    fragments are started; those already in flight are still validated
+    and cached.
+
+    Returns ({fragment number: translation}, {fragment number: errors}).
+    """
+    translated = {}
+    failures = {}
+    total = len(fragments)
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        futures = {
+            pool.submit(translate_fragment, fragments[i-1], target_lang, i, total, backend): i
+            for i in pending
+        }
+        for future in as_completed(futures):
+            i = futures[future]
+            if future.cancelled():
+                continue
+            fragment = fragments[i-1]
+            try:
+                result = future.result()
+            except Exception as e:
+                errors = [f"backend error: {e}"]
+            else:
+                # Validate: 100% or reject
+                src_fp = extract_fingerprints(fragment)
+                tgt_fp = extract_fingerprints(result)
+                _, errors = validate_fingerprints(src_fp, tgt_fp, translated_text=result)
+
+            if errors:
+                failures[i] = errors
+                for other in futures:
+                    other.cancel()
+                continue
+
+            print(f"  Fragment {i}: VALID ✓", file=sys.stderr)
+            translated[i] = result
+            # Save to cache immediately (only good fragments)
+            save_fragment_to_cache(cache_dir, i, fragment, result, target_lang)
+
+    return translated, failures
+
+
 def translate_chapter(input_file: str, target_lang: str, output_dir: str,
                       fragment_size: int = DEFAULT_FRAGMENT_SIZE,
-                      recover: bool = False) -> str:
+                      recover: bool = False,
+                      backend: TranslationBackend = None,
+                      jobs: int = None) -> str:
     """Translate a complete chapter file.
 
     Args:
@@ -772,8 +1129,13 @@ def translate_chapter(input_file: str, target_lang: str, output_dir: str,
         target_lang: Target language name
         output_dir: Directory for output files
         fragment_size: Maximum fragment size in characters
-        recover: If True, scrape ChatGPT conversation to recover fragments
+        recover: If True, first scrape the ChatGPT conversation into the
+            fragment cache (ChatGPT backend only)
+        backend: Where fragments are translated (ChatGPT by default)
+        jobs: Fragments in flight at once (default: the backend's maximum)
     """
+    backend = backend or ChatGPTDesktopBackend()
+    jobs = backend_jobs(backend, jobs)
     input_path = Path(input_file)
 
     if not input_path.exists():
@@ -787,22 +1149,21 @@ def translate_chapter(input_file: str, target_lang: str, output_dir: str,
     print(f"\nTranslating {input_path.name} to {target_lang}...", file=sys.stderr)
     print(f"  Original size: {len(content)} characters", file=sys.stderr)
 
-    # Split into fragments
-    fragments = split_into_fragments(content, fragment_size)
+    # Split into fragments, keeping the last run's boundaries where the
+    # text is unchanged so their translations are found in the cache
+    cache_dir = get_cache_dir(output_dir)
+    fragments = plan_fragments(content, cache_dir, input_path.stem, fragment_size)
     print(f"  Split into {len(fragments)} fragments", file=sys.stderr)
 
-    # Setup cache directory
-    cache_dir = get_cache_dir(output_dir, input_path.stem)
-
     # Check for cached fragments if recovering
-    if recover:
+    if recover and backend.recoverable:
         # First, scrape ChatGPT conversation to recover any translated fragments
         print(f"  Scraping ChatGPT conversation to recover fragments...", file=sys.stderr)
-        recovered_count = scrape_conversation_to_cache(cache_dir, fragments)
+        recovered_count = scrape_conversation_to_cache(cache_dir, fragments, target_lang)
         print(f"  Recovered {recovered_count} fragments from conversation", file=sys.stderr)
 
         # Now load from cache (includes both previously cached and just-recovered)
-        translated_fragments, resume_from = load_cached_fragments(cache_dir, fragments)
+        translated_fragments, resume_from = load_cached_fragments(cache_dir, fragments, target_lang)
 
         if resume_from > len(fragments):
             print(f"  All {len(fragments)} fragments already cached!", file=sys.stderr)
@@ -817,46 +1178,33 @@ def translate_chapter(input_file: str, target_lang: str, output_dir: str,
             print(f"  Missing fragments: {missing}", file=sys.stderr)
             print(f"  Will translate {len(missing)} missing fragments", file=sys.stderr)
     else:
-        # Clear any existing cache and start fresh
-        clear_cache(cache_dir)
-        translated_fragments = [None] * len(fragments)
-        resume_from = 1
-
-    # Translate missing fragments
-    for i, fragment in enumerate(fragments, 1):
-        if translated_fragments[i-1] is not None:
-            # Already have this fragment cached
-            continue
-
-        translated = translate_fragment(fragment, target_lang, i, len(fragments))
-
-        # Validate: 100% or reject
-        src_fp = extract_fingerprints(fragment)
-        tgt_fp = extract_fingerprints(translated)
-        is_valid, errors = validate_fingerprints(src_fp, tgt_fp, translated_text=translated)
-
-        if is_valid:
-            print(f"  Fragment {i}: VALID ✓", file=sys.stderr)
-        else:
-            print(f"  ERROR: Fragment {i} is INVALID:", file=sys.stderr)
-            validate_fingerprints(src_fp, tgt_fp, verbose=True, translated_text=translated)
-            print(f"  NOT saving. Re-run with --recover to retry.", file=sys.stderr)
-            sys.exit(1)
-
+        # Fragments whose source text was translated before are reused
+        translated_fragments, resume_from = load_cached_fragments(cache_dir, fragments, target_lang)
+        cached = sum(1 for t in translated_fragments if t is not None)
+        print(f"  {cached} of {len(fragments)} fragments already translated", file=sys.stderr)
+
+    # Translate missing fragments (already cached ones are skipped)
+    pending = [i for i, t in enumerate(translated_fragments, 1) if t is None]
+    if pending:
+        print(f"  Translating {len(pending)} fragments with {backend.name}, "
+              f"{min(jobs, len(pending))} at a time", file=sys.stderr)
+    results, failures = translate_fragments(fragments, pending, target_lang, backend, jobs, cache_dir)
+    for i, translated in results.items():
         translated_fragments[i-1] = translated
 
-        # Save to cache immediately (only good fragments)
-        save_fragment_to_cache(cache_dir, i, fragment, translated)
-
-        # Small delay between fragments to avoid rate limiting
-        if i < len(fragments):
-            time.sleep(2)
+    if failures:
+        for i, errors in sorted(failures.items()):
+            print(f"  ERROR: Fragment {i} is INVALID:", file=sys.stderr)
+            for err in errors:
+                print(f"      ✗ {err}", file=sys.stderr)
+        print(f"  NOT saving. Re-run to retry (valid fragments are cached).", file=sys.stderr)
+        sys.exit(1)
 
     # Verify all fragments are present
     missing = [i+1 for i, t in enumerate(translated_fragments) if t is None]
     if missing:
         print(f"  ERROR: Missing fragments: {missing}", file=sys.stderr)
-        print(f"  Re-run with --recover to retry", file=sys.stderr)
+        print(f"  Re-run to retry", file=sys.stderr)
         sys.exit(1)
 
     # Join translated fragments
@@ -877,9 +1225,314 @@ def translate_chapter(input_file: str, target_lang: str, output_dir: str,
     print(f"  Written to: {output_path}", file=sys.stderr)
     print(f"  Translated size: {len(translated_content)} characters", file=sys.stderr)
 
-    # Clean up cache on success
-    clear_cache(cache_dir)
+    return str(output_path)
+
+
+# Paragraph alignment for --sync. A translated paragraph runs about this
+# much longer than its English source; the score of a pairing without
+# shared marks is how close the lengths come to that.
+TRANSLATION_LENGTH_RATIO = 1.15
+# Score of leaving a paragraph on either side unpaired. A pairing scoring
+# above it on both sides (-2 * ALIGNMENT_GAP) beats two gaps.
+ALIGNMENT_GAP = -0.3
+
+_PARAGRAPH_BREAK = re.compile(r'(\n\s*\n)')
+
+
+def split_paragraphs(text: str) -> Tuple[List[str], List[str]]:
+    """Split text at blank lines into (paragraphs, separators), where
+    separators[i] is the text between paragraphs i and i+1."""
+    tokens = _PARAGRAPH_BREAK.split(text)
+    return tokens[0::2], tokens[1::2]
+
+
+def _paragraph_marks(fp: Fingerprints) -> set:
+    """The marks of a paragraph that survive translation unchanged: labels,
+    refs, cites, URLs, images, Greek and Hebrew, and command counts.
+    (Numbers do not: Polish writes many of them as words.)"""
+    marks = set()
+    for key in ('labels', 'refs', 'cites', 'urls', 'images', 'greek_strings', 'hebrew_strings'):
+        marks.update((key, value) for value in fp[key])
+    marks.update(('command', cmd, count) for cmd, count in fp['command_counts'].items())
+    return marks
+
+
+def paragraph_match_score(source_marks: set, translated_marks: set,
+                          source_len: int, translated_len: int) -> float:
+    """Score pairing a source paragraph with a translated one.
+
+    Shared marks decide it: no mark in common when either has marks is a
+    wrong pairing. Between paragraphs with no marks, only the lengths
+    can tell.
+    """
+    expected = source_len * TRANSLATION_LENGTH_RATIO
+    length = min(expected, translated_len) / max(expected, translated_len, 1)
+    if source_marks or translated_marks:
+        shared = len(source_marks & translated_marks) / len(source_marks | translated_marks)
+        if not shared:
+            return -1.0
+        return 1.0 + shared + length
+    return length - 0.5
+
+
+def align_paragraphs(source_paras: List[str], translated_paras: List[str]) -> Dict[int, int]:
+    """Pair source paragraphs with the translated paragraphs they became.
+
+    An order-keeping alignment (as in sequence alignment) with the best
+    total paragraph_match_score; a paragraph the translation split or
+    merged is left unpaired. Returns {source index: translated index} for
+    the pairings scoring above zero.
+    """
+    source = [(_paragraph_marks(extract_fingerprints(p)), len(p.strip())) for p in source_paras]
+    translated = [(_paragraph_marks(extract_fingerprints(p)), len(p.strip())) for p in translated_paras]
+    n, m = len(source), len(translated)
+
+    # best[i][j]: best score aligning source[:i] with translated[:j]
+    best = [[0.0] * (m + 1) for _ in range(n + 1)]
+    move = [[0] * (m + 1) for _ in range(n + 1)]  # 0 pair, 1 skip source, 2 skip translated
+    for i in range(1, n + 1):
+        best[i][0] = i * ALIGNMENT_GAP
+        move[i][0] = 1
+    for j in range(1, m + 1):
+        best[0][j] = j * ALIGNMENT_GAP
+        move[0][j] = 2
+    for i in range(1, n + 1):
+        src_marks, src_len = source[i-1]
+        row, prev = best[i], best[i-1]
+        for j in range(1, m + 1):
+            tr_marks, tr_len = translated[j-1]
+            pair = prev[j-1] + paragraph_match_score(src_marks, tr_marks, src_len, tr_len)
+            skip_source = prev[j] + ALIGNMENT_GAP
+            skip_translated = row[j-1] + ALIGNMENT_GAP
+            if pair >= skip_source and pair >= skip_translated:
+                row[j], move[i][j] = pair, 0
+            elif skip_source >= skip_translated:
+                row[j], move[i][j] = skip_source, 1
+            else:
+                row[j], move[i][j] = skip_translated, 2
+
+    pairs = {}
+    i, j = n, m
+    while i > 0 or j > 0:
+        if move[i][j] == 0:
+            src_marks, src_len = source[i-1]
+            tr_marks, tr_len = translated[j-1]
+            if paragraph_match_score(src_marks, tr_marks, src_len, tr_len) > 0:
+                pairs[i-1] = j-1
+            i, j = i-1, j-1
+        elif move[i][j] == 1:
+            i -= 1
+        else:
+            j -= 1
+    return pairs
+
+
+def plan_sync(old_source: str, new_source: str, translation: str) -> List[Tuple[int, int, str]]:
+    """Work out which spans of translation to replace after the source
+    changed from old_source to new_source.
+
+    Paragraphs are diffed between the two sources, and each changed run is
+    widened to the nearest unchanged paragraphs paired (align_paragraphs)
+    with a translated paragraph they share marks with: those are the
+    anchors the new translation is spliced between. Returns (start, stop,
+    new source text) per span of translated paragraphs to replace, in
+    order; the text is "" for a span whose source was deleted.
+
+    Raises ValueError, naming the span, when a span cannot be placed: the
+    English paragraphs between its anchors are not as many as the
+    translated paragraphs between them, so the translation split or
+    merged paragraphs there, or an anchor is wrong, and splicing would
+    leave old paragraphs beside their new translation.
+    """
+    old_paras = [p.strip() for p in split_paragraphs(old_source)[0] if p.strip()]
+    new_paras = [p.strip() for p in split_paragraphs(new_source)[0] if p.strip()]
+    translated_paras = split_paragraphs(translation)[0]
+
+    matcher = difflib.SequenceMatcher(None, old_paras, new_paras, autojunk=False)
+    unchanged = {}  # old index -> new index
+    changes = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            unchanged.update((i1 + k, j1 + k) for k in range(i2 - i1))
+        else:
+            changes.append((i1, i2))
+    if not changes:
+        return []
+
+    pairs = align_paragraphs(old_paras, translated_paras)
+
+    def marks(paragraph):
+        return _paragraph_marks(extract_fingerprints(paragraph))
+
+    # A pairing of two paragraphs without marks rests on their lengths
+    # alone, which often picks a neighbour of the right paragraph; it is
+    # not trusted as an anchor. Nor is a translated paragraph that also
+    # carries a label, cite, etc. of a neighbouring English paragraph: the
+    # translator merged the two, and the neighbour may be in the span.
+    def is_anchor(i):
+        if i not in unchanged or i not in pairs:
+            return False
+        source_marks = marks(old_paras[i])
+        translated_marks = marks(translated_paras[pairs[i]])
+        if not source_marks & translated_marks:
+            return False
+        for k in (i - 1, i + 1):
+            if 0 <= k < len(old_paras):
+                neighbour = {mark for mark in marks(old_paras[k]) if mark[0] != 'command'}
+                if (translated_marks - source_marks) & neighbour:
+                    return False
+        return True
+
+    # Widen each change to anchors on both sides, merging changes that
+    # share unanchored paragraphs.
+    spans = []
+    for i1, i2 in changes:
+        lo = i1 - 1
+        while lo >= 0 and not is_anchor(lo):
+            lo -= 1
+        hi = i2
+        while hi < len(old_paras) and not is_anchor(hi):
+            hi += 1
+        if spans and lo < spans[-1][1]:
+            spans[-1] = (spans[-1][0], hi)
+        else:
+            spans.append((lo, hi))
+
+    plan = []
+    for lo, hi in spans:
+        new_start = unchanged[lo] + 1 if lo >= 0 else 0
+        new_stop = unchanged[hi] if hi < len(old_paras) else len(new_paras)
+        start = pairs[lo] + 1 if lo >= 0 else 0
+        stop = pairs[hi] if hi < len(old_paras) else len(translated_paras)
+        translated_count = sum(1 for p in translated_paras[start:stop] if p.strip())
+        if hi - lo - 1 != translated_count:
+            first = old_paras[lo + 1].split('\n', 1)[0][:60] if hi - lo > 1 else "(none)"
+            raise ValueError(
+                f"English paragraphs {lo + 2}-{hi} (from: {first}) are {hi - lo - 1}, "
+                f"but their translation, paragraphs {start + 1}-{stop}, is {translated_count}"
+            )
+        plan.append((start, stop, "\n\n".join(new_paras[new_start:new_stop])))
+    return plan
+
+
+def splice_paragraphs(text: str, replacements: List[Tuple[int, int, str]]) -> str:
+    """Replace paragraphs start..stop-1 of text with new text for each
+    (start, stop, new text) in replacements (in order, not overlapping);
+    new text "" removes them. Everything else keeps its exact text."""
+    paragraphs, separators = split_paragraphs(text)
+    pieces = []  # (paragraph, separator after it)
+    i = 0
+    for start, stop, new_text in replacements + [(len(paragraphs), len(paragraphs), "")]:
+        pieces.extend((paragraphs[k], separators[k] if k < len(separators) else "\n\n")
+                      for k in range(i, start))
+        if new_text:
+            pieces.append((new_text, "\n\n"))
+        i = stop
+    pieces.extend((paragraphs[k], separators[k] if k < len(separators) else "") for k in range(i, len(paragraphs)))
+    if not pieces:
+        return ""
+    return "".join(p + sep for p, sep in pieces[:-1]) + pieces[-1][0]
+
+
+def _git(repo_dir: Path, *args: str) -> str:
+    return subprocess.run(
+        ["git", "-C", str(repo_dir), *args],
+        check=True, capture_output=True, text=True,
+    ).stdout
+
+
+def sync_chapter(input_file: str, target_lang: str, output_dir: str,
+                 fragment_size: int = DEFAULT_FRAGMENT_SIZE,
+                 base: str = None,
+                 backend: TranslationBackend = None,
+                 jobs: int = None,
+                 force_full: bool = False) -> str:
+    """Bring an existing translation up to date with its English chapter.
+
+    The English chapter is diffed against its text at base (by default the
+    last commit of the translation file, the revision it was translated
+    from), and only the translated paragraphs of the changed English
+    paragraphs are re-translated and spliced in (plan_sync). Where those
+    cannot be told apart, it stops with the translation unchanged; with
+    force_full, the whole chapter is translated again instead
+    (translate_chapter, through the fragment cache).
+    """
+    backend = backend or ChatGPTDesktopBackend()
+    jobs = backend_jobs(backend, jobs)
+    input_path = Path(input_file).resolve()
+    lang_code = target_lang.lower()[:2]
+    output_path = Path(output_dir) / f"{input_path.stem}_{lang_code}.tex"
+
+    if not output_path.exists():
+        print(f"ERROR: No translation to sync: {output_path}", file=sys.stderr)
+        sys.exit(1)
+
+    repo_dir = input_path.parent
+    try:
+        if base is None:
+            base = _git(repo_dir, "log", "-1", "--format=%H", "--", str(output_path.resolve())).strip()
+            if not base:
+                print(f"ERROR: {output_path.name} is not committed; pass --base REV", file=sys.stderr)
+                sys.exit(1)
+        old_source = _git(repo_dir, "show", f"{base}:./{input_path.name}")
+    except subprocess.CalledProcessError as e:
+        # No repository, an unknown --base, or a chapter added since base
+        print(f"ERROR: Cannot read {input_path.name} at {base or 'its last commit'}: "
+              f"{e.stderr.strip()}", file=sys.stderr)
+        sys.exit(1)
 
+    with open(input_path, 'r', encoding='utf-8') as f:
+        new_source = f.read()
+    with open(output_path, 'r', encoding='utf-8') as f:
+        translation = f.read()
+
+    print(f"\nSyncing {output_path.name} with {input_path.name} (since {base[:10]})...", file=sys.stderr)
+    try:
+        plan = plan_sync(old_source, new_source, translation)
+    except ValueError as e:
+        if not force_full:
+            print(f"ERROR: Cannot place a change in {output_path.name}: {e}", file=sys.stderr)
+            print(f"  {output_path.name} is unchanged. To translate the whole chapter again, "
+                  f"use --sync --force-full", file=sys.stderr)
+            sys.exit(1)
+        print(f"  {e}; translating the whole chapter again (--force-full)", file=sys.stderr)
+        return translate_chapter(input_file, target_lang, output_dir, fragment_size,
+                                 backend=backend, jobs=jobs)
+    if not plan:
+        print("  Up to date", file=sys.stderr)
+        return str(output_path)
+
+    # Each span's new source goes through the fragment pipeline (and its
+    # cache) as one or more fragments.
+    span_fragments = [split_into_fragments(new_text, fragment_size) for _, _, new_text in plan]
+    fragments = [fragment for pieces in span_fragments for fragment in pieces]
+    print(f"  {len(plan)} changed span(s): translating {len(fragments)} fragment(s), "
+          f"{sum(len(f) for f in fragments)} chars", file=sys.stderr)
+
+    cache_dir = get_cache_dir(output_dir)
+    translated_fragments, _ = load_cached_fragments(cache_dir, fragments, target_lang)
+    pending = [i for i, t in enumerate(translated_fragments, 1) if t is None]
+    results, failures = translate_fragments(fragments, pending, target_lang, backend, jobs, cache_dir)
+    if failures:
+        for i, errors in sorted(failures.items()):
+            print(f"  ERROR: Fragment {i} is INVALID:", file=sys.stderr)
+            for err in errors:
+                print(f"      ✗ {err}", file=sys.stderr)
+        print(f"  NOT saving. Re-run to retry (valid fragments are cached).", file=sys.stderr)
+        sys.exit(1)
+    for i, translated in results.items():
+        translated_fragments[i-1] = translated
+
+    replacements = []
+    position = 0
+    for (start, stop, _), pieces in zip(plan, span_fragments):
+        span_translation = translated_fragments[position:position + len(pieces)]
+        position += len(pieces)
+        replacements.append((start, stop, "\n\n".join(span_translation)))
+
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(splice_paragraphs(translation, replacements))
+    print(f"  Written to: {output_path}", file=sys.stderr)
     return str(output_path)
 
 
@@ -938,11 +1591,43 @@ def main():
         action="store_true",
         help="Clear fragment cache and start fresh"
     )
+    parser.add_argument(
+        "--backend",
+        choices=sorted(BACKENDS),
+        default=ChatGPTDesktopBackend.name,
+        help="Where fragments are translated (default: chatgpt, the macOS ChatGPT app)"
+    )
+    parser.add_argument(
+        "--model",
+        help=f"Model for --backend openai (default: {OPENAI_TRANSLATION_MODEL})"
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        help="Fragments in flight at once (default: as many as the backend allows; chatgpt takes one at a time)"
+    )
     parser.add_argument(
         "--status",
         action="store_true",
         help="Show cache status (which fragments are done/missing) without translating"
     )
+    parser.add_argument(
+        "--sync",
+        action="store_true",
+        help="Update existing translations, re-translating only the paragraphs "
+             "changed since the translation was last committed"
+    )
+    parser.add_argument(
+        "--base",
+        help="With --sync: the git revision the translation was made from "
+             "(default: the translation file's last commit)"
+    )
+    parser.add_argument(
+        "--force-full",
+        action="store_true",
+        help="With --sync: translate a chapter whole again when a change cannot be "
+             "placed in its translation, instead of stopping"
+    )
 
     args = parser.parse_args()
 
@@ -978,12 +1663,20 @@ def main():
                 print(f"WARNING: --start-from '{args.start_from}' not found, translating all", file=sys.stderr)
 
         print(f"Translating {len(chapters)} chapters to {target_lang}...", file=sys.stderr)
+        backend = make_backend(args.backend, args.model)
 
         translated = []
         for chapter in chapters:
             try:
-                output = translate_chapter(chapter, target_lang, str(output_dir),
-                                          args.fragment_size, recover=args.recover)
+                if args.sync:
+                    output = sync_chapter(chapter, target_lang, str(output_dir),
+                                          args.fragment_size, base=args.base,
+                                          backend=backend, jobs=args.jobs,
+                                          force_full=args.force_full)
+                else:
+                    output = translate_chapter(chapter, target_lang, str(output_dir),
+                                               args.fragment_size, recover=args.recover,
+                                               backend=backend, jobs=args.jobs)
                 translated.append(output)
             except Exception as e:
                 print(f"ERROR translating {chapter}: {e}", file=sys.stderr)
@@ -1003,19 +1696,30 @@ def main():
 
         # Handle --status
         if args.status:
-            show_cache_status(str(input_path), str(output_dir), args.fragment_size)
+            show_cache_status(str(input_path), str(output_dir), args.fragment_size, target_lang)
             sys.exit(0)
 
         # Handle --clear-cache
         if args.clear_cache:
-            cache_dir = get_cache_dir(str(output_dir), input_path.stem)
-            clear_cache(cache_dir)
+            cache_dir = get_cache_dir(str(output_dir))
+            with open(input_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+            fragments = plan_fragments(content, cache_dir, input_path.stem, args.fragment_size, record=False)
+            clear_cache(cache_dir, input_path.stem, fragments, target_lang)
             if not args.recover:
                 print("Cache cleared. Run again without --clear-cache to translate.", file=sys.stderr)
                 sys.exit(0)
 
+        if args.sync:
+            sync_chapter(str(input_path), target_lang, str(output_dir),
+                         args.fragment_size, base=args.base,
+                         backend=make_backend(args.backend, args.model), jobs=args.jobs,
+                         force_full=args.force_full)
+            sys.exit(0)
+
         translate_chapter(str(input_path), target_lang, str(output_dir),
-                         args.fragment_size, recover=args.recover)
+                         args.fragment_size, recover=args.recover,
+                         backend=make_backend(args.backend, args.model), jobs=args.jobs)
 
     else:
         print("ERROR: Specify input file or use --all", file=sys.stderr)
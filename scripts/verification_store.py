@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+verification_store.py — Persistent citation verification results.
+
+verify_citations.py re-verifies every citation on every run, though a
+citation's result only changes when one of its inputs does. This store
+keeps each result under those inputs: the bib key and passage, the deep
+(review) flag, a hash of the source files that could be searched, and a
+hash of the registry entry and search code. A run re-verifies only the
+citations whose inputs changed.
+
+Usage:
+    from verification_store import VerificationStore
+    store = VerificationStore(SOURCES_DIR / "verification_cache.sqlite")
+    store.get(inputs)                    # (status, snippet) or None
+    store.put(inputs, status, snippet)
+    store.commit()
+"""
+
+import hashlib
+import sqlite3
+from pathlib import Path
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT NOT NULL,
+    passage TEXT NOT NULL,
+    deep INTEGER NOT NULL,
+    sources_hash TEXT NOT NULL,
+    registry_hash TEXT NOT NULL,
+    status TEXT NOT NULL,
+    snippet TEXT NOT NULL,
+    PRIMARY KEY (key, passage, deep)
+);
+CREATE TABLE IF NOT EXISTS file_hashes (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    sha256 TEXT NOT NULL
+);
+"""
+
+
+class VerificationStore:
+    """SQLite store of verification results and source file hashes.
+
+    One row per (key, passage, deep): a result stored under different
+    source or registry hashes is stale and is replaced, not kept beside
+    the new one. File hashes are remembered by size and mtime, so an
+    unchanged corpus is not re-read to prove it unchanged.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path)
+        self._db.executescript(_SCHEMA)
+        self._file_hashes = {}
+
+    def get(self, inputs):
+        """Return the stored (status, snippet) for inputs, a (key, passage,
+        deep, sources_hash, registry_hash) tuple, or None."""
+        key, passage, deep, sources_hash, registry_hash = inputs
+        row = self._db.execute(
+            "SELECT status, snippet FROM results WHERE key = ? AND passage = ?"
+            " AND deep = ? AND sources_hash = ? AND registry_hash = ?",
+            (key, passage, int(deep), sources_hash, registry_hash),
+        ).fetchone()
+        return tuple(row) if row else None
+
+    def put(self, inputs, status, snippet):
+        key, passage, deep, sources_hash, registry_hash = inputs
+        self._db.execute(
+            "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, passage, int(deep), sources_hash, registry_hash, status, snippet),
+        )
+
+    def commit(self):
+        self._db.commit()
+
+    def close(self):
+        self._db.commit()
+        self._db.close()
+
+    def files_hash(self, paths):
+        """Return one hash over the names and contents of paths."""
+        digest = hashlib.sha256()
+        for path in sorted(paths):
+            digest.update(path.name.encode("utf-8") + b"\0")
+            digest.update(self.file_hash(path).encode("ascii"))
+        return digest.hexdigest()
+
+    def file_hash(self, path):
+        """Return the SHA-256 of a file's contents, recomputed only when its
+        size or mtime differ from the ones last hashed."""
+        path = Path(path)
+        if path in self._file_hashes:
+            return self._file_hashes[path]
+        stat = path.stat()
+        row = self._db.execute(
+            "SELECT sha256 FROM file_hashes WHERE path = ? AND size = ? AND mtime_ns = ?",
+            (str(path), stat.st_size, stat.st_mtime_ns),
+        ).fetchone()
+        if row:
+            sha256 = row[0]
+        else:
+            sha256 = hashlib.sha256(path.read_bytes()).hexdigest()
+            self._db.execute(
+                "INSERT OR REPLACE INTO file_hashes VALUES (?, ?, ?, ?)",
+                (str(path), stat.st_size, stat.st_mtime_ns, sha256),
+            )
+        self._file_hashes[path] = sha256
+        return sha256
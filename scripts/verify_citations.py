@@ -12,21 +12,33 @@ Usage:
     poetry run python scripts/verify_citations.py --key josephus:war # Single source
     poetry run python scripts/verify_citations.py --summary          # Summary only
     poetry run python scripts/verify_citations.py --review           # Human review report
+    poetry run python scripts/verify_citations.py --jobs 16          # Verify in 16 processes
+    poetry run python scripts/verify_citations.py --no-cache         # Ignore stored results
 """
 
 import argparse
+import bisect
+import functools
+import hashlib
 import os
 import re
 import sys
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from dataclasses import dataclass
+from operator import itemgetter
 from pathlib import Path
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from source_corpus import MappedLines, MappedSource, page_table_path, scan_chunk_markers
 from source_registry import SOURCES, MODERN
+from text_utils import LatexCleaner
+from verification_store import VerificationStore
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 SOURCES_DIR = PROJECT_ROOT / "sources"
 REPORT_PATH = SOURCES_DIR / "verification_report.md"
+RESULTS_DB_PATH = SOURCES_DIR / "verification_cache.sqlite"
 
 SNIPPET_LENGTH = 300
 DEEP_SNIPPET_LENGTH = 2000
@@ -52,15 +64,73 @@ class Citation:
     claim_text: str = ""  # cleaned claim from .tex
 
 
-def extract_citations(tex_path):
-    """Extract all citations from a single .tex file."""
-    citations = []
-    text = tex_path.read_text(encoding="utf-8")
+@dataclass
+class Manuscript:
+    """One .tex file, parsed once for both citations and claims.
+
+    comments marks the "%" comment lines citations are not read from.
+    quote_ends maps the index of each line opening a quote block to the
+    index of the line closing it (None when none follows within 19 lines),
+    which is how far a claim window extends over a quote.
+    cites holds (line_num, key, passage, context) for every citation.
+    """
+    name: str
+    lines: list
+    comments: list
+    quote_ends: dict
+    cites: list
+
+    def citations(self):
+        """Return fresh Citation objects for every citation in the file."""
+        return [
+            Citation(file=self.name, line_num=line_num, key=key, passage=passage, context=context)
+            for line_num, key, passage, context in self.cites
+        ]
+
+    def claim(self, line_num):
+        """Extract the manuscript's claim around a citation line.
+
+        Takes 5 lines before and 10 lines after the citation to capture
+        the full claim context including any quote blocks, then strips
+        LaTeX commands from that window.
+        """
+        lines = self.lines
+        # line_num is 1-indexed
+        idx = line_num - 1
+        start = max(0, idx - 5)
+        end = min(len(lines), idx + 11)
+
+        # If there's a \begin{quote} after the cite, extend to \end{quote}
+        first = bisect.bisect_left(self._quote_starts, idx)
+        if first < len(self._quote_starts) and self._quote_starts[first] < idx + 15:
+            quote_end = self.quote_ends[self._quote_starts[first]]
+            if quote_end is not None:
+                end = max(end, quote_end + 2)
+
+        return clean_claim("\n".join(lines[start:end]))
+
+    @functools.cached_property
+    def _quote_starts(self):
+        return sorted(self.quote_ends)
+
+
+def parse_manuscript(text, name):
+    """Parse the text of a .tex file into a Manuscript."""
+    lines = text.split("\n")
+    comments = [line.lstrip().startswith("%") for line in lines]
+
+    quote_ends = {}
+    for i, line in enumerate(lines):
+        if "\\begin{quote}" in line:
+            quote_ends[i] = next(
+                (j for j in range(i + 1, min(len(lines), i + 20)) if "\\end{quote}" in lines[j]),
+                None,
+            )
 
-    for line_num, line in enumerate(text.split("\n"), 1):
+    cites = []
+    for line_num, line in enumerate(lines, 1):
         # Skip comments
-        stripped = line.lstrip()
-        if stripped.startswith("%"):
+        if comments[line_num - 1]:
             continue
 
         for match in CITE_PATTERN.finditer(line):
@@ -80,57 +150,57 @@ def extract_citations(tex_path):
                 context_line = "..." + line[start:end].strip() + "..."
 
             for key in keys:
-                citations.append(Citation(
-                    file=tex_path.name,
-                    line_num=line_num,
-                    key=key,
-                    passage=passage,
-                    context=context_line,
-                ))
+                cites.append((line_num, key, passage, context_line))
 
-    return citations
+    return Manuscript(name=name, lines=lines, comments=comments, quote_ends=quote_ends, cites=cites)
 
 
-def extract_claim(tex_path, line_num):
-    """Extract the manuscript's claim around a citation line.
+def load_manuscript(tex_path):
+    """Return the Manuscript of a .tex file, parsed once while the file is
+    unchanged however many citations ask for claims from it."""
+    tex_path = Path(tex_path).resolve()
+    stat = tex_path.stat()
+    return _load_manuscript(tex_path, stat.st_mtime_ns, stat.st_size)
+
+
+@functools.lru_cache(maxsize=16)
+def _load_manuscript(tex_path, mtime_ns, size):
+    return parse_manuscript(tex_path.read_text(encoding="utf-8"), tex_path.name)
 
-    Reads 5 lines before and 10 lines after the citation to capture
-    the full claim context including any quote blocks. Then strips
-    LaTeX commands.
-    """
-    text = tex_path.read_text(encoding="utf-8")
-    lines = text.split("\n")
-    # line_num is 1-indexed
-    idx = line_num - 1
-    start = max(0, idx - 5)
-    end = min(len(lines), idx + 11)
-
-    # If there's a \begin{quote} after the cite, extend to \end{quote}
-    for i in range(idx, min(len(lines), idx + 15)):
-        if "\\begin{quote}" in lines[i]:
-            # Find the matching \end{quote}
-            for j in range(i + 1, min(len(lines), i + 20)):
-                if "\\end{quote}" in lines[j]:
-                    end = max(end, j + 2)
-                    break
-            break
 
-    claim_lines = lines[start:end]
-    claim_text = "\n".join(claim_lines)
-    # Strip LaTeX commands but preserve text content
-    claim_text = re.sub(r"\\begin\{quote\}", "", claim_text)
-    claim_text = re.sub(r"\\end\{quote\}", "", claim_text)
-    claim_text = re.sub(r"\\(?:emph|textit|textbf|textsc)\{([^}]*)\}", r"\1", claim_text)
-    claim_text = re.sub(r"\\cite\[[^\]]*\]\{[^}]*\}", "", claim_text)
-    claim_text = re.sub(r"\\cite\{[^}]*\}", "", claim_text)
-    claim_text = re.sub(r"\\footnote\{[^}]*\}", "", claim_text)
-    claim_text = re.sub(r"\\[a-zA-Z]+\*?\{([^}]*)\}", r"\1", claim_text)
-    claim_text = re.sub(r"\\[a-zA-Z]+\*?", "", claim_text)
-    claim_text = re.sub(r"[{}]", "", claim_text)
+def extract_citations(tex_path):
+    """Extract all citations from a single .tex file."""
+    return load_manuscript(tex_path).citations()
+
+
+def extract_claim(tex_path, line_num):
+    """Extract the manuscript's claim around a citation line (see Manuscript.claim)."""
+    return load_manuscript(tex_path).claim(line_num)
+
+
+# "[ \t]+" and "[{}]" would match at every space and brace; these forms
+# skip the single spaces the collapse leaves unchanged, and braces go with
+# plain str.replace.
+CLAIM_LATEX = LatexCleaner([
+    ("\\begin{quote}", ""),
+    ("\\end{quote}", ""),
+    (re.compile(r"\\(?:emph|textit|textbf|textsc)\{([^}]*)\}"), r"\1"),
+    (re.compile(r"\\cite\[[^\]]*\]\{[^}]*\}"), ""),
+    (re.compile(r"\\cite\{[^}]*\}"), ""),
+    (re.compile(r"\\footnote\{[^}]*\}"), ""),
+    (re.compile(r"\\[a-zA-Z]+\*?\{([^}]*)\}"), r"\1"),
+    (re.compile(r"\\[a-zA-Z]+\*?"), ""),
+    ("{", ""),
+    ("}", ""),
     # Collapse whitespace but preserve paragraph breaks
-    claim_text = re.sub(r"[ \t]+", " ", claim_text)
-    claim_text = re.sub(r"\n\s*\n", "\n", claim_text)
-    return claim_text.strip()
+    (re.compile(r"\t[ \t]*| [ \t]+"), " "),
+    (re.compile(r"\n\s*\n"), "\n"),
+])
+
+
+def clean_claim(claim_text):
+    """Strip LaTeX commands from a claim window, preserving its text content."""
+    return CLAIM_LATEX(claim_text)
 
 
 def find_source_files(key, ref=None):
@@ -168,6 +238,10 @@ def find_source_files(key, ref=None):
     if ref:
         general = [f for f in files if not re.match(r"book\d+", f.name)]
         books = [f for f in files if f not in general]
+        # A bare number on a book saved page by page is a page reference,
+        # which the paged file answers exactly; try it first.
+        if ref.get("section") and not ref.get("keyword"):
+            general.sort(key=lambda f: not page_table_path(f).exists())
         return general + books
 
     return files
@@ -254,15 +328,134 @@ def normalize_ref(passage):
     return result
 
 
+# Section-marker shapes a source index records, in the order
+# search_passage_in_text tries them for each cited section number. Each
+# captures the marker's digits as written, so "[0497]" never answers for
+# section 497, exactly as the literal pattern r"\[497\]" would not.
+SECTION_MARKER_SHAPES = (
+    ("dot", re.compile(r"\b(\d+)\.\s")),                # "618. " (Whiston-style numbering)
+    ("dot_eol", re.compile(r"\b(\d+)\.$")),              # "14." at end of line
+    ("bare", re.compile(r"^\s*(\d+)\s*$")),              # "14" on its own line
+    ("paren", re.compile(r"\b(\d+)\)")),                 # "618)" numbered paragraphs
+    ("bracket", re.compile(r"\[(\d+)\]")),               # "[27]" bracket style
+    ("section_sign", re.compile(r"§\s*(\d+)\b")),        # "§14"
+    ("chapter", re.compile(r"Chapter\s+(\d+)\b", re.I)),  # "Chapter 39"
+    ("section", re.compile(r"Section\s+(\d+)\b", re.I)),  # "Section 14"
+)
+
+# Shapes that are searched but not tried per cited section: any standalone
+# number, for Strategy 3's search on a large section number.
+NUMBER_SHAPE = ("number", re.compile(r"\b(\d+)\b"))
+
+_DIGIT = re.compile(r"\d")
+
+# Default cap, in megabytes, on the source files SOURCE_CACHE keeps mapped
+# (overridden by --source-cache-mb).
+SOURCE_CACHE_MB = 512
+
+
+@dataclass
+class SourceIndex:
+    """Line-level index of one downloaded source text.
+
+    lines is the text's lines: a list for a text given as a str, or the
+    MappedLines of a MappedSource, which decode on demand. markers maps
+    (shape, digits) to the first line carrying that marker, so a
+    section-pattern lookup is a dictionary hit instead of a scan of every
+    line. records holds the chunk markers _nearest_preceding_marker anchors
+    against.
+    """
+    lines: object
+    markers: dict
+    records: list
+    mapped: MappedSource = None
+
+
+def index_source_text(text):
+    """Build the SourceIndex of a source text."""
+    return _index_lines(text.split("\n"))
+
+
+def index_source_file(path):
+    """Build the SourceIndex of a source file, mapped rather than read."""
+    mapped = MappedSource.open(path)
+    return _index_lines(mapped.lines, mapped)
+
+
+def _index_lines(lines, mapped=None):
+    markers = {}
+    for index, line in enumerate(lines):
+        if not _DIGIT.search(line):
+            continue
+        for shape, regex in SECTION_MARKER_SHAPES + (NUMBER_SHAPE,):
+            for match in regex.finditer(line):
+                markers.setdefault((shape, match.group(1)), index)
+    # A mapped file's chunk markers come from the sidecar download_sources
+    # wrote when it saved the book, rather than from another scan.
+    chunk_markers = mapped.chunk_markers if mapped else scan_chunk_markers(lines)
+    records = [(number, index) for number, index, record in chunk_markers if record]
+    return SourceIndex(lines=lines, markers=markers, records=records, mapped=mapped)
+
+
+def as_source_index(text):
+    """Return the SourceIndex for text, which may already be one."""
+    if isinstance(text, SourceIndex):
+        return text
+    return index_source_text(text)
+
+
+class SourceCache:
+    """Source files opened once per process and shared by every citation.
+
+    verify_citation reads every file of a source in the hints pass and
+    again in the section pass, and chapter 5 alone cites josephus:war and
+    josephus:ant dozens of times. Each file is mapped and indexed on first
+    use; once the files held exceed max_bytes, the least recently used
+    are dropped.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = OrderedDict()  # path -> (SourceIndex, size)
+
+    def load(self, path):
+        """Return the SourceIndex of the text file at path."""
+        path = Path(path)
+        entry = self._entries.get(path)
+        if entry is not None:
+            self._entries.move_to_end(path)
+            return entry[0]
+        source = index_source_file(path)
+        size = source.mapped.size
+        self._entries[path] = (source, size)
+        self.size += size
+        # The newest entry stays even alone over the cap: it is in use.
+        while self.size > self.max_bytes and len(self._entries) > 1:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.size -= evicted
+        return source
+
+    def clear(self):
+        self._entries.clear()
+        self.size = 0
+
+
+SOURCE_CACHE = SourceCache(SOURCE_CACHE_MB * 1024 * 1024)
+
+
 def search_passage_in_text(text, passage, key, deep=False, hints_only=False):
-    """Search for a passage reference within downloaded text. Returns snippet or empty string."""
+    """Search for a passage reference within downloaded text. Returns snippet or empty string.
+
+    text is the source text or its SourceIndex (as SOURCE_CACHE returns).
+    """
     ref = normalize_ref(passage)
     if not ref:
         return ""
 
     max_snippet = DEEP_SNIPPET_LENGTH if deep else SNIPPET_LENGTH
-    lines = text.split("\n")
-    total_text = text
+    source = as_source_index(text)
+    lines = source.lines
 
     section = ref.get("section")
     chapter = ref.get("chapter")
@@ -276,13 +469,32 @@ def search_passage_in_text(text, passage, key, deep=False, hints_only=False):
     source_info = SOURCES.get(key, {})
     passage_hints = source_info.get("passage_hints", {})
     hint_patterns = passage_hints.get(section, []) if section else []
-    hint_line = _find_pattern_line(lines, hint_patterns)
+    hint_line = _find_pattern_line(source, hint_patterns)
     if hint_line is not None:
         return _extract_snippet(lines, hint_line, max_snippet, deep)
     if hints_only:
         return ""
 
-    # Strategy 2: Search for section numbers in common patterns
+    # Strategy 1b: a page reference into a book saved page by page
+    # (download_ia_authenticated.py). A modern work is cited by page
+    # ("\cite[310--329]{assmann:searchgod}"), and the page table gives
+    # that page's lines at once. Once the book's pages are numbered, a
+    # page it does not have is not found: a "310" elsewhere in the text
+    # is a footnote or a year, not the page.
+    pages = source.mapped.pages if source.mapped else None
+    if pages and pages.labels and section and not (book or keyword):
+        section_end = ref.get("section_end", section)
+        for page in range(section, min(section_end, section + 50) + 1):
+            page_lines = pages.lines(page)
+            if page_lines is not None:
+                start, stop = page_lines
+                snippet = _extract_snippet(lines, start, max_snippet, deep, before=0, after=stop - start)
+                return f"(p. {page}) {snippet}"
+        return ""
+
+    # Strategy 2: Search for section numbers in common patterns. Plain
+    # strings are regexes tried against every line; (shape, number) pairs
+    # are looked up in the source index (see SECTION_MARKER_SHAPES).
     search_patterns = []
 
     if keyword and number:
@@ -296,8 +508,8 @@ def search_passage_in_text(text, passage, key, deep=False, hints_only=False):
             # Also try "Fourth Chapter" (ordinal before Chapter, common in older translations)
             search_patterns.append(rf"{ord_word}\s+Chapter")
         # Standalone number on its own line (e.g., Plutarch chapter "26")
-        search_patterns.append(rf"^\s*{number}\s*$")
-        search_patterns.append(rf"Chapter\s+{number}\b")
+        search_patterns.append(("bare", number))
+        search_patterns.append(("chapter", number))
 
     # Also search for extra_keywords from comma-separated refs
     for extra in ref.get("extra_keywords", []):
@@ -316,16 +528,7 @@ def search_passage_in_text(text, passage, key, deep=False, hints_only=False):
         section_end = ref.get("section_end", section)
         candidates = range(section, min(section_end, section + 50) + 1)
         for number in candidates:
-            search_patterns.extend([
-                rf"\b{number}\.\s",           # "618. " (Whiston-style numbering)
-                rf"\b{number}\.$",            # "14." at end of line
-                rf"^\s*{number}\s*$",         # "14" on its own line
-                rf"\b{number}\)",             # "618)" numbered paragraphs
-                rf"\[{number}\]",             # "[27]" bracket style
-                rf"§\s*{number}\b",           # "§14"
-                rf"Chapter\s+{number}\b",     # "Chapter 39"
-                rf"Section\s+{number}\b",     # "Section 14"
-            ])
+            search_patterns.extend((shape, number) for shape, _ in SECTION_MARKER_SHAPES)
 
     # A bare "Book X" heading match is deliberately not in the pattern list:
     # it says nothing about the cited section, and a truncated or wrong file
@@ -335,7 +538,7 @@ def search_passage_in_text(text, passage, key, deep=False, hints_only=False):
     if chapter and section:
         search_patterns.append(rf"Chapter\s+{chapter}")
 
-    match_line = _find_pattern_line(lines, search_patterns)
+    match_line = _find_pattern_line(source, search_patterns)
     if match_line is not None:
         return _extract_snippet(lines, match_line, max_snippet, deep)
 
@@ -343,8 +546,7 @@ def search_passage_in_text(text, passage, key, deep=False, hints_only=False):
     # e.g., for Josephus war 4.618, search for "Vespasian" near "618"
     if section and section > 100:
         # For large section numbers, just search for the number
-        pattern = rf"\b{section}\b"
-        match_line = _find_pattern_line(lines, [pattern], flags=0)
+        match_line = _find_pattern_line(source, [("number", section)], flags=0)
         if match_line is not None:
             before, after = (3, 20) if deep else (1, 3)
             return _extract_snippet(
@@ -364,7 +566,7 @@ def search_passage_in_text(text, passage, key, deep=False, hints_only=False):
     # anchor, so the review reads from a stated nearby point rather than
     # taking the snippet as the section itself.
     if section:
-        anchor = _nearest_preceding_marker(lines, section)
+        anchor = _nearest_preceding_marker(source.records, section)
         if anchor is not None:
             marker, index = anchor
             snippet = _extract_snippet(
@@ -381,43 +583,157 @@ def search_passage_in_text(text, passage, key, deep=False, hints_only=False):
 MAX_MARKER_DISTANCE = 40
 
 
-def _nearest_preceding_marker(lines, section):
+def _nearest_preceding_marker(records, section):
     """Return (marker, line_index) for the closest section marker at or
     before the cited section, or None. Chunk markers increase through the
     file, so only markers larger than every earlier marker count: numbers
     that reset (per-chapter subsection numbering, page numbers) never form
-    such a record and must not anchor a citation. Fewer than three record
-    markers means the file has no chunk structure to anchor against."""
-    records = []
-    highest = 0
-    for index, line in enumerate(lines):
-        numbers = [int(m.group(1)) for m in re.finditer(r"\[\s*(\d+)\s*\]", line)]
-        m = re.match(r"^\s*(\d+)\s*$", line)
-        if m:
-            numbers.append(int(m.group(1)))
-        for number in numbers:
-            if number > highest:
-                highest = number
-                records.append((number, index))
+    such a record and must not anchor a citation. The source index keeps
+    those records, in increasing order, so the closest one is a binary
+    search away; fewer than three means the file has no chunk structure to
+    anchor against."""
     if len(records) < 3:
         return None
-    candidates = [
-        (marker, index)
-        for marker, index in records
-        if marker <= section and section - marker <= MAX_MARKER_DISTANCE
-    ]
-    if not candidates:
+    at = bisect.bisect_right(records, section, key=itemgetter(0))
+    if not at:
         return None
-    return max(candidates)
+    marker, index = records[at - 1]
+    if section - marker > MAX_MARKER_DISTANCE:
+        return None
+    return marker, index
+
 
+def _find_pattern_line(source, patterns, flags=re.IGNORECASE):
+    """Return the first line index matching the first applicable pattern.
 
-def _find_pattern_line(lines, patterns, flags=re.IGNORECASE):
-    """Return the first line index matching the first applicable pattern."""
+    A (shape, number) pattern is answered from the source index; string
+    patterns are regexes. Only the regexes ahead of the first indexed hit
+    can outrank it, so those alone are handed to find_first_match.
+    """
+    regexes = []
+    indexed_line = None
     for pattern in patterns:
-        for index, line in enumerate(lines):
-            if re.search(pattern, line, flags):
-                return index
-    return None
+        if isinstance(pattern, tuple):
+            shape, number = pattern
+            indexed_line = source.markers.get((shape, str(number)))
+            if indexed_line is not None:
+                break
+        else:
+            regexes.append(pattern)
+    match = find_first_match(source.lines, regexes, flags)
+    if match is not None:
+        return match[1]
+    return indexed_line
+
+
+def find_first_match(lines, patterns, flags=re.IGNORECASE, accept=None, start=0, stop=None):
+    """Return (pattern_index, line_index) for the first pattern, in priority
+    order, that matches any line in lines[start:stop], paired with the
+    first line it matches; None when no pattern matches.
+
+    The answer is the one trying each pattern against every line in turn
+    gives, but the lines are scanned once. An alternation of all patterns
+    skips the lines none of them match; on a line it matches, its leftmost
+    alternative is a match, and only patterns ahead of both that one and
+    the best found so far are tried individually. accept, when given,
+    restricts the search to the lines it returns true for.
+    """
+    if not patterns:
+        return None
+    combined, singles = _compile_alternation(tuple(patterns), flags)
+    best = len(singles)
+    best_line = None
+    for index in _candidate_lines(lines, patterns, flags, start, stop):
+        line = lines[index]
+        if accept is not None and not accept(line):
+            continue
+        if combined is None:
+            bound = best
+        else:
+            match = combined.search(line)
+            if match is None:
+                continue
+            bound = min(best, int(match.lastgroup[1:]))
+        for priority in range(bound):
+            if singles[priority].search(line):
+                best, best_line = priority, index
+                break
+        else:
+            if bound < best:
+                best, best_line = bound, index
+        if best == 0:
+            break
+    if best_line is None:
+        return None
+    return best, best_line
+
+
+def _candidate_lines(lines, patterns, flags, start, stop):
+    """Yield the indexes of the lines in [start, stop) that may match.
+
+    For the lines of a plain mapped source, the patterns run as one bytes
+    alternation over the mapped file and only lines where it matches are
+    yielded; otherwise every line is.
+    """
+    if stop is None or stop > len(lines):
+        stop = len(lines)
+    mapped = lines.source if isinstance(lines, MappedLines) else None
+    if mapped is not None and mapped.plain:
+        regex = _compile_bytes_alternation(tuple(patterns), flags)
+        if regex is not None:
+            yield from mapped.candidate_lines(regex, start, stop)
+            return
+    yield from range(start, stop)
+
+
+# Constructs whose bytes-mode, whole-file reading can differ from a search
+# within one decoded line: lookarounds and inline flags see past the
+# line's ends, \A and \Z anchor to the file rather than the line, and a
+# backreference changes meaning inside an alternation.
+_LINE_BOUND_ONLY = re.compile(r"\(\?[=!<aiLmsux-]|\(\?P=|\\[AZ1-9]")
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_bytes_alternation(patterns, flags):
+    """Compile patterns into one bytes alternation for
+    MappedSource.candidate_lines, or None when a pattern is not ASCII or
+    uses a construct from _LINE_BOUND_ONLY."""
+    if flags & ~re.IGNORECASE:
+        return None
+    if not all(p.isascii() and not _LINE_BOUND_ONLY.search(p) for p in patterns):
+        return None
+    try:
+        return re.compile(
+            "|".join(f"(?:{pattern})" for pattern in patterns).encode("ascii"),
+            flags | re.MULTILINE,
+        )
+    except re.error:
+        return None
+
+
+# A backreference counts groups from the start of the whole expression, so
+# it changes meaning once its pattern sits inside a larger alternation.
+_BACKREFERENCE = re.compile(r"\\[1-9]|\(\?P=")
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_alternation(patterns, flags):
+    """Compile patterns into one alternation with a named group per
+    pattern (p0, p1, ... in priority order), alongside each pattern
+    compiled on its own. The alternation is None for patterns that cannot
+    be combined; find_first_match then tries every pattern on every line."""
+    singles = [re.compile(pattern, flags) for pattern in patterns]
+    if any(_BACKREFERENCE.search(pattern) for pattern in patterns):
+        return None, singles
+    try:
+        combined = re.compile(
+            "|".join(f"(?P<p{i}>{pattern})" for i, pattern in enumerate(patterns)),
+            flags,
+        )
+    except re.error:
+        # An inline global flag or a clashing group name
+        combined = None
+    return combined, singles
 
 
 def _extract_snippet(lines, index, max_snippet, deep, before=None, after=None):
@@ -506,9 +822,9 @@ def verify_citation(citation, deep=False):
     # (cassiusdio 66.15 sits on the "65" page).
     for hints_only, files in ((True, find_source_files(key)), (False, source_files)):
         for fpath in files:
-            text = fpath.read_text(encoding="utf-8", errors="replace")
             snippet = search_passage_in_text(
-                text, citation.passage, key, deep=deep, hints_only=hints_only
+                SOURCE_CACHE.load(fpath), citation.passage, key,
+                deep=deep, hints_only=hints_only,
             )
             if snippet:
                 citation.status = "LOCATED"
@@ -519,6 +835,101 @@ def verify_citation(citation, deep=False):
     citation.snippet = f"Searched {len(source_files)} file(s). Passage '{citation.passage}' not located."
 
 
+def verify_in_parallel(citations, deep=False, jobs=2):
+    """Verify citations across a pool of jobs worker processes.
+
+    Citations are grouped by bib key and each group is verified by one
+    worker, so the worker's SOURCE_CACHE serves every citation of that
+    source from one read. Results are written back into the given
+    Citation objects, leaving their order, and the reports built from
+    them, exactly as a serial run leaves them.
+    """
+    groups = {}
+    for index, citation in enumerate(citations):
+        groups.setdefault(citation.key, []).append(index)
+    # Largest groups first, so the biggest source is not the last to start.
+    ordered = sorted(groups.values(), key=len, reverse=True)
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=_init_worker,
+        initargs=(SOURCES_DIR, SOURCE_CACHE.max_bytes),
+    ) as pool:
+        futures = {
+            pool.submit(_verify_group, [citations[i] for i in indexes], deep): indexes
+            for indexes in ordered
+        }
+        for future in as_completed(futures):
+            for index, (status, snippet) in zip(futures[future], future.result()):
+                citations[index].status = status
+                citations[index].snippet = snippet
+
+
+def _init_worker(sources_dir, cache_bytes):
+    """Carry the parent's sources directory and cache cap into a worker,
+    which under the spawn start method imports this module afresh."""
+    global SOURCES_DIR
+    SOURCES_DIR = sources_dir
+    SOURCE_CACHE.max_bytes = cache_bytes
+
+
+def _verify_group(citations, deep):
+    """Verify one key's citations in a worker; return (status, snippet) pairs."""
+    for citation in citations:
+        verify_citation(citation, deep=deep)
+    return [(c.status, c.snippet) for c in citations]
+
+
+def reuse_stored_results(citations, deep, store):
+    """Fill in each citation whose inputs match a stored result; return
+    {index: inputs} for the citations that still need verifying.
+
+    Status and snippet come from the store. Line number and context stay
+    as the fresh extract_citations pass found them, so an edit that only
+    moves a citation costs nothing.
+    """
+    stale = {}
+    for index, citation in enumerate(citations):
+        inputs = citation_inputs(citation, deep, store)
+        stored = store.get(inputs)
+        if stored is None:
+            stale[index] = inputs
+        else:
+            citation.status, citation.snippet = stored
+    return stale
+
+
+def citation_inputs(citation, deep, store):
+    """Return the (key, passage, deep, sources_hash, registry_hash) that
+    determine a citation's verification result.
+
+    sources_hash covers every downloaded file of the source, since the
+    hints pass searches all of them, and the page tables beside them,
+    which page references are answered from and which order the files
+    are searched in. registry_hash covers the whole
+    registry entry (passage_hints, and the obtain note a MODERN result
+    quotes) and the search code itself, so a change to either re-verifies.
+    """
+    files = find_source_files(citation.key) if citation.key in SOURCES else []
+    registry = repr(SOURCES.get(citation.key)).encode("utf-8")
+    registry_hash = hashlib.sha256(registry + _verifier_hash().encode("ascii"))
+    return (
+        citation.key,
+        citation.passage,
+        bool(deep),
+        store.files_hash(files + [page_table_path(f) for f in files if page_table_path(f).exists()]),
+        registry_hash.hexdigest(),
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _verifier_hash():
+    """Hash of the modules whose code decides a verification result."""
+    digest = hashlib.sha256()
+    for module in ("verify_citations.py", "source_corpus.py"):
+        digest.update((Path(__file__).parent / module).read_bytes())
+    return digest.hexdigest()
+
+
 def generate_report(citations, output_path):
     """Generate a Markdown verification report."""
     output_path.parent.mkdir(parents=True, exist_ok=True)
@@ -831,7 +1242,25 @@ def main():
         action="store_true",
         help="Generate side-by-side review report for human verification",
     )
+    parser.add_argument(
+        "--source-cache-mb",
+        type=int,
+        default=SOURCE_CACHE_MB,
+        help=f"Memory cap for source files kept mapped between citations (default: {SOURCE_CACHE_MB})",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Re-verify every citation instead of reusing stored results",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Verify citations in N worker processes, grouped by source (default: 1)",
+    )
     args = parser.parse_args()
+    SOURCE_CACHE.max_bytes = args.source_cache_mb * 1024 * 1024
 
     # Find chapter files
     if args.chapter:
@@ -865,9 +1294,21 @@ def main():
     print(f"\nTotal citations: {len(all_citations)}")
     print(f"\nVerifying...\n")
 
+    # Reuse stored results for citations whose inputs have not changed
+    store = None if args.no_cache else VerificationStore(RESULTS_DB_PATH)
+    if store is None:
+        stale = dict.fromkeys(range(len(all_citations)))
+    else:
+        stale = reuse_stored_results(all_citations, args.review, store)
+        print(f"Reusing {len(all_citations) - len(stale)} stored result(s), "
+              f"verifying {len(stale)}\n")
+
     # Verify each citation
-    for i, citation in enumerate(all_citations, 1):
-        verify_citation(citation, deep=args.review)
+    if args.jobs > 1:
+        verify_in_parallel([all_citations[i] for i in stale], deep=args.review, jobs=args.jobs)
+    for i, citation in enumerate(all_citations):
+        if args.jobs <= 1 and i in stale:
+            verify_citation(citation, deep=args.review)
         status_char = {
             "LOCATED": "+",
             "NO_PASSAGE": "~",
@@ -880,6 +1321,11 @@ def main():
         print(f"  [{status_char}] {citation.file}:{citation.line_num} "
               f"\\cite{passage_str}{{{citation.key}}} -> {citation.status}")
 
+    if store is not None:
+        for i, inputs in stale.items():
+            store.put(inputs, all_citations[i].status, all_citations[i].snippet)
+        store.close()
+
     # Print summary
     print(f"\n{'=' * 70}")
     print("Summary:")
@@ -7,11 +7,16 @@ searches for reviews/summaries/descriptions online, and downloads evidence
 confirming the work says what we claim it says.
 
 Uses Google Books API (descriptions), Open Library, and web search results.
+The lookups for a work run at the same time, each API kept to its own
+request rate, and every API response is kept in sources/.api_cache for
+API_CACHE_DAYS: re-verifying works whose lookups are cached makes no
+requests.
 
 Usage:
     poetry run python scripts/verify_modern_works.py              # Verify all
     poetry run python scripts/verify_modern_works.py --key KEY    # Single work
     poetry run python scripts/verify_modern_works.py --report     # Regenerate report
+    poetry run python scripts/verify_modern_works.py --refresh    # Ignore cached API responses
 """
 
 import argparse
@@ -19,7 +24,8 @@ import json
 import os
 import re
 import sys
-import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 sys.stdout.reconfigure(line_buffering=True)
@@ -32,19 +38,107 @@ except ImportError:
     sys.exit(1)
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from http_cache import HttpCache
+from http_session import HostRateLimiter, make_session, pooled_transport
 from source_registry import SOURCES, MODERN
-from verify_citations import extract_citations, extract_claim
+from verify_citations import load_manuscript
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 SOURCES_DIR = PROJECT_ROOT / "sources"
 REQUEST_DELAY = 2
 REQUEST_TIMEOUT = 15
 
+GOOGLE_BOOKS_URL = "https://www.googleapis.com/books/v1/volumes"
+OPEN_LIBRARY_URL = "https://openlibrary.org"
+WIKIPEDIA_API_URL = "https://en.wikipedia.org/w/api.php"
+
+# Seconds between requests to each API, however many lookups are running
+# (REQUEST_DELAY for any other host). Wikipedia takes the most requests
+# per work and allows the most.
+API_INTERVALS = {
+    "www.googleapis.com": 1.0,
+    "openlibrary.org": 1.0,
+    "en.wikipedia.org": 0.5,
+}
+
+# Titles whose intros one prop=extracts request returns (the API's limit).
+WIKIPEDIA_BATCH = 20
+
+# How long a cached API response is used before it is requested again.
+API_CACHE_DAYS = 30
+
+# Lookups run at once for one work: Google Books, Open Library, and the
+# two Wikipedia searches.
+LOOKUP_JOBS = 4
+
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
                   "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
 }
 
+# Spacing of the requests to each lookup API, for the lookups and for the
+# session's own retries of them.
+API_LIMITER = HostRateLimiter(REQUEST_DELAY, API_INTERVALS)
+
+# One pooled session for the Google Books, Open Library and Wikipedia
+# lookups. It sends requests' own User-Agent, as the lookups always have.
+HTTP = make_session(transport=pooled_transport(limiter=API_LIMITER))
+
+
+class ApiClient:
+    """GET requests to the lookup APIs, answered from the response cache
+    while a stored copy is younger than max_age seconds, and otherwise
+    sent through the rate limiter.
+
+    A stored body that is not JSON (a "Service busy" page some APIs send
+    with 200) counts as none, so it is requested again rather than read
+    as "not found" until it expires."""
+
+    def __init__(self, session, cache, limiter, max_age):
+        self.session = session
+        self.cache = cache
+        self.limiter = limiter
+        self.max_age = max_age
+
+    def get(self, url, params=None):
+        url = _request_url(url, params)
+        resp = self.cache.load(url, max_age=self.max_age)
+        if resp is not None and _is_json(resp):
+            return resp
+        self.limiter.wait(url)
+        # A stored page that is not JSON is fetched whole, not revalidated.
+        return self.cache.get(self.session, url, revalidate=resp is None, timeout=REQUEST_TIMEOUT)
+
+    def load(self, url, params=None):
+        """Return the cached response to the request, or None, offline."""
+        resp = self.cache.load(_request_url(url, params), max_age=self.max_age)
+        return resp if resp is not None and _is_json(resp) else None
+
+    def put(self, url, params, data):
+        """Cache data (JSON) as the response to the request."""
+        self.cache.put(_request_url(url, params), json.dumps(data).encode("utf-8"))
+
+
+def _is_json(resp):
+    try:
+        resp.json()
+    except ValueError:
+        return False
+    return True
+
+
+def _request_url(url, params):
+    # The cache is keyed by URL, so the query goes into it.
+    return requests.Request("GET", url, params=params).prepare().url
+
+
+API = ApiClient(
+    HTTP,
+    HttpCache(SOURCES_DIR / ".api_cache"),
+    API_LIMITER,
+    API_CACHE_DAYS * 24 * 60 * 60,
+)
+
 
 def get_manuscript_claims():
     """Extract all modern citations with their manuscript claims."""
@@ -52,28 +146,26 @@ def get_manuscript_claims():
     tex_files += list(PROJECT_ROOT.glob("preface.tex"))
     tex_files += list(PROJECT_ROOT.glob("epilogue.tex"))
 
-    all_citations = []
-    for tf in tex_files:
-        all_citations.extend(extract_citations(tf))
-
     claims = {}
-    for c in all_citations:
-        info = SOURCES.get(c.key, {})
-        if info.get("category") != MODERN:
-            continue
-        claim_text = extract_claim(Path(c.file), c.line_num)
-        if c.key not in claims:
-            claims[c.key] = {
-                "title": info.get("title", ""),
-                "author": info.get("author", ""),
-                "year": info.get("year", ""),
-                "citations": [],
-            }
-        claims[c.key]["citations"].append({
-            "file": os.path.basename(c.file),
-            "line": c.line_num,
-            "claim": claim_text,
-        })
+    for tf in tex_files:
+        manuscript = load_manuscript(tf)
+        for c in manuscript.citations():
+            info = SOURCES.get(c.key, {})
+            if info.get("category") != MODERN:
+                continue
+            claim_text = manuscript.claim(c.line_num)
+            if c.key not in claims:
+                claims[c.key] = {
+                    "title": info.get("title", ""),
+                    "author": info.get("author", ""),
+                    "year": info.get("year", ""),
+                    "citations": [],
+                }
+            claims[c.key]["citations"].append({
+                "file": os.path.basename(c.file),
+                "line": c.line_num,
+                "claim": claim_text,
+            })
     return claims
 
 
@@ -83,21 +175,13 @@ def search_google_books(title, author):
     query = f'intitle:"{title}" inauthor:{author_last}'
 
     try:
-        resp = requests.get(
-            "https://www.googleapis.com/books/v1/volumes",
-            params={"q": query, "maxResults": 3},
-            timeout=REQUEST_TIMEOUT,
-        )
+        resp = API.get(GOOGLE_BOOKS_URL, params={"q": query, "maxResults": 3})
         resp.raise_for_status()
         data = resp.json()
 
         if data.get("totalItems", 0) == 0:
             # Looser search
-            resp = requests.get(
-                "https://www.googleapis.com/books/v1/volumes",
-                params={"q": f"{title} {author_last}", "maxResults": 3},
-                timeout=REQUEST_TIMEOUT,
-            )
+            resp = API.get(GOOGLE_BOOKS_URL, params={"q": f"{title} {author_last}", "maxResults": 3})
             resp.raise_for_status()
             data = resp.json()
 
@@ -126,10 +210,9 @@ def search_open_library(title, author):
     """Search Open Library for metadata and description."""
     author_last = author.split()[-1] if author.split() else author
     try:
-        resp = requests.get(
-            "https://openlibrary.org/search.json",
+        resp = API.get(
+            f"{OPEN_LIBRARY_URL}/search.json",
             params={"title": title, "author": author_last, "limit": 3},
-            timeout=REQUEST_TIMEOUT,
         )
         resp.raise_for_status()
         data = resp.json()
@@ -153,7 +236,7 @@ def search_open_library(title, author):
         # Get description from work page
         if work_key:
             try:
-                wr = requests.get(f"https://openlibrary.org{work_key}.json", timeout=REQUEST_TIMEOUT)
+                wr = API.get(f"{OPEN_LIBRARY_URL}{work_key}.json")
                 if wr.status_code == 200:
                     wd = wr.json()
                     desc = wd.get("description", "")
@@ -168,55 +251,154 @@ def search_open_library(title, author):
         return None
 
 
-def fetch_wikipedia_summary(title, author):
-    """Try to find a Wikipedia article about the book or author's thesis."""
-    author_last = author.split()[-1] if author.split() else author
+class WikipediaClient:
+    """Wikipedia searches, and article intros fetched many titles a request.
 
-    # Try book title first, then author
-    for query in [title, f"{author_last} {title}"]:
-        try:
-            resp = requests.get(
-                "https://en.wikipedia.org/w/api.php",
-                params={
-                    "action": "query",
-                    "list": "search",
-                    "srsearch": query,
-                    "srlimit": 3,
-                    "format": "json",
-                },
-                timeout=REQUEST_TIMEOUT,
-            )
+    fetch_wikipedia_summary used to request the intro of each search hit
+    on its own, up to six requests a work. MediaWiki returns the intros of
+    up to WIKIPEDIA_BATCH titles in one prop=extracts request, so the
+    hits of every work in a run are collected first (prefetch_summaries)
+    and their intros fetched together. Intros are kept in memory for the
+    run, and each is also cached as the response to a request for that
+    title alone: which titles share a batch depends on the works in the
+    run, so a batch request is rarely made twice, but its titles are.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._intros = {}  # title -> intro text ("" for a page without one)
+
+    def search(self, query):
+        """Return the search hits for query: dicts with title and snippet."""
+        resp = API.get(
+            WIKIPEDIA_API_URL,
+            params={
+                "action": "query",
+                "list": "search",
+                "srsearch": query,
+                "srlimit": 3,
+                "format": "json",
+            },
+        )
+        resp.raise_for_status()
+        return resp.json().get("query", {}).get("search", [])
+
+    def intros(self, titles):
+        """Return {title: intro text} for titles, requesting the intros not
+        yet fetched WIKIPEDIA_BATCH titles at a time. A title whose request
+        failed maps to "" and is requested again next time."""
+        with self._lock:
+            wanted = sorted({t for t in titles if t not in self._intros})
+        cached = {}
+        for title in wanted:
+            resp = API.load(WIKIPEDIA_API_URL, _intro_params([title]))
+            if resp is not None:
+                cached.update(_read_intros(resp.json(), [title]))
+        with self._lock:
+            self._intros.update(cached)
+        wanted = [t for t in wanted if t not in cached]
+
+        for i in range(0, len(wanted), WIKIPEDIA_BATCH):
+            batch = wanted[i:i + WIKIPEDIA_BATCH]
+            try:
+                fetched = self._fetch_intros(batch)
+            except (requests.RequestException, ValueError):
+                continue
+            for title, extract in fetched.items():
+                page = {"title": title, "extract": extract} if extract else {"title": title}
+                API.put(WIKIPEDIA_API_URL, _intro_params([title]), {"query": {"pages": {"0": page}}})
+            with self._lock:
+                self._intros.update(fetched)
+        with self._lock:
+            return {t: self._intros.get(t, "") for t in titles}
+
+    def _fetch_intros(self, titles):
+        params = _intro_params(titles)
+        normalized, pages = [], []
+        while True:
+            resp = API.get(WIKIPEDIA_API_URL, params=params)
             resp.raise_for_status()
             data = resp.json()
-            results = data.get("query", {}).get("search", [])
+            query = data.get("query", {})
+            normalized.extend(query.get("normalized", []))
+            pages.extend(query.get("pages", {}).values())
+            # The API answers a batch whose intros run long in parts.
+            if "continue" not in data:
+                break
+            params = {**params, **data["continue"]}
+        return _read_intros({"query": {"normalized": normalized, "pages": dict(enumerate(pages))}}, titles)
+
+    def prefetch_summaries(self, claims):
+        """Fetch, in batches, the intros fetch_wikipedia_summary will read
+        for every work in claims ({key: claim info})."""
+        titles = []
+        with ThreadPoolExecutor(max_workers=LOOKUP_JOBS) as pool:
+            searches = [
+                pool.submit(self.search, query)
+                for info in claims.values()
+                for query in _summary_queries(info["title"], info["author"])
+            ]
+            for search in searches:
+                try:
+                    titles.extend(hit.get("title", "") for hit in search.result())
+                except (requests.RequestException, ValueError):
+                    continue
+        self.intros(titles)
+
+
+def _intro_params(titles):
+    return {
+        "action": "query",
+        "titles": "|".join(titles),
+        "prop": "extracts",
+        "exintro": True,
+        "explaintext": True,
+        "exlimit": WIKIPEDIA_BATCH,
+        "format": "json",
+    }
 
-            for r in results:
-                page_title = r.get("title", "")
-                # Get extract
-                ext_resp = requests.get(
-                    "https://en.wikipedia.org/w/api.php",
-                    params={
-                        "action": "query",
-                        "titles": page_title,
-                        "prop": "extracts",
-                        "exintro": True,
-                        "explaintext": True,
-                        "format": "json",
-                    },
-                    timeout=REQUEST_TIMEOUT,
-                )
-                ext_data = ext_resp.json()
-                pages = ext_data.get("query", {}).get("pages", {})
-                for pid, page in pages.items():
-                    extract = page.get("extract", "")
-                    if extract and len(extract) > 100:
-                        return {
-                            "page_title": page_title,
-                            "url": f"https://en.wikipedia.org/wiki/{page_title.replace(' ', '_')}",
-                            "extract": extract[:2000],
-                        }
-        except requests.RequestException:
+
+def _read_intros(data, titles):
+    """Return {title: intro text} for titles from a prop=extracts response;
+    "" for a title whose page has no intro in it."""
+    query = data.get("query", {})
+    # A title the API normalized ("jesus" -> "Jesus") comes back under its
+    # new name.
+    renamed = {n["from"]: n["to"] for n in query.get("normalized", [])}
+    extracts = {
+        page.get("title"): page["extract"]
+        for page in query.get("pages", {}).values()
+        if "extract" in page
+    }
+    return {t: extracts.get(renamed.get(t, t), "") for t in titles}
+
+
+WIKI = WikipediaClient()
+
+
+def _summary_queries(title, author):
+    """The Wikipedia searches for a work: its title, then author and title."""
+    author_last = author.split()[-1] if author.split() else author
+    return [title, f"{author_last} {title}"]
+
+
+def fetch_wikipedia_summary(title, author):
+    """Try to find a Wikipedia article about the book or author's thesis."""
+    # Try book title first, then author
+    for query in _summary_queries(title, author):
+        try:
+            hits = [hit.get("title", "") for hit in WIKI.search(query)]
+        except (requests.RequestException, ValueError):
             continue
+        intros = WIKI.intros(hits)
+        for page_title in hits:
+            extract = intros[page_title]
+            if extract and len(extract) > 100:
+                return {
+                    "page_title": page_title,
+                    "url": f"https://en.wikipedia.org/wiki/{page_title.replace(' ', '_')}",
+                    "extract": extract[:2000],
+                }
 
     return None
 
@@ -229,50 +411,37 @@ def search_claim_on_web(query):
         results = []
 
         # Try Wikipedia search for the claim
-        resp = requests.get(
-            "https://en.wikipedia.org/w/api.php",
-            params={
-                "action": "query",
-                "list": "search",
-                "srsearch": query,
-                "srlimit": 3,
-                "format": "json",
-            },
-            timeout=REQUEST_TIMEOUT,
-        )
-        if resp.status_code == 200:
-            data = resp.json()
-            for r in data.get("query", {}).get("search", [])[:2]:
-                page_title = r.get("title", "")
-                snippet = r.get("snippet", "")
-                # Clean HTML from snippet
-                snippet = re.sub(r"<[^>]+>", "", snippet)
-                if snippet and len(snippet) > 50:
-                    # Get full extract
-                    ext_resp = requests.get(
-                        "https://en.wikipedia.org/w/api.php",
-                        params={
-                            "action": "query",
-                            "titles": page_title,
-                            "prop": "extracts",
-                            "explaintext": True,
-                            "exlimit": 1,
-                            "exchars": 3000,
-                            "format": "json",
-                        },
-                        timeout=REQUEST_TIMEOUT,
-                    )
-                    if ext_resp.status_code == 200:
-                        pages = ext_resp.json().get("query", {}).get("pages", {})
-                        for pid, page in pages.items():
-                            extract = page.get("extract", "")
-                            if extract and len(extract) > 100:
-                                results.append({
-                                    "source": f"Wikipedia: {page_title}",
-                                    "url": f"https://en.wikipedia.org/wiki/{page_title.replace(' ', '_')}",
-                                    "text": extract[:3000],
-                                    "search_snippet": snippet,
-                                })
+        for r in WIKI.search(query)[:2]:
+            page_title = r.get("title", "")
+            snippet = r.get("snippet", "")
+            # Clean HTML from snippet
+            snippet = re.sub(r"<[^>]+>", "", snippet)
+            if snippet and len(snippet) > 50:
+                # Get full extract. Unlike intros, MediaWiki returns these
+                # one title per request, so they are not batched.
+                ext_resp = API.get(
+                    WIKIPEDIA_API_URL,
+                    params={
+                        "action": "query",
+                        "titles": page_title,
+                        "prop": "extracts",
+                        "explaintext": True,
+                        "exlimit": 1,
+                        "exchars": 3000,
+                        "format": "json",
+                    },
+                )
+                if ext_resp.status_code == 200:
+                    pages = ext_resp.json().get("query", {}).get("pages", {})
+                    for pid, page in pages.items():
+                        extract = page.get("extract", "")
+                        if extract and len(extract) > 100:
+                            results.append({
+                                "source": f"Wikipedia: {page_title}",
+                                "url": f"https://en.wikipedia.org/wiki/{page_title.replace(' ', '_')}",
+                                "text": extract[:3000],
+                                "search_snippet": snippet,
+                            })
 
         return results
 
@@ -280,8 +449,23 @@ def search_claim_on_web(query):
         return []
 
 
+def search_claim_evidence(title, author):
+    """Search Wikipedia for the work by author and title, then by title
+    alone. Returns the results of the first search with any."""
+    author_last = author.split()[-1] if author.split() else author
+    for q in [f"{author_last} {title}", title]:
+        results = search_claim_on_web(q)
+        if results:
+            return results
+    return []
+
+
 def verify_work(key, claim_info):
-    """Verify a single modern work. Returns verification dict."""
+    """Verify a single modern work. Returns verification dict.
+
+    The four lookups run at the same time (API keeps each API to its own
+    rate); their results are reported in order once all have answered.
+    """
     title = claim_info["title"]
     author = claim_info["author"]
     year = claim_info["year"]
@@ -306,9 +490,17 @@ def verify_work(key, claim_info):
         "evidence": [],
     }
 
+    with ThreadPoolExecutor(max_workers=LOOKUP_JOBS) as pool:
+        lookups = [
+            pool.submit(lookup, title, author)
+            for lookup in (
+                search_google_books, search_open_library, search_claim_evidence, fetch_wikipedia_summary,
+            )
+        ]
+    gb, ol, claim_evidence, wiki = (lookup.result() for lookup in lookups)
+
     # 1. Google Books (basic existence + description)
     print("  [1/5] Google Books metadata...", end=" ")
-    gb = search_google_books(title, author)
     if gb:
         print(f"EXISTS — {gb['title']}")
         verification["evidence"].append({
@@ -324,11 +516,9 @@ def verify_work(key, claim_info):
         })
     else:
         print("not found")
-    time.sleep(REQUEST_DELAY)
 
     # 2. Open Library (metadata)
     print("  [2/5] Open Library metadata...", end=" ")
-    ol = search_open_library(title, author)
     if ol:
         print(f"EXISTS — {ol['title']}")
         verification["evidence"].append({
@@ -343,7 +533,6 @@ def verify_work(key, claim_info):
         })
     else:
         print("not found")
-    time.sleep(REQUEST_DELAY)
 
     # Book exists if found in either
     book_exists = bool(gb or ol)
@@ -352,18 +541,10 @@ def verify_work(key, claim_info):
 
     # 3. Claim-specific searches (Wikipedia)
     print("  [3/5] Searching Wikipedia for specific claims...")
-    claim_evidence = []
-    # Search for author + title on Wikipedia
-    author_last = author.split()[-1] if author.split() else author
-    for q in [f"{author_last} {title}", title]:
-        results = search_claim_on_web(q)
-        if results:
-            print(f"    FOUND ({len(results)} result(s))")
-            claim_evidence.extend(results)
-            break
+    if claim_evidence:
+        print(f"    FOUND ({len(claim_evidence)} result(s))")
     else:
         print("    no results")
-    time.sleep(REQUEST_DELAY)
 
     if claim_evidence:
         seen_urls = set()
@@ -381,7 +562,6 @@ def verify_work(key, claim_info):
 
     # 4. Wikipedia about the book/author
     print("  [4/5] Wikipedia (book/author)...", end=" ")
-    wiki = fetch_wikipedia_summary(title, author)
     if wiki:
         print(f"FOUND — {wiki['page_title']}")
         verification["evidence"].append({
@@ -392,7 +572,6 @@ def verify_work(key, claim_info):
         verification["verified"] = True
     else:
         print("not found")
-    time.sleep(REQUEST_DELAY)
 
     # 5. (Placeholder — LLM evaluation done separately by review_citations.py)
     print("  [5/5] LLM evaluation: run `poetry run python scripts/review_citations.py` after")
@@ -506,7 +685,13 @@ def main():
     )
     parser.add_argument("--key", type=str, help="Verify a single source by bib key")
     parser.add_argument("--report", action="store_true", help="Regenerate report only")
+    parser.add_argument(
+        "--refresh", action="store_true",
+        help=f"Request every lookup again instead of using responses cached in the last {API_CACHE_DAYS} days",
+    )
     args = parser.parse_args()
+    if args.refresh:
+        API.max_age = 0
 
     claims = get_manuscript_claims()
 
@@ -534,12 +719,14 @@ def main():
     print(f"Verifying {len(to_check)} modern work(s)")
     print("=" * 60)
 
+    # The Wikipedia intros of every work, a batch of titles per request
+    WIKI.prefetch_summaries(to_check)
+
     verifications = []
     for key, claim_info in sorted(to_check.items()):
         v = verify_work(key, claim_info)
         verifications.append(v)
         save_verification(key, v)
-        time.sleep(REQUEST_DELAY)
 
     # Merge with existing if single-key run
     if args.key: